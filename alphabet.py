@@ -0,0 +1,145 @@
+import argparse
+import random
+import string
+import time
+from cyk import IncrementalCYK
+from grammar import parse_grammar, grammar_to_text
+from lalr import build_lalr_tables, lalr_parse
+from ll1 import build_ll1_table
+from pcfg import to_weighted_cnf
+
+def _is_nonterminal(grammar, s):
+    return s in grammar or s.isupper()
+
+# Partición de los terminales en clases. Cada clase se representa con su primer terminal,
+# así la gramática comprimida sigue siendo una gramática común para el resto de las
+# herramientas; table sirve para str.translate y lleva cada terminal a su representante.
+class TerminalClasses:
+    def __init__(self, classes):
+        self.classes = classes
+        self.representative = {t: members[0] for members in classes for t in members}
+        self.table = str.maketrans(self.representative)
+
+    def __len__(self):
+        return len(self.classes)
+
+    def terminals(self):
+        return len(self.representative)
+
+    # Los símbolos que no son terminales de la gramática quedan igual y el analizador los rechaza
+    def map(self, text):
+        return text.translate(self.table)
+
+# a y b son equivalentes si cambiar una aparición de a por b en una regla da otra regla de
+# la gramática, es decir, si aparecen en los mismos contextos (cabeza, prefijo, sufijo).
+# Entonces cada regla sobre clases representa todas sus combinaciones de terminales y una
+# cadena pertenece al lenguaje si y solo si su cadena de clases es de la gramática comprimida.
+def terminal_classes(grammar):
+    contexts = {}
+    for head, prods in grammar.items():
+        for prod in dict.fromkeys(prods):
+            if prod == '*':
+                continue
+            for i, s in enumerate(prod):
+                if not _is_nonterminal(grammar, s):
+                    contexts.setdefault(s, set()).add((head, prod[:i], prod[i + 1:]))
+    groups = {}
+    for t in sorted(contexts):
+        groups.setdefault(frozenset(contexts[t]), []).append(t)
+    return TerminalClasses(list(groups.values()))
+
+def compress_terminals(grammar):
+    classes = terminal_classes(grammar)
+    compressed = {head: list(dict.fromkeys(prod if prod == '*' else classes.map(prod) for prod in prods))
+                  for head, prods in grammar.items()}
+    return compressed, classes
+
+def _sizes(grammar, start):
+    heads = len(grammar)
+    rules = sum(len(set(prods)) for prods in grammar.values())
+    cnf, _, _ = to_weighted_cnf(grammar, {}, start)
+    ll1 = build_ll1_table(grammar, start)
+    lalr = build_lalr_tables(grammar, start)
+    return {
+        "gramática": (heads, rules),
+        "FNC": (len(cnf), sum(len(prods) for prods in cnf.values())),
+        "LL(1)": (len(ll1["nonterminals"]), len(ll1["terminals"])),
+        "LALR(1)": (lalr["states"], lalr["dense_size"], len(lalr["action"]["value"]) + len(lalr["goto"]["value"])),
+    }
+
+def compression_report(grammar, start):
+    compressed, classes = compress_terminals(grammar)
+    before, after = _sizes(grammar, start), _sizes(compressed, start)
+    lines = [f"Terminales: {classes.terminals()} → {len(classes)} clases"]
+    for members in classes.classes:
+        if len(members) > 1:
+            lines.append(f"  clase {members[0]}: {' '.join(members)}")
+    lines.append(f"Gramática: {before['gramática'][1]} → {after['gramática'][1]} reglas")
+    lines.append(f"FNC: {before['FNC'][0]} → {after['FNC'][0]} no terminales, {before['FNC'][1]} → {after['FNC'][1]} reglas")
+    (rows, cols), (rows_after, cols_after) = before["LL(1)"], after["LL(1)"]
+    lines.append(f"Tabla LL(1): {rows}×{cols} = {rows * cols} → {rows_after}×{cols_after} = {rows_after * cols_after} celdas")
+    (states, dense, packed), (states_after, dense_after, packed_after) = before["LALR(1)"], after["LALR(1)"]
+    lines.append(f"Tablas LALR(1): {states} → {states_after} estados, {dense} → {dense_after} celdas densas, "
+                 f"{packed} → {packed_after} entradas comprimidas")
+    return compressed, classes, "\n".join(lines)
+
+# Gramática como las generadas por herramientas: expresiones con 36 símbolos de
+# identificador que cumplen todos el mismo papel
+BENCH_GRAMMAR = "E -> E+T | E-T | T\nT -> T/F | T%F | F\nF -> (E) | " + " | ".join(string.ascii_lowercase + string.digits)
+
+def benchmark(grammar, start, sentences=2000, length=40, seed=0):
+    compressed, classes, report = compression_report(grammar, start)
+    print(report)
+    started = time.perf_counter()
+    tables = build_lalr_tables(grammar, start)
+    build_before = time.perf_counter() - started
+    started = time.perf_counter()
+    tables_after = build_lalr_tables(compressed, start)
+    build_after = time.perf_counter() - started
+    print(f"Construcción LALR(1): {1000 * build_before:.1f} ms → {1000 * build_after:.1f} ms")
+    rng = random.Random(seed)
+    alphabet = sorted(classes.representative)
+    texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, length))) for _ in range(sentences)]
+    # Cadenas válidas: se cambia cada terminal de una cadena de clases aceptada por otro de su clase
+    members = {members[0]: members for members in classes.classes}
+    accepted = [text for text in (classes.map(text) for text in texts) if lalr_parse(tables_after, text)]
+    texts += ["".join(rng.choice(members[s]) for s in text) for text in accepted]
+    # La misma respuesta con el reconocedor CYK sobre las dos FNC
+    cnf, _, _ = to_weighted_cnf(grammar, {}, start)
+    cnf_after, _, _ = to_weighted_cnf(compressed, {}, start)
+    for text in texts[:300]:
+        assert IncrementalCYK(cnf, start).extend(text) == IncrementalCYK(cnf_after, start).extend(classes.map(text))
+    started = time.perf_counter()
+    expected = [lalr_parse(tables, text) for text in texts]
+    plain = time.perf_counter() - started
+    started = time.perf_counter()
+    got = [lalr_parse(tables_after, classes.map(text)) for text in texts]
+    mapped = time.perf_counter() - started
+    assert expected == got
+    print(f"Análisis LALR(1) de {len(texts)} cadenas ({sum(expected)} aceptadas): {1000 * plain:.1f} ms → "
+          f"{1000 * mapped:.1f} ms con la traducción a clases incluida")
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrupa los terminales en clases de equivalencia y compara tamaños.")
+    parser.add_argument("archivo", nargs="?", help="archivo con la gramática (por defecto, una de expresiones)")
+    parser.add_argument("--inicial", help="símbolo inicial (por defecto, la primera cabeza)")
+    parser.add_argument("--salida", help="archivo donde guardar la gramática comprimida")
+    parser.add_argument("--bench", action="store_true", help="mide construcción y análisis con y sin clases")
+    args = parser.parse_args()
+    if args.archivo:
+        with open(args.archivo, encoding="utf-8") as f:
+            grammar = parse_grammar(f.read())
+    else:
+        grammar = parse_grammar(BENCH_GRAMMAR)
+    start = args.inicial or next(iter(grammar))
+    if args.bench:
+        benchmark(grammar, start)
+        return
+    compressed, _, report = compression_report(grammar, start)
+    print(report)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(grammar_to_text(compressed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import itertools
+import math
+from equivalence import MAX_STRINGS, LanguageTooLarge
+
+def _is_nonterminal(grammar, s):
+    return s in grammar or s.isupper()
+
+# Una gramática es un conjunto de reglas: una alternativa repetida no es otra derivación
+def _rules(grammar):
+    return [(head, prod) for head, prods in grammar.items() for prod in dict.fromkeys(prods)]
+
+# 0·∞ = 0: una parte sin derivaciones anula la producción entera
+def _mul(a, b):
+    return 0 if a == 0 or b == 0 else a * b
+
+# Formas de derivar una cadena de longitud n desde la producción, con value(s, m) las
+# derivaciones de longitud m desde el símbolo s
+def _ways(prod, n, value):
+    if prod == '*':
+        return 1 if n == 0 else 0
+    ways = [1] + [0] * n
+    for s in reversed(prod):
+        ways = [sum(_mul(value(s, k), ways[m - k]) for k in range(m + 1)) for m in range(n + 1)]
+    return ways[n]
+
+# Cantidad exacta de derivaciones por (no terminal, longitud) sobre la gramática tal como
+# se escribió, sin mirar las cadenas. Con producciones ε y unitarias un no terminal puede
+# derivarse a sí mismo sin consumir nada: si ese ciclo entra en una derivación, la
+# cantidad es infinita (math.inf).
+def derivation_counts(grammar, max_len, progress=None):
+    rules = _rules(grammar)
+    counts = {head: [] for head in grammar}
+
+    def symbol(s, m):
+        if s in grammar:
+            return counts[s][m]
+        if _is_nonterminal(grammar, s):
+            return 0
+        return 1 if m == 1 else 0
+
+    # Punto fijo de la longitud n: las longitudes menores ya están en counts. Los valores
+    # de fixed no se recalculan; cap satura los demás.
+    def solve(n, fixed, cap=None):
+        current = {head: fixed.get(head, 0) for head in grammar}
+        value = lambda s, m: current[s] if m == n and s in grammar else symbol(s, m)
+        changed = True
+        while changed:
+            if progress is not None:
+                progress("ambigüedad: derivaciones", n)
+            changed = False
+            totals = {head: 0 for head in grammar}
+            for head, prod in rules:
+                if head not in fixed:
+                    totals[head] += _ways(prod, n, value)
+            for head, total in totals.items():
+                if head in fixed:
+                    continue
+                if cap is not None:
+                    total = min(cap, total)
+                if total != current[head]:
+                    current[head] = total
+                    changed = True
+        return current
+
+    for n in range(max_len + 1):
+        # Qué no terminales derivan alguna cadena de longitud n
+        positive = solve(n, {}, cap=1)
+        nullable = positive if n == 0 else {head: counts[head][0] for head in grammar}
+        # A -> αBβ con αβ anulable: B se lleva toda la cadena de A. Un ciclo de estas
+        # aristas da infinitas derivaciones, y también cualquier no terminal que llegue a él.
+        edges = {head: set() for head in grammar}
+        for head, prod in rules:
+            if prod == '*':
+                continue
+            for i, s in enumerate(prod):
+                if positive.get(s) and all(nullable.get(t) for t in prod[:i] + prod[i + 1:]):
+                    edges[head].add(s)
+        infinite = set()
+        for head in grammar:
+            seen = set()
+            stack = list(edges[head])
+            while stack and head not in seen:
+                node = stack.pop()
+                if node not in seen:
+                    seen.add(node)
+                    stack.extend(edges[node])
+            if head in seen:
+                infinite.add(head)
+        grow = True
+        while grow:
+            grow = False
+            for head in grammar:
+                if head not in infinite and edges[head] & infinite:
+                    infinite.add(head)
+                    grow = True
+        # Sin ciclos entre los demás, el punto fijo exacto termina
+        exact = solve(n, {head: math.inf for head in infinite})
+        for head in grammar:
+            counts[head].append(exact[head])
+    return counts
+
+# Longitud máxima que vale la pena recorrer: con k terminales puede haber k^n cadenas de
+# longitud n, así que la búsqueda se corta antes de que esa cantidad supere max_strings
+def search_length(grammar, max_len, max_strings=MAX_STRINGS):
+    terminals = {s for prods in grammar.values() for prod in prods if prod != '*'
+                 for s in prod if not _is_nonterminal(grammar, s)}
+    if len(terminals) <= 1:
+        return max_len
+    return min(max_len, int(math.log(max_strings) / math.log(len(terminals))))
+
+# Busca la cadena ambigua más corta del símbolo inicial, longitud por longitud, sobre la
+# gramática ingresada: pasarla a FNC puede fusionar derivaciones (S -> A | B, A -> a,
+# B -> a queda S -> a). Para cada (no terminal, longitud) y para cada sufijo de cada
+# producción guarda sus cadenas con la cantidad de derivaciones saturada en 2, que basta
+# para saber si alguna tiene dos árboles distintos; con producciones ε y unitarias cada
+# longitud es un punto fijo que termina porque los valores solo crecen hasta 2.
+def find_ambiguity(grammar, start, max_len=15, max_strings=MAX_STRINGS, progress=None):
+    rules = _rules(grammar)
+    exact = derivation_counts(grammar, max_len, progress)
+    by_length = []
+    result = {"ambiguous": False, "string": None, "trees": [], "max_len": max_len, "by_length": by_length}
+    if start not in grammar:
+        return result
+    rules_of = {head: [] for head in grammar}
+    uses = {head: set() for head in grammar}
+    for r, (head, prod) in enumerate(rules):
+        rules_of[head].append(r)
+        for s in prod:
+            if s in grammar:
+                uses[s].add(r)
+    strings = {head: [] for head in grammar}
+    # seq[r][i][m]: cadenas de longitud m del sufijo prod[i:] de la regla r
+    seq = [[[] for _ in range(len(prod) + 1)] for _, prod in rules]
+    empty = {}
+
+    def symbol_table(s, m):
+        if s in grammar:
+            return strings[s][m]
+        if _is_nonterminal(grammar, s):
+            return empty
+        return {s: 1} if m == 1 else empty
+
+    # Árboles (no terminal, [hijos]) de text desde head, guiados por las tablas para no
+    # explorar cortes sin derivaciones. Un mismo (no terminal, subcadena) puede repetirse
+    # una vez en cada camino: así aparece el segundo árbol cuando la ambigüedad viene de
+    # un ciclo de producciones ε o unitarias, y la búsqueda sigue siendo finita.
+    def trees(head, text, path):
+        key = (head, text)
+        if path.count(key) >= 2:
+            return
+        path = path + (key,)
+        for r in rules_of[head]:
+            prod = rules[r][1]
+            if prod == '*':
+                if not text:
+                    yield (head, [])
+            elif seq[r][0][len(text)].get(text):
+                for children in sequences(r, 0, text, path):
+                    yield (head, children)
+
+    def sequences(r, i, text, path):
+        prod = rules[r][1]
+        if i == len(prod):
+            if not text:
+                yield []
+            return
+        s = prod[i]
+        for k in range(len(text) + 1):
+            left, rest = text[:k], text[k:]
+            if not symbol_table(s, k).get(left) or not seq[r][i + 1][len(rest)].get(rest):
+                continue
+            for first in (trees(s, left, path) if s in grammar else [left]):
+                for tail in sequences(r, i + 1, rest, path):
+                    yield [first] + tail
+
+    try:
+        for n in range(max_len + 1):
+            for head in grammar:
+                strings[head].append({})
+            for r, (_, prod) in enumerate(rules):
+                for i in range(len(seq[r])):
+                    seq[r][i].append({"": 1} if n == 0 and (i == len(prod) or prod == '*') else {})
+            pending = set(range(len(rules)))
+            while pending:
+                if progress is not None:
+                    progress("ambigüedad", n)
+                heads = set()
+                for r in pending:
+                    head, prod = rules[r]
+                    heads.add(head)
+                    if prod == '*':
+                        continue
+                    tables = seq[r]
+                    for i in range(len(prod) - 1, -1, -1):
+                        current = {}
+                        for k in range(n + 1):
+                            left = symbol_table(prod[i], k)
+                            right = tables[i + 1][n - k]
+                            if not left or not right:
+                                continue
+                            for x, cx in left.items():
+                                for y, cy in right.items():
+                                    s = x + y
+                                    current[s] = min(2, current.get(s, 0) + cx * cy)
+                            if len(current) > max_strings:
+                                raise LanguageTooLarge()
+                        tables[i][n] = current
+                pending = set()
+                for head in heads:
+                    table = {}
+                    for r in rules_of[head]:
+                        for s, c in seq[r][0][n].items():
+                            table[s] = min(2, table.get(s, 0) + c)
+                    if table != strings[head][n]:
+                        strings[head][n] = table
+                        pending |= uses[head]
+            start_table = strings[start][n]
+            by_length.append((n, exact[start][n], len(start_table)))
+            ambiguous = sorted(s for s, c in start_table.items() if c > 1)
+            if ambiguous:
+                string = ambiguous[0]
+                result.update(ambiguous=True, string=string, trees=list(itertools.islice(trees(start, string, ()), 2)))
+                return result
+    except LanguageTooLarge:
+        result["ambiguous"] = None
+    # Longitudes restantes: solo el conteo de derivaciones, que no depende de las cadenas
+    for n in range(len(by_length), max_len + 1):
+        by_length.append((n, exact[start][n], None))
+    return result
@@ -0,0 +1,201 @@
+import argparse
+import random
+import time
+from grammar import parse_grammar, to_gnf
+from ll1 import build_ll1_table, ll1_parse, format_conflicts
+
+# Genera un módulo de Python independiente: una función por no terminal con una cadena
+# de if sobre el símbolo actual, tomada de la tabla LL(1). En las celdas con conflicto
+# se conserva la misma regla que la tabla, así que acepta exactamente lo mismo que ll1_parse.
+def generate_parser_source(ll1):
+    heads = ll1["nonterminals"]
+    if ll1["start"] not in heads:
+        raise ValueError(f"La tabla LL(1) no tiene filas para el símbolo inicial {ll1['start']}: "
+                         "el lenguaje es vacío.")
+    terminals = ll1["terminals"]
+    width = len(terminals)
+    end_col = width - 1
+    name = {head: f"_n{i}" for i, head in enumerate(heads)}
+    lines = [
+        '"""Analizador descendente recursivo generado por el conversor de gramáticas.',
+        "",
+        f"Símbolo inicial: {ll1['start']}",
+        '"""',
+        "import sys",
+        "",
+        "sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))",
+        "",
+        "START = " + repr(ll1["start"]),
+        "",
+        "class ParseError(Exception):",
+        "    pass",
+        "",
+    ]
+    conflicts = format_conflicts(ll1)
+    if conflicts:
+        lines.append("# La gramática no es LL(1); en estas celdas se eligió la primera regla:")
+        lines.extend(f"#   {line}" for line in conflicts)
+        lines.append("")
+        # Llamadas en curso (no terminal, posición)
+        lines.append("_ACTIVE = set()")
+        lines.append("")
+    for row, head in enumerate(heads):
+        # Columnas por regla, en el orden de las reglas
+        by_rule = {}
+        for col in range(width):
+            entry = ll1["table"][row * width + col]
+            if entry:
+                by_rule.setdefault(entry - 1, []).append(col)
+        if conflicts:
+            # Con recursividad izquierda la regla elegida puede volver a llamar a la misma
+            # función sin consumir nada: como en ll1_parse, eso rechaza la entrada
+            lines += [
+                f"def {name[head]}(s, i, n):  # {head}",
+                f"    key = ({row}, i)",
+                "    if key in _ACTIVE:",
+                "        raise ParseError(i)",
+                "    _ACTIVE.add(key)",
+                "    try:",
+                f"        return _r{row}(s, i, n)",
+                "    finally:",
+                "        _ACTIVE.discard(key)",
+                "",
+            ]
+            lines.append(f"def _r{row}(s, i, n):  # {head}")
+        else:
+            lines.append(f"def {name[head]}(s, i, n):  # {head}")
+        lines.append("    c = s[i] if i < n else None")
+        keyword = "if"
+        for r, cols in by_rule.items():
+            tests = []
+            for col in cols:
+                tests.append("c is None" if col == end_col else f"c == {terminals[col]!r}")
+            prod = ll1["rules"][r][1]
+            lines.append(f"    {keyword} {' or '.join(tests)}:  # {head} -> {'ε' if prod == '*' else prod}")
+            keyword = "elif"
+            if prod != '*':
+                # Si empieza con terminal, la cadena de if ya lo comprobó
+                skip = 0 if prod[0] in name else 1
+                if skip:
+                    lines.append("        i += 1")
+                for symbol in prod[skip:]:
+                    if symbol in name:
+                        lines.append(f"        i = {name[symbol]}(s, i, n)")
+                    else:
+                        lines.append(f"        if i >= n or s[i] != {symbol!r}:")
+                        lines.append("            raise ParseError(i)")
+                        lines.append("        i += 1")
+            lines.append("        return i")
+        lines.append("    raise ParseError(i)")
+        lines.append("")
+    lines += [
+        "def accepts(text):",
+        "    try:",
+        f"        return {name[ll1['start']]}(text, 0, len(text)) == len(text)",
+        "    except ParseError:",
+        "        return False",
+        "",
+        'if __name__ == "__main__":',
+        "    for line in sys.stdin:",
+        "        text = line.rstrip('\\n')",
+        "        print(f\"{text or 'ε'}: {'pertenece' if accepts(text) else 'no pertenece'}\")",
+        "",
+    ]
+    return "\n".join(lines)
+
+def load_generated(source):
+    namespace = {"__name__": "analizador_generado"}
+    exec(compile(source, "<analizador generado>", "exec"), namespace)
+    return namespace
+
+# Longitud mínima de una cadena derivable desde cada no terminal
+def _min_lengths(grammar):
+    best = {}
+    changed = True
+    while changed:
+        changed = False
+        for head, prods in grammar.items():
+            for prod in prods:
+                symbols = "" if prod == '*' else prod
+                if all(s in best or s not in grammar for s in symbols):
+                    size = sum(best.get(s, 1) for s in symbols)
+                    if size < best.get(head, size + 1):
+                        best[head] = size
+                        changed = True
+    return best
+
+# Cadenas derivadas de la gramática de longitud cercana a la pedida, para la prueba de
+# rendimiento: se eligen reglas al azar hasta alcanzarla y después las más cortas
+def _sample(grammar, start, length, rng):
+    best = _min_lengths(grammar)
+
+    def size(prod):
+        return sum(best.get(s, 1) for s in prod)
+
+    out = []
+    stack = [start]
+    pending = best[start]
+    while stack:
+        symbol = stack.pop()
+        if symbol not in grammar:
+            out.append(symbol)
+            pending -= 1
+            continue
+        pending -= best[symbol]
+        prods = ["" if p == '*' else p for p in grammar[symbol]]
+        prods = [p for p in prods if all(s in best or s not in grammar for s in p)]
+        prod = rng.choice(prods) if len(out) + pending < length else min(prods, key=size)
+        pending += size(prod)
+        stack.extend(reversed(prod))
+    return "".join(out)
+
+def benchmark(grammar, start, lengths=(100, 1000, 5000), runs=200, seed=0):
+    gnf = to_gnf(grammar, start)
+    ll1 = build_ll1_table(gnf, start)
+    parser = load_generated(generate_parser_source(ll1))
+    rng = random.Random(seed)
+    for length in lengths:
+        # Se prefieren cadenas aceptadas: una rechazada se abandona en el primer error
+        candidates = [_sample(gnf, start, length, rng) for _ in range(50)]
+        inputs = ([text for text in candidates if ll1_parse(ll1, text)] or candidates)[:5]
+        expected = [ll1_parse(ll1, text) for text in inputs]
+        assert expected == [parser["accepts"](text) for text in inputs]
+        repeat = max(1, runs * 100 // length)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for text in inputs:
+                ll1_parse(ll1, text)
+        table = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for text in inputs:
+                parser["accepts"](text)
+        generated = time.perf_counter() - started
+        tokens = repeat * sum(len(text) for text in inputs)
+        print(f"longitud ~{length} ({sum(expected)}/{len(inputs)} aceptadas): tabla {1e6 * table / tokens:.3f} µs/símbolo, "
+              f"generado {1e6 * generated / tokens:.3f} µs/símbolo ({table / generated:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un analizador en Python a partir de la forma normal de Greibach.")
+    parser.add_argument("archivo", help="archivo con la gramática")
+    parser.add_argument("--inicial", default="S", help="símbolo inicial")
+    parser.add_argument("--salida", help="archivo .py de salida (por defecto, salida estándar)")
+    parser.add_argument("--bench", action="store_true", help="compara el analizador generado con el de tabla")
+    args = parser.parse_args()
+    with open(args.archivo, encoding="utf-8") as f:
+        grammar = parse_grammar(f.read())
+    if args.bench:
+        benchmark(grammar, args.inicial)
+        return
+    try:
+        source = generate_parser_source(build_ll1_table(to_gnf(grammar, args.inicial), args.inicial))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(source)
+    else:
+        print(source)
+
+if __name__ == "__main__":
+    main()
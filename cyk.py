@@ -0,0 +1,172 @@
+import argparse
+import random
+import time
+from grammar import parse_grammar, to_cnf
+
+# Reconocedor CYK incremental por prefijos sobre una gramática en FNC. El diagrama se
+# guarda por columnas: columns[j][A] es un entero usado como conjunto de bits de las
+# posiciones i tales que A =>* w[i:j]. Agregar un token solo calcula la columna nueva;
+# deshacer es quitar la última columna.
+class IncrementalCYK:
+    def __init__(self, cnf, start):
+        self.start = start
+        self.unit = {}
+        # by_right[C]: reglas A -> BC agrupadas por el segundo símbolo, como pares (A, B)
+        self.by_right = {}
+        self.nullable = False
+        for head, prods in cnf.items():
+            for prod in prods:
+                if prod == '*':
+                    if head != start:
+                        raise ValueError(f"La gramática no está en FNC: {head} -> ε")
+                    self.nullable = True
+                elif len(prod) == 1 and prod not in cnf:
+                    self.unit.setdefault(prod, []).append(head)
+                elif len(prod) == 2 and prod[0] in cnf and prod[1] in cnf:
+                    self.by_right.setdefault(prod[1], []).append((head, prod[0]))
+                else:
+                    raise ValueError(f"La gramática no está en FNC: {head} -> {prod}")
+        self.tokens = []
+        self.columns = [{}]
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def append(self, token):
+        n = len(self.tokens) + 1
+        columns = self.columns
+        acc = {}
+        union = 0
+        for A in self.unit.get(token, ()):
+            acc[A] = acc.get(A, 0) | 1 << (n - 1)
+            union |= 1 << (n - 1)
+        # Se recorren los inicios m de mayor a menor: el intervalo (m, n) solo depende de
+        # intervalos (m', n) con m' > m, que ya están completos al llegar a m
+        top = n
+        while True:
+            pending = union & ((1 << top) - 1)
+            if not pending:
+                break
+            m = pending.bit_length() - 1
+            column = columns[m]
+            for C, mask in list(acc.items()):
+                if not mask >> m & 1:
+                    continue
+                for A, B in self.by_right.get(C, ()):
+                    starts = column.get(B)
+                    if starts:
+                        acc[A] = acc.get(A, 0) | starts
+                        union |= starts
+            top = m
+        self.tokens.append(token)
+        columns.append(acc)
+        return self.accepts()
+
+    def extend(self, tokens):
+        for token in tokens:
+            self.append(token)
+        return self.accepts()
+
+    def undo(self):
+        if self.tokens:
+            self.tokens.pop()
+            self.columns.pop()
+        return self.accepts()
+
+    def accepts(self):
+        if not self.tokens:
+            return self.nullable
+        return bool(self.columns[-1].get(self.start, 0) & 1)
+
+def cyk_accepts(cnf, start, text):
+    return IncrementalCYK(cnf, start).extend(text)
+
+# CYK clásico sobre todo el texto, solo para comparar en la prueba de rendimiento
+def _full_cyk(cnf, start, text):
+    n = len(text)
+    if n == 0:
+        return '*' in cnf.get(start, [])
+    table = [[set() for _ in range(n + 1)] for _ in range(n)]
+    for i, t in enumerate(text):
+        table[i][i + 1] = {head for head, prods in cnf.items() if t in prods}
+    rules = [(head, prod[0], prod[1]) for head, prods in cnf.items() for prod in prods if len(prod) == 2]
+    for length in range(2, n + 1):
+        for i in range(n - length + 1):
+            j = i + length
+            cell = table[i][j]
+            for k in range(i + 1, j):
+                left, right = table[i][k], table[k][j]
+                if left and right:
+                    for head, B, C in rules:
+                        if B in left and C in right:
+                            cell.add(head)
+    return start in table[0][n]
+
+# Paréntesis balanceados con a = "(" y b = ")": ambigua y con muchas celdas no vacías
+BENCH_GRAMMAR = "S -> aSb | SS | ab"
+
+def _bench_input(n, seed=0):
+    random.seed(seed)
+    tokens = []
+    depth = 0
+    while len(tokens) + depth < n:
+        if depth and random.random() < 0.5:
+            tokens.append("b")
+            depth -= 1
+        else:
+            tokens.append("a")
+            depth += 1
+    return "".join(tokens) + "b" * depth
+
+def benchmark(n, full_up_to=200):
+    cnf = to_cnf(parse_grammar(BENCH_GRAMMAR), "S")
+    # (ab)^n es el peor caso: todo intervalo de longitud par que empieza en a es válido
+    inputs = [("paréntesis aleatorios", _bench_input(n)), ("(ab)^n", "ab" * (n // 2))]
+    for name, text in inputs:
+        recognizer = IncrementalCYK(cnf, "S")
+        started = time.perf_counter()
+        checkpoints = {}
+        for i, t in enumerate(text, 1):
+            recognizer.append(t)
+            if i % max(1, len(text) // 5) == 0 or i == len(text):
+                checkpoints[i] = time.perf_counter() - started
+        total = time.perf_counter() - started
+        print(f"{name}, {len(text)} tokens: {total:.3f} s en total, acepta: {recognizer.accepts()}")
+        previous_i, previous_t = 0, 0.0
+        for i, t in checkpoints.items():
+            print(f"  tokens {previous_i + 1}–{i}: {1000 * (t - previous_t) / (i - previous_i):.3f} ms por token")
+            previous_i, previous_t = i, t
+        # Recalcular CYK completo en cada pulsación cuesta un CYK cúbico por cada prefijo
+        prefix = text[:full_up_to]
+        started = time.perf_counter()
+        _full_cyk(cnf, "S", prefix)
+        once = time.perf_counter() - started
+        print(f"  CYK completo sobre los primeros {len(prefix)} tokens: {1000 * once:.1f} ms una sola vez; "
+              f"el incremental procesa esos {len(prefix)} tokens en {1000 * _time_prefix(cnf, prefix):.1f} ms")
+
+def _time_prefix(cnf, text):
+    recognizer = IncrementalCYK(cnf, "S")
+    started = time.perf_counter()
+    recognizer.extend(text)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconocedor CYK incremental por prefijos sobre la FNC.")
+    parser.add_argument("archivo", nargs="?", help="archivo con la gramática (se convierte a FNC)")
+    parser.add_argument("cadenas", nargs="*", help="cadenas a reconocer")
+    parser.add_argument("--inicial", default="S", help="símbolo inicial")
+    parser.add_argument("--bench", type=int, metavar="N", help="prueba de rendimiento con N tokens")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark(args.bench)
+        return
+    if not args.archivo:
+        parser.error("falta el archivo con la gramática")
+    with open(args.archivo, encoding="utf-8") as f:
+        cnf = to_cnf(parse_grammar(f.read()), args.inicial)
+    for text in args.cadenas:
+        shown = text or "ε"
+        print(f"{shown}: {'pertenece' if cyk_accepts(cnf, args.inicial, text) else 'no pertenece'}")
+
+if __name__ == "__main__":
+    main()
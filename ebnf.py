@@ -0,0 +1,294 @@
+import argparse
+import re
+from symbols import ASCII_UPPER, ASCII_LOWER, EXTRA_UPPER, EXTRA_LOWER
+
+# El importador asigna a cada nombre o token un carácter de los conjuntos de symbols y
+# devuelve la tabla para mostrar los nombres originales.
+
+# Letras ASCII que pueden tomar los no terminales con nombre; el resto queda libre
+# para los símbolos frescos de to_cnf y to_gnf
+ASCII_NONTERMINALS = 13
+
+TOKEN_RE = re.compile(r"""
+    (?P<space>\s+|\#[^\n]*)
+  | (?P<define>::=|->|→|=)
+  | (?P<name><[^<>\n]+>|[A-Za-z_][A-Za-z0-9_]*(?:-[A-Za-z0-9_]+)*)
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<epsilon>ε)
+  | (?P<op>[|()\[\]{}*+?;])
+""", re.VERBOSE)
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if match is None:
+            line = text.count("\n", 0, pos) + 1
+            raise ValueError(f"Línea {line}: carácter inesperado {text[pos]!r}.")
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "name" and value.startswith("<"):
+            value = value[1:-1].strip()
+        elif kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        if kind != "space":
+            tokens.append((kind, value, text.count("\n", 0, pos) + 1))
+        pos = match.end()
+    tokens.append(("end", "", text.count("\n") + 1))
+    return tokens
+
+# Árbol: ("nt", nombre), ("t", token), ("seq", (...)), ("alt", (...)),
+# ("star", e), ("plus", e), ("opt", e). Las tuplas sirven como clave para compartir ayudantes.
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self, offset=0):
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def error(self, message):
+        raise ValueError(f"Línea {self.peek()[2]}: {message}")
+
+    def expect(self, kind, value=None):
+        token = self.peek()
+        if token[0] != kind or (value is not None and token[1] != value):
+            self.error(f"se esperaba {value or kind}, se encontró {token[1] or 'fin de archivo'!r}.")
+        self.pos += 1
+        return token
+
+    def at_rule_start(self):
+        return self.peek()[0] == "name" and self.peek(1)[0] == "define"
+
+    def rules(self):
+        rules = []
+        while self.peek()[0] != "end":
+            if self.peek() == ("op", ";", self.peek()[2]):
+                self.pos += 1
+                continue
+            if not self.at_rule_start():
+                self.error("se esperaba el inicio de una regla (nombre ::= ...).")
+            name = self.expect("name")[1]
+            self.expect("define")
+            rules.append((name, self.expression()))
+        return rules
+
+    def expression(self):
+        alternatives = [self.sequence()]
+        while self.peek()[:2] == ("op", "|"):
+            self.pos += 1
+            alternatives.append(self.sequence())
+        return alternatives[0] if len(alternatives) == 1 else ("alt", tuple(alternatives))
+
+    def sequence(self):
+        items = []
+        while True:
+            kind, value, _ = self.peek()
+            if kind == "end" or self.at_rule_start() or (kind == "op" and value in "|)]};"):
+                break
+            items.append(self.postfix())
+        return items[0] if len(items) == 1 else ("seq", tuple(items))
+
+    def postfix(self):
+        node = self.factor()
+        while self.peek()[0] == "op" and self.peek()[1] in "*+?":
+            op = self.expect("op")[1]
+            node = ({"*": "star", "+": "plus", "?": "opt"}[op], node)
+        return node
+
+    def factor(self):
+        kind, value, _ = self.peek()
+        if kind == "name":
+            self.pos += 1
+            return ("nt", value)
+        if kind == "string":
+            self.pos += 1
+            return ("t", value) if value else ("seq", ())
+        if kind == "epsilon":
+            self.pos += 1
+            return ("seq", ())
+        closing = {"(": ")", "[": "]", "{": "}"}
+        if kind == "op" and value in closing:
+            self.pos += 1
+            inner = self.expression()
+            self.expect("op", closing[value])
+            if value == "[":
+                return ("opt", inner)
+            if value == "{":
+                return ("star", inner)
+            return inner
+        self.error(f"símbolo inesperado {value or 'fin de archivo'!r}.")
+
+def _show(node):
+    kind = node[0]
+    if kind == "nt":
+        return f"<{node[1]}>"
+    if kind == "t":
+        return '"' + node[1].replace('"', '\\"') + '"'
+    if kind == "seq":
+        return " ".join(_show(item) for item in node[1]) or "ε"
+    if kind == "alt":
+        return "(" + " | ".join(_show(item) for item in node[1]) + ")"
+    inner = _show(node[1])
+    if node[1][0] in ("seq", "alt") and not inner.startswith("("):
+        inner = f"({inner})"
+    return inner + {"star": "*", "plus": "+", "opt": "?"}[kind]
+
+class _Desugarer:
+    def __init__(self, rules):
+        self.defined = []
+        for name, _ in rules:
+            if name not in self.defined:
+                self.defined.append(name)
+        self.symbol = {}
+        self.names = {}
+        self.helpers = {}
+        self.grammar = {}
+        used = set()
+        # No terminales con nombre: la inicial de su nombre si está libre (hasta
+        # ASCII_NONTERMINALS letras ASCII), si no un carácter del conjunto extendido
+        ascii_left = ASCII_NONTERMINALS
+        for name in self.defined:
+            letter = name[0].upper()
+            if ascii_left and letter in ASCII_UPPER and letter not in used:
+                ascii_left -= 1
+            else:
+                letter = self._next(EXTRA_UPPER, used)
+            used.add(letter)
+            self.symbol[("nt", name)] = letter
+            self.names[letter] = f"<{name}>"
+        self.used = used
+
+    def _next(self, pool, used):
+        for c in pool:
+            if c not in used:
+                return c
+        raise ValueError("La gramática tiene demasiados símbolos distintos para importarla.")
+
+    def terminal(self, token):
+        key = ("t", token)
+        if key not in self.symbol:
+            # Un token de una letra minúscula se conserva; el resto toma una minúscula extendida
+            letter = token if len(token) == 1 and token in ASCII_LOWER else self._next(EXTRA_LOWER, self.used)
+            self.used.add(letter)
+            self.symbol[key] = letter
+            self.names[letter] = _show(key)
+        return self.symbol[key]
+
+    def helper(self, key, build):
+        # Subexpresiones iguales comparten un único no terminal ayudante
+        if key not in self.helpers:
+            letter = self._next(EXTRA_UPPER, self.used)
+            self.used.add(letter)
+            self.helpers[key] = letter
+            self.names[letter] = _show(key)
+            # Se reserva la entrada antes de construirla para que los ayudantes queden en orden
+            self.grammar[letter] = []
+            self.grammar[letter] = build(letter)
+        return self.helpers[key]
+
+    def alternatives(self, node):
+        if node[0] == "alt":
+            result = []
+            for item in node[1]:
+                for prod in self.alternatives(item):
+                    if prod not in result:
+                        result.append(prod)
+            return result
+        return [self.symbols(node)]
+
+    def symbols(self, node):
+        kind = node[0]
+        if kind == "nt":
+            if node in self.symbol:
+                return self.symbol[node]
+            # Nombre sin regla propia: se toma como token terminal (p. ej. NUMBER)
+            return self.terminal(node[1])
+        if kind == "t":
+            return self.terminal(node[1])
+        if kind == "seq":
+            return "".join(self.symbols(item) for item in node[1])
+        if kind == "alt":
+            # Como en run: la alternativa vacía es ε
+            return self.helper(node, lambda h: list(dict.fromkeys(prod or "*" for prod in self.alternatives(node))))
+        if kind == "star":
+            # Recursividad por la derecha: H -> x H | ε, así to_gnf no tiene que eliminar nada
+            return self.helper(node, lambda h: [prod + h if prod != "*" else h
+                                                for prod in self._nonempty(self.alternatives(node[1]))] + ["*"])
+        if kind == "plus":
+            # x+ = x x*: reutiliza el ayudante de x*
+            return self.symbols(node[1]) + self.symbols(("star", node[1]))
+        if kind == "opt":
+            return self.helper(node, lambda h: self._nonempty(self.alternatives(node[1])) + ["*"])
+        raise ValueError(f"Nodo desconocido: {kind}")
+
+    def _nonempty(self, prods):
+        return [prod for prod in prods if prod and prod != "*"]
+
+    def run(self, rules):
+        for name in self.defined:
+            self.grammar[self.symbol[("nt", name)]] = []
+        for name, expr in rules:
+            head = self.symbol[("nt", name)]
+            for prod in self.alternatives(expr):
+                prod = prod or "*"
+                if prod not in self.grammar[head]:
+                    self.grammar[head].append(prod)
+        return self.grammar
+
+# Importa una gramática BNF/EBNF: reglas "<expr> ::= <term> ("+" <term>)*", también con
+# "=", "->" o "→"; terminales entre comillas; [x] y x? opcionales; {x} y x* repetición;
+# x+ una o más; paréntesis para agrupar; "" o ε para la cadena vacía; # comentarios.
+def import_ebnf(text):
+    rules = _Parser(tokenize(text)).rules()
+    if not rules:
+        raise ValueError("No se encontró ninguna regla.")
+    desugarer = _Desugarer(rules)
+    grammar = desugarer.run(rules)
+    return {
+        "grammar": grammar,
+        "start": desugarer.symbol[("nt", rules[0][0])],
+        "names": desugarer.names,
+    }
+
+# Expresiones con nombres cuyas iniciales (E, T, F) coinciden con letras que to_cnf
+# elegía para sus propios símbolos: la FNC debe seguir generando el mismo lenguaje
+EXAMPLE_EBNF = """<expr> ::= <term> ("+" <term>)*
+<term> ::= <factor> ("*" <factor>)*
+<factor> ::= "x" | "(" <expr> ")"
+"""
+
+def main():
+    from grammar import grammar_to_text, to_cnf, to_gnf
+    from equivalence import reference_language, compare_language
+    parser = argparse.ArgumentParser(description="Importa una gramática BNF/EBNF y verifica que sus conversiones conserven el lenguaje.")
+    parser.add_argument("archivo", nargs="?", help="archivo con la gramática (por defecto, una de expresiones)")
+    parser.add_argument("--max-len", type=int, default=7, help="longitud máxima de cadena a comparar")
+    args = parser.parse_args()
+    if args.archivo:
+        with open(args.archivo, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = EXAMPLE_EBNF
+    imported = import_ebnf(text)
+    grammar, start = imported["grammar"], imported["start"]
+    print(grammar_to_text(grammar))
+    for symbol, name in imported["names"].items():
+        print(f"  {symbol} = {name}")
+    reference = reference_language(grammar, start, args.max_len)
+    failed = False
+    for name, convert in (("chomsky", to_cnf), ("greibach", to_gnf)):
+        result = compare_language(reference, convert(grammar, start), start, args.max_len)
+        if result["equivalent"] is None:
+            print(f"{name}: no concluyente")
+        elif result["equivalent"]:
+            print(f"{name}: mismo lenguaje hasta longitud {args.max_len}")
+        else:
+            failed = True
+            print(f"{name}: '{result['string'] or 'ε'}' solo la genera la gramática {result['only_in']}")
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import importlib
+
+# Máximo de cadenas distintas por (no terminal, longitud) antes de abandonar la comparación
+MAX_STRINGS = 200_000
+
+class LanguageTooLarge(Exception):
+    pass
+
+def _concat(left, right, max_strings):
+    result = {a + b for a in left for b in right}
+    if len(result) > max_strings:
+        raise LanguageTooLarge()
+    return result
+
+# Calcula, para cada longitud n <= max_len, el conjunto de cadenas que genera el
+# símbolo inicial. Cada longitud se resuelve con una iteración de punto fijo
+# (por las producciones ε y unitarias) sobre tablas memorizadas de longitudes menores.
+def language_by_length(grammar, start, max_len, max_strings=MAX_STRINGS, progress=None):
+    heads = set(grammar)
+    rules = [(head, prod) for head, prods in grammar.items() for prod in prods]
+    lang = {head: [] for head in heads}
+    # seq[r][i][m]: cadenas de longitud m derivables del sufijo prod[i:] de la regla r
+    seq = [[[] for _ in range(len(prod) + 1)] if prod != '*' else None for _, prod in rules]
+    empty = set()
+
+    def symbol_lang(s, m):
+        if s in heads:
+            return lang[s][m]
+        if s.isupper():
+            return empty
+        return {s} if m == 1 else empty
+
+    for n in range(max_len + 1):
+        if progress is not None:
+            progress("equivalencia", n)
+        for head in heads:
+            lang[head].append(set())
+        for r, (head, prod) in enumerate(rules):
+            if prod == '*':
+                continue
+            for i in range(len(prod) + 1):
+                seq[r][i].append({""} if i == len(prod) and n == 0 else set())
+        changed = True
+        while changed:
+            changed = False
+            for r, (head, prod) in enumerate(rules):
+                if prod == '*':
+                    if n == 0 and "" not in lang[head][0]:
+                        lang[head][0].add("")
+                        changed = True
+                    continue
+                table = seq[r]
+                for i in range(len(prod) - 1, -1, -1):
+                    current = set()
+                    for k in range(n + 1):
+                        left = symbol_lang(prod[i], k)
+                        if not left:
+                            continue
+                        right = table[i + 1][n - k]
+                        if right:
+                            current |= _concat(left, right, max_strings)
+                    table[i][n] = current
+                new = table[0][n] - lang[head][n]
+                if new:
+                    lang[head][n] |= new
+                    if len(lang[head][n]) > max_strings:
+                        raise LanguageTooLarge()
+                    changed = True
+    if start not in heads:
+        return [set() for _ in range(max_len + 1)]
+    return lang[start]
+
+# Lenguaje de la gramática original hasta max_len, para compararlo con varias conversiones
+# sin recalcularlo; None si excede max_strings cadenas por longitud
+def reference_language(original, start, max_len=10, max_strings=MAX_STRINGS, progress=None):
+    try:
+        return language_by_length(original, start, max_len, max_strings, progress)
+    except LanguageTooLarge:
+        return None
+
+# Compara una conversión contra el lenguaje de referencia y devuelve el primer contraejemplo
+def compare_language(reference, converted, start, max_len=10, max_strings=MAX_STRINGS, progress=None):
+    inconclusive = {"equivalent": None, "max_len": max_len, "string": None, "only_in": None}
+    if reference is None:
+        return inconclusive
+    left = reference
+    try:
+        right = language_by_length(converted, start, max_len, max_strings, progress)
+    except LanguageTooLarge:
+        return inconclusive
+    for n in range(max_len + 1):
+        only_left = left[n] - right[n]
+        only_right = right[n] - left[n]
+        if only_left or only_right:
+            candidates = [(s, "original") for s in only_left] + [(s, "convertida") for s in only_right]
+            string, only_in = min(candidates)
+            return {"equivalent": False, "max_len": max_len, "string": string, "only_in": only_in}
+    return {"equivalent": True, "max_len": max_len, "string": None, "only_in": None}
+
+# Compara dos gramáticas longitud por longitud y devuelve el primer contraejemplo
+def check_equivalence(original, converted, start, max_len=10, max_strings=MAX_STRINGS, progress=None):
+    reference = reference_language(original, start, max_len, max_strings, progress)
+    return compare_language(reference, converted, start, max_len, max_strings, progress)
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica por longitudes acotadas que las conversiones preserven el lenguaje.")
+    parser.add_argument("archivo", help="archivo con la gramática")
+    parser.add_argument("--inicial", default="S", help="símbolo inicial")
+    parser.add_argument("--max-len", type=int, default=10, help="longitud máxima de cadena a comparar")
+    parser.add_argument("--impl", default="grammar", help="módulo con la implementación a verificar (grammar, main1, main3)")
+    args = parser.parse_args()
+    impl = importlib.import_module(args.impl)
+    with open(args.archivo, encoding="utf-8") as f:
+        original = impl.parse_grammar(f.read())
+    start = args.inicial
+    converted = {
+        "bien_formada": impl.remove_useless(impl.remove_unit(impl.remove_epsilon(original, start), start), start),
+        "chomsky": impl.to_cnf(original, start),
+        "greibach": impl.to_gnf(original, start),
+    }
+    reference = reference_language(original, start, args.max_len)
+    for name, grammar in converted.items():
+        if grammar is None:
+            print(f"{name}: no implementada")
+            continue
+        result = compare_language(reference, grammar, start, args.max_len)
+        if result["equivalent"] is None:
+            print(f"{name}: no concluyente (el lenguaje excede {MAX_STRINGS} cadenas por longitud)")
+        elif result["equivalent"]:
+            print(f"{name}: mismo lenguaje hasta longitud {args.max_len}")
+        else:
+            shown = result["string"] or "ε"
+            print(f"{name}: '{shown}' (longitud {len(result['string'])}) solo la genera la gramática {result['only_in']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from math import comb
+from grammar import find_nullable
+
+# Límite de reglas estimadas por etapa antes de rechazar u omitir la etapa
+DEFAULT_BUDGET = {"bien_formada": 200_000, "chomsky": 200_000, "greibach": 200_000}
+
+# Grafo de símbolos iniciales: A -> B si alguna producción de A puede empezar por B
+# (B aparece en el prefijo anulable de la producción)
+def leading_graph(grammar, nullable=None):
+    if nullable is None:
+        nullable = find_nullable(grammar)
+    graph = {}
+    for head, prods in grammar.items():
+        leads = set()
+        for prod in prods:
+            if prod == '*':
+                continue
+            for s in prod:
+                if s in grammar:
+                    leads.add(s)
+                if s not in nullable:
+                    break
+        graph[head] = leads
+    return graph
+
+def _reach(graph, head):
+    seen = {head}
+    stack = [head]
+    while stack:
+        cur = stack.pop()
+        for nxt in graph.get(cur, ()):
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return seen
+
+# Tamaño aproximado de cada etapa, en reglas. Es una heurística, no una cota: sigue la
+# forma de cada transformación pero no cuenta todo lo que agregan (no terminales nuevos de
+# la FNC, restos de la eliminación de recursividad izquierda), así que el resultado real
+# puede ser mayor. Sirve para ordenar gramáticas y frenar las que explotan, no para prometer
+# un tamaño.
+def estimate_conversion(grammar, start):
+    nullable = find_nullable(grammar)
+    # Si el inicial es anulable, las tres formas conservan S -> ε
+    start_epsilon = 1 if start in nullable else 0
+    terminals = {s for prods in grammar.values() for prod in prods if prod != '*' for s in prod if s not in grammar}
+
+    # Paso 1: remove_epsilon genera 2^k variantes por regla con k símbolos anulables
+    epsilon = {}
+    cnf_cost = {}
+    for head, prods in grammar.items():
+        epsilon[head] = 0
+        cnf_cost[head] = 0
+        for prod in prods:
+            if prod == '*':
+                continue
+            k = sum(1 for s in prod if s in nullable)
+            epsilon[head] += 1 << k
+            # Binarización: una variante de longitud m produce 1 + (m - 2) reglas
+            cnf_cost[head] += sum(comb(k, j) * (1 + max(0, len(prod) - j - 2)) for j in range(k + 1))
+
+    # Paso 2: remove_unit copia en A las reglas de cada B alcanzable por producciones unitarias
+    unit_graph = {}
+    for head, prods in grammar.items():
+        targets = set()
+        for prod in prods:
+            if prod == '*':
+                continue
+            for i, s in enumerate(prod):
+                if s in grammar and all(o in nullable for j, o in enumerate(prod) if j != i):
+                    targets.add(s)
+        unit_graph[head] = targets
+    reach = {head: _reach(unit_graph, head) for head in grammar}
+    unit = {head: sum(epsilon[b] for b in reach[head]) for head in grammar}
+
+    # Paso 3: expand_prod multiplica las alternativas a lo largo de la cadena
+    # de no terminales iniciales; la recursividad izquierda duplica las reglas
+    leads = leading_graph(grammar, nullable)
+    left_recursive = {head for head in grammar if head in leads[head]}
+    indirect = {head for head in grammar if head not in left_recursive
+                and any(head in _reach(leads, b) for b in leads[head])}
+    after_left_rec = {head: unit[head] * (2 if head in left_recursive else 1) for head in grammar}
+    gnf_raw = {}
+    for head, prods in grammar.items():
+        gnf_raw[head] = 0
+        for prod in prods:
+            if prod == '*':
+                continue
+            k = sum(1 for s in prod if s in nullable)
+            chain = 1
+            for s in prod:
+                if s not in grammar:
+                    break
+                chain *= max(after_left_rec[s], 1)
+            gnf_raw[head] += (1 << k) * chain
+    greibach = len(terminals) + start_epsilon
+    for head in grammar:
+        factor = 2 if head in left_recursive else 1
+        greibach += factor * sum(gnf_raw[b] for b in reach[head])
+        if head in left_recursive:
+            greibach += 2 * unit[head]
+
+    return {
+        "nullable": len(nullable),
+        "epsilon": sum(epsilon.values()),
+        "bien_formada": sum(unit.values()) + start_epsilon,
+        "chomsky": sum(sum(cnf_cost[b] for b in reach[head]) for head in grammar) + len(terminals) + start_epsilon,
+        "greibach": greibach,
+        "left_recursive": left_recursive,
+        "indirect_left_recursive": indirect,
+    }
+
+# Devuelve (rechazada, etapas_omitidas). Si la gramática bien formada excede el
+# presupuesto se rechaza todo, porque Chomsky y Greibach dependen de ella.
+def plan_conversion(estimate, budget=None):
+    if budget is None:
+        budget = DEFAULT_BUDGET
+    over = [stage for stage in ("bien_formada", "chomsky", "greibach") if estimate[stage] > budget[stage]]
+    if "bien_formada" in over:
+        return True, over
+    return False, over
+
+def format_estimate(n):
+    if n < 1_000_000:
+        return f"{n:,}"
+    return f"~10^{len(str(n)) - 1}"
@@ -0,0 +1,74 @@
+import gzip
+import io
+import json
+
+# Bytes acumulados antes de escribir un bloque en el archivo de salida
+CHUNK_SIZE = 64 * 1024
+
+def _text_lines(grammar):
+    for head, prods in grammar.items():
+        yield f"{head} -> {' | '.join(prods)}\n"
+
+# Una regla por línea: el cuerpo es la lista de símbolos (vacía para ε)
+def _jsonl_lines(grammar):
+    for head, prods in grammar.items():
+        for prod in prods:
+            body = [] if prod == '*' else list(prod)
+            yield json.dumps({"head": head, "body": body}, ensure_ascii=False) + "\n"
+
+def _bnf_symbol(s, grammar):
+    if s in grammar or s.isupper():
+        return f"<{s}>"
+    return json.dumps(s, ensure_ascii=False)
+
+def _bnf_lines(grammar):
+    for head, prods in grammar.items():
+        alternatives = []
+        for prod in prods:
+            if prod == '*':
+                alternatives.append('""')
+            else:
+                alternatives.append(" ".join(_bnf_symbol(s, grammar) for s in prod))
+        yield f"<{head}> ::= {' | '.join(alternatives)}\n"
+
+# formato: (descripción, generador de líneas, extensión, tipo MIME)
+EXPORT_FORMATS = {
+    "txt": ("Texto", _text_lines, "txt", "text/plain"),
+    "jsonl": ("JSON Lines", _jsonl_lines, "jsonl", "application/jsonl"),
+    "bnf": ("BNF", _bnf_lines, "bnf", "text/plain"),
+}
+
+# Escribe la gramática en un archivo binario por bloques, sin armar el texto completo
+def write_grammar(grammar, out, fmt="txt", compress=False):
+    lines = EXPORT_FORMATS[fmt][1]
+    target = gzip.GzipFile(fileobj=out, mode="wb", mtime=0) if compress else out
+    try:
+        chunk = []
+        size = 0
+        for line in lines(grammar):
+            data = line.encode("utf-8")
+            chunk.append(data)
+            size += len(data)
+            if size >= CHUNK_SIZE:
+                target.write(b"".join(chunk))
+                chunk = []
+                size = 0
+        if chunk:
+            target.write(b"".join(chunk))
+    finally:
+        if compress:
+            target.close()
+
+# Contenido completo del archivo exportado. st.download_button lo pide recién al hacer clic
+# y de todos modos lo carga entero en memoria, así que no hace falta un archivo en disco.
+def export_grammar(grammar, fmt="txt", compress=False):
+    out = io.BytesIO()
+    write_grammar(grammar, out, fmt, compress)
+    return out.getvalue()
+
+def export_file_name(base, fmt="txt", compress=False):
+    name = f"{base}.{EXPORT_FORMATS[fmt][2]}"
+    return name + ".gz" if compress else name
+
+def export_mime(fmt="txt", compress=False):
+    return "application/gzip" if compress else EXPORT_FORMATS[fmt][3]
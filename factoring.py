@@ -0,0 +1,71 @@
+from symbols import ASCII_UPPER, EXTRA_UPPER
+
+# Cantidad de reglas y factor de ramificación medio: para cada par (cabeza, terminal
+# inicial), cuántas alternativas de la cabeza comienzan con ese terminal
+def branching_stats(grammar):
+    rules = 0
+    groups = {}
+    for head, prods in grammar.items():
+        rules += len(prods)
+        for prod in prods:
+            if prod != '*' and prod[0] not in grammar:
+                groups[(head, prod[0])] = groups.get((head, prod[0]), 0) + 1
+    average = sum(groups.values()) / len(groups) if groups else 0.0
+    return rules, average
+
+class _Node:
+    __slots__ = ("children", "end")
+
+    def __init__(self):
+        self.children = {}
+        self.end = False
+
+# Factorización por la izquierda con un trie de prefijos por cabeza: cada nodo con más
+# de una salida se convierte en un no terminal nuevo y las cadenas de nodos con una
+# sola salida se comprimen en un único prefijo. Los restos iguales comparten no terminal.
+def left_factor(grammar):
+    used = set(grammar)
+    for prods in grammar.values():
+        for prod in prods:
+            used.update(prod)
+    pool = (c for c in list(ASCII_UPPER) + EXTRA_UPPER if c not in used)
+    result = {}
+    shared = {}
+
+    def fresh():
+        symbol = next(pool, None)
+        if symbol is None:
+            raise ValueError("No hay símbolos frescos disponibles para factorizar.")
+        return symbol
+
+    def emit(node):
+        alternatives = []
+        for symbol, child in node.children.items():
+            prefix = symbol
+            while not child.end and len(child.children) == 1:
+                (symbol, child), = child.children.items()
+                prefix += symbol
+            rest = emit(child)
+            if len(rest) == 1:
+                alternatives.append(prefix + rest[0])
+                continue
+            key = tuple(rest)
+            if key not in shared:
+                shared[key] = fresh()
+                result[shared[key]] = [p or '*' for p in rest]
+            alternatives.append(prefix + shared[key])
+        if node.end:
+            alternatives.append("")
+        return alternatives
+
+    for head, prods in grammar.items():
+        root = _Node()
+        for prod in prods:
+            node = root
+            if prod != '*':
+                for symbol in prod:
+                    node = node.children.setdefault(symbol, _Node())
+            node.end = True
+        result[head] = [p or '*' for p in emit(root)]
+    # Las cabezas originales primero, en su orden; luego los no terminales nuevos
+    return {head: result[head] for head in list(grammar) + [h for h in result if h not in grammar]}
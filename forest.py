@@ -0,0 +1,109 @@
+from cyk import IncrementalCYK
+
+# Bosque compartido y empaquetado (SPPF) sobre la FNC. Cada nodo es (A, i, j) y aparece
+# una sola vez; sus alternativas empaquetadas son tuplas de hijos: otro nodo (B, i, k)
+# o un terminal. Hay O(n²·|N|) nodos con O(n) alternativas cada uno, así que el tamaño
+# es polinomial aunque la cantidad de árboles sea exponencial.
+class Forest:
+    def __init__(self, root, nodes, helpers):
+        self.root = root
+        self.nodes = nodes
+        self.helpers = helpers
+
+    def size(self):
+        return len(self.nodes), sum(len(alternatives) for alternatives in self.nodes.values())
+
+def parse_forest(cnf, start, text, original=None):
+    recognizer = IncrementalCYK(cnf, start)
+    recognizer.extend(text)
+    if not recognizer.accepts():
+        return None
+    # Los no terminales que to_cnf agregó (ausentes en la original) se disuelven en su padre
+    helpers = set(cnf) - set(original) if original is not None else set()
+    columns = recognizer.columns
+    n = len(text)
+    root = (start, 0, n)
+    if n == 0:
+        return Forest(root, {root: [()]}, helpers)
+    binary = {}
+    for head, prods in cnf.items():
+        for prod in prods:
+            if len(prod) == 2:
+                binary.setdefault(head, []).append((prod[0], prod[1]))
+    nodes = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node in nodes:
+            continue
+        A, i, j = node
+        alternatives = []
+        if j == i + 1 and text[i] in cnf[A]:
+            alternatives.append((text[i],))
+        for B, C in binary.get(A, ()):
+            # Posibles cortes k: inicios de C que terminan en j, con B cubriendo (i, k)
+            cuts = columns[j].get(C, 0) >> (i + 1)
+            k = i + 1
+            while cuts:
+                if cuts & 1 and columns[k].get(B, 0) >> i & 1:
+                    left, right = (B, i, k), (C, k, j)
+                    alternatives.append((left, right))
+                    stack.append(left)
+                    stack.append(right)
+                cuts >>= 1
+                k += 1
+        nodes[node] = alternatives
+    return Forest(root, nodes, helpers)
+
+# Cantidad exacta de árboles sin enumerarlos: suma de productos con memoria, en orden
+# de intervalos crecientes para no depender de la recursión
+def count_trees(forest):
+    counts = {}
+    for node in sorted(forest.nodes, key=lambda key: key[2] - key[1]):
+        total = 0
+        for alternative in forest.nodes[node]:
+            product = 1
+            for child in alternative:
+                if isinstance(child, tuple):
+                    product *= counts[child]
+            total += product
+        counts[node] = total
+    return counts[forest.root]
+
+def _children(forest, alternative):
+    # Cada hijo da una lista de árboles-secuencia: los ayudantes aportan sus propios hijos
+    if not alternative:
+        yield []
+        return
+    first, rest = alternative[0], alternative[1:]
+    for head in _expand(forest, first):
+        for tail in _children(forest, rest):
+            yield head + tail
+
+def _expand(forest, child):
+    if not isinstance(child, tuple):
+        yield [child]
+        return
+    for tree in _trees(forest, child):
+        if child[0] in forest.helpers:
+            yield tree[1]
+        else:
+            yield [tree]
+
+def _trees(forest, node):
+    for alternative in forest.nodes[node]:
+        for children in _children(forest, alternative):
+            yield (node[0], children)
+
+# Generador perezoso: produce un árbol a la vez como (no terminal, [hijos]), con los
+# terminales como cadenas y sin los no terminales auxiliares de to_cnf
+def iter_trees(forest):
+    return _trees(forest, forest.root)
+
+def format_tree(tree):
+    if isinstance(tree, str):
+        return tree
+    label, children = tree
+    if not children:
+        return f"{label}(ε)"
+    return f"{label}({' '.join(format_tree(child) for child in children)})"
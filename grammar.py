@@ -0,0 +1,529 @@
+from collections import defaultdict
+import multiprocessing
+import pickle
+import re
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from symbols import ASCII_UPPER, EXTRA_UPPER
+sys.setrecursionlimit(10000)
+
+# Peso opcional al final de una alternativa, separado por un espacio: S -> aB [0.7]
+WEIGHT_PATTERN = re.compile(r"\s\[\s*((?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*\]$")
+
+# Si se pasa weights, se llena con los pesos escritos como {(cabeza, producción): peso};
+# las reglas sin peso no aparecen. Los pesos se quitan del texto de la producción siempre.
+def parse_grammar(input_text, weights=None):
+    grammar = defaultdict(list)
+    input_text = input_text.replace("→", "->").replace("ε", "*")
+    for line in input_text.strip().split('\n'):
+        if '->' in line:
+            head, prods = line.split('->')
+            head = head.strip()
+            for prod in prods.split('|'):
+                prod = prod.strip()
+                match = WEIGHT_PATTERN.search(prod)
+                if match:
+                    prod = prod[:match.start()].strip()
+                    if weights is not None:
+                        weights[(head, prod)] = weights.get((head, prod), 0.0) + float(match.group(1))
+                grammar[head].append(prod)
+    return dict(grammar)
+
+def find_nullable(grammar):
+    nullable = set()
+    changed = True
+    while changed:
+        changed = False
+        for head, prods in grammar.items():
+            for p in prods:
+                if p == '*' or all(symbol in nullable for symbol in p):
+                    if head not in nullable:
+                        nullable.add(head)
+                        changed = True
+    return nullable
+
+def remove_epsilon(grammar, start, progress=None):
+    nullable = find_nullable(grammar)
+    new_grammar = defaultdict(list)
+    produced = 0
+    for head, prods in grammar.items():
+        for prod in prods:
+            if prod != '*':
+                indices = [i for i, s in enumerate(prod) if s in nullable]
+                for mask in range(1 << len(indices)):
+                    if progress is not None and mask & 1023 == 0:
+                        progress("remove_epsilon", produced)
+                    s = list(prod)
+                    for bit, idx in enumerate(indices):
+                        if mask & (1 << bit):
+                            s[idx] = ''
+                    new_prod = ''.join(c for c in s if c)
+                    if new_prod:
+                        new_grammar[head].append(new_prod)
+                        produced += 1
+                    else:
+                        if head == start:
+                            new_grammar[head].append('*')
+            else:
+                pass
+    if start in nullable and '*' not in new_grammar[start]:
+        new_grammar[start].append('*')
+    return {h: list(set(ps)) for h, ps in new_grammar.items()}
+
+def remove_unit(grammar, start, progress=None):
+    new_grammar = defaultdict(list)
+    produced = 0
+    for head in grammar:
+        if progress is not None:
+            progress("remove_unit", produced)
+        stack = [head]
+        seen = set(stack)
+        while stack:
+            cur = stack.pop()
+            for prod in grammar[cur]:
+                if prod in grammar:
+                    if prod not in seen:
+                        seen.add(prod)
+                        stack.append(prod)
+                else:
+                    new_grammar[head].append(prod)
+        new_grammar[head] = list(set(new_grammar[head]))
+        produced += len(new_grammar[head])
+    return dict(new_grammar)
+
+# No terminales alcanzables desde el inicial y productivos, sin reconstruir la gramática
+def useful_symbols(grammar, start):
+    reachable = set([start])
+    stack = [start]
+    while stack:
+        head = stack.pop()
+        for prod in grammar.get(head, []):
+            for s in prod:
+                if s.isupper() and s not in reachable:
+                    reachable.add(s)
+                    stack.append(s)
+    productive = set()
+    changed = True
+    while changed:
+        changed = False
+        for head, prods in grammar.items():
+            if head in productive:
+                continue
+            for prod in prods:
+                if all((not c.isupper()) or c in productive for c in prod):
+                    productive.add(head)
+                    changed = True
+                    break
+    return reachable & productive
+
+def remove_useless(grammar, start, progress=None):
+    if progress is not None:
+        progress("remove_useless", 0)
+    valid = useful_symbols(grammar, start)
+    return {h: [p for p in prods if all((not c.isupper()) or c in valid for c in p)]
+            for h, prods in grammar.items() if h in valid}
+
+def to_cnf(grammar, start, progress=None):
+    G = remove_unit(remove_epsilon(remove_useless(grammar, start, progress), start, progress), start, progress)
+    # Una cabeza que solo derivaba ε queda sin reglas pero sigue en los cuerpos (S -> BB, B -> ε)
+    G = remove_useless(G, start, progress)
+    return cnf_from_clean(G, start, progress)
+
+# Pasos propios de la FNC sobre una gramática que ya no tiene producciones ε ni unitarias
+def cnf_from_clean(G, start, progress=None):
+    # Los no terminales nuevos nunca repiten un símbolo de la gramática ni entre sí:
+    # primero las letras de siempre (D y C para a y b, F a K para el resto), después
+    # cualquier mayúscula libre
+    used = set(G) | {c for prods in G.values() for prod in prods for c in prod}
+    candidates = (c for c in list("FGHIJK" + ASCII_UPPER) + EXTRA_UPPER if c not in used)
+
+    def fresh(preferred=None):
+        symbol = preferred if preferred is not None and preferred not in used else next(candidates, None)
+        while symbol in used:
+            symbol = next(candidates, None)
+        if symbol is None:
+            raise ValueError("No hay símbolos libres para los no terminales nuevos de la FNC.")
+        used.add(symbol)
+        return symbol
+
+    mapping = {}
+    cnf = defaultdict(list)
+    for head, prods in G.items():
+        if progress is not None:
+            progress("to_cnf", len(cnf))
+        for prod in prods:
+            if prod != '*':
+                if len(prod) > 1:
+                    new_prod = []
+                    for c in prod:
+                        if not (c in G or c.isupper()):
+                            if c not in mapping:
+                                mapping[c] = fresh({'a': 'D', 'b': 'C'}.get(c))
+                                cnf[mapping[c]] = [c]
+                            new_prod.append(mapping[c])
+                        else:
+                            new_prod.append(c)
+                    cnf[head].append(''.join(new_prod))
+                else:
+                    cnf[head].append(prod)
+            else:
+                if head == start:
+                    cnf[head].append('*')
+    final_cnf = defaultdict(list)
+    split_mapping = {}
+
+    # A -> X1 X2 ... Xn queda A -> X1 Y con Y -> X2 ... Xn partido igual; los sufijos
+    # repetidos comparten su no terminal
+    def split(prod):
+        if len(prod) <= 2:
+            return prod
+        rest = prod[1:]
+        if rest not in split_mapping:
+            if progress is not None:
+                progress("to_cnf", len(final_cnf))
+            X = fresh()
+            split_mapping[rest] = X
+            final_cnf[X] = [split(rest)]
+        return prod[0] + split_mapping[rest]
+
+    for head, prods in cnf.items():
+        if progress is not None:
+            progress("to_cnf", len(final_cnf))
+        for prod in prods:
+            final_cnf[head].append(prod if prod == '*' else split(prod))
+    return {h: list(set(ps)) for h, ps in final_cnf.items()}
+def to_gnf(grammar, start, progress=None, workers=None):
+    # Notifica la etapa en curso; el callback puede lanzar una excepción para cancelar
+    def report(stage, produced):
+        if progress is not None:
+            progress(stage, produced)
+
+    # Función auxiliar: devuelve una letra mayúscula (de "A" a "Z") que no esté en used
+    def get_fresh_symbol(used, candidates="ABCDEFGHIJKLMNOPQRSTUVWXYZ"):
+        for c in candidates:
+            if c not in used:
+                used.add(c)
+                return c
+        raise Exception("No hay símbolos frescos disponibles.")
+
+    ##############################
+    # Paso 1: Eliminación de ε
+    ##############################
+    def remove_epsilon_local(gram, start):
+        nullable = set()
+        change = True
+        while change:
+            change = False
+            for A, prods in gram.items():
+                for prod in prods:
+                    if prod == "*" or all(ch in nullable for ch in prod):
+                        if A not in nullable:
+                            nullable.add(A)
+                            change = True
+        new_gram = {}
+        from itertools import product
+        for A, prods in gram.items():
+            new_set = set()
+            for prod in prods:
+                if prod == "*":
+                    continue
+                indices = [i for i, ch in enumerate(prod) if ch in nullable]
+                for n, mask in enumerate(product([0,1], repeat=len(indices))):
+                    if n & 1023 == 0:
+                        report("to_gnf: epsilon", len(new_set))
+                    lst = list(prod)
+                    for j, bit in enumerate(mask):
+                        if bit:
+                            lst[indices[j]] = ""
+                    cand = "".join(lst)
+                    if cand == "":
+                        cand = "*"
+                    new_set.add(cand)
+            if A == start and "*" in gram.get(A, []):
+                new_set.add("*")
+            new_gram[A] = list(new_set)
+        return new_gram
+
+    ##############################
+    # Paso 2: Eliminación de producciones unitarias
+    ##############################
+    def remove_unit_local(gram):
+        new_gram = {}
+        for A in gram:
+            new_prods = set()
+            stack = [A]
+            visited = {A}
+            while stack:
+                B = stack.pop()
+                for prod in gram[B]:
+                    if len(prod) == 1 and prod.isupper():
+                        if prod not in visited:
+                            visited.add(prod)
+                            stack.append(prod)
+                    else:
+                        new_prods.add(prod)
+            new_gram[A] = list(new_prods)
+        return new_gram
+
+    ##############################
+    # Paso 3: Eliminación de símbolos inútiles
+    ##############################
+    def remove_useless_local(gram, start):
+        reachable = {start}
+        change = True
+        while change:
+            change = False
+            for A in list(reachable):
+                for prod in gram.get(A, []):
+                    for ch in prod:
+                        if ch.isupper() and ch not in reachable:
+                            reachable.add(ch)
+                            change = True
+        productive = set()
+        change = True
+        while change:
+            change = False
+            for A, prods in gram.items():
+                for prod in prods:
+                    if all((not c.isupper()) or c in productive for c in prod):
+                        if A not in productive:
+                            productive.add(A)
+                            change = True
+        valid = reachable & productive
+        return {A: [p for p in prods if all((not c.isupper()) or c in valid for c in p)]
+                for A, prods in gram.items() if A in valid}
+
+    ##############################
+    # Paso 4: Eliminación de recursividad izquierda inmediata
+    # Se separa para cada no terminal A:
+    #   nonrec = {p que no comienzan con A}
+    #   rec    = {p[1:] para las producciones de la forma A -> Aα}
+    # Si rec no es vacío se introduce un nuevo no terminal (con símbolo de longitud 1)
+    ##############################
+    def remove_left_rec_all(gram):
+        new_gram = {}
+        # Para elegir nuevos símbolos, empezamos con los usados presentes en la gramática
+        used = set(gram.keys())
+        for A in gram:
+            rec = []
+            nonrec = []
+            for prod in gram[A]:
+                if prod != "*" and prod and prod[0] == A:
+                    rec.append(prod[1:])
+                else:
+                    nonrec.append(prod)
+            if rec:
+                X = get_fresh_symbol(used)  # nuevo no terminal (una única letra)
+                new_rules_A = nonrec + [beta + X for beta in nonrec if beta != "*"]
+                new_rules_X = rec + [gamma + X for gamma in rec]
+                new_gram[A] = list(set(new_rules_A))
+                new_gram[X] = list(set(new_rules_X))
+            else:
+                new_gram[A] = gram[A]
+        return new_gram
+
+    ##############################
+    # Paso 5: Expansión recursiva (ver expand_prod y expand_all a nivel de módulo)
+    ##############################
+
+    ##############################
+    # Paso 6: Corrección de producciones (terminales en posiciones > 0)
+    # Cada producción debe quedar en la forma aV, donde "a" es terminal.
+    # Si en algún lugar (después del primero) aparece un terminal, se sustituye por un no terminal nuevo de longitud 1.
+    ##############################
+    def fix_trailing_prods(gram):
+        # Usaremos un conjunto para símbolos ya asignados; para nuevos símbolos se escogerá de "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        used = set(gram.keys())
+        mapping = {}  # mapea terminal -> no terminal (letra única)
+        def get_fresh(mapping):
+            return get_fresh_symbol(used)
+        fixed_gram = {}
+        for A, prods in gram.items():
+            fixed = set()
+            for prod in prods:
+                if prod == "*" or len(prod) == 1:
+                    fixed.add(prod)
+                else:
+                    new_prod = prod[0]  # el primer símbolo se deja
+                    for ch in prod[1:]:
+                        if ch.islower():
+                            if ch not in mapping:
+                                mapping[ch] = get_fresh(mapping)
+                            new_prod += mapping[ch]
+                        else:
+                            new_prod += ch
+                    fixed.add(new_prod)
+            fixed_gram[A] = list(fixed)
+        # Agregar las reglas de los nuevos no terminales: X -> t
+        for t, X in mapping.items():
+            fixed_gram[X] = [t]
+        return fixed_gram
+
+    # -------------------------------
+    # Aplicación secuencial de los pasos generales
+    # -------------------------------
+    gram1 = remove_epsilon_local(grammar, start)
+    report("to_gnf: unit", 0)
+    gram2 = remove_unit_local(gram1)
+    gram3 = remove_useless_local(gram2, start)
+    gram4 = remove_left_rec_all(gram3)
+    expanded = expand_all(gram4, progress, workers)
+    report("to_gnf: fix_trailing_prods", sum(len(prods) for prods in expanded.values()))
+    final = fix_trailing_prods(expanded)
+    return final
+
+##############################
+# Paso 5 de to_gnf: expansión recursiva para que cada producción inicie con un terminal.
+# Si una producción comienza con un no terminal se expande usando sus producciones.
+# Está a nivel de módulo para poder ejecutarse en procesos trabajadores.
+##############################
+def expand_prod(prod, gram, progress=None):
+    if prod == "*" or (prod and prod[0].islower()):
+        return {prod}
+    results = set()
+    B = prod[0]
+    suffix = prod[1:]
+    tails = expand_prod(suffix, gram, progress) if suffix else {""}
+    for gamma in gram.get(B, []):
+        if progress is not None:
+            progress("to_gnf: expand_prod", len(results))
+        for t in tails:
+            results.add(gamma + t)
+    return results
+
+# Las expansiones de cada cabeza se ordenan para que el resultado no dependa del
+# orden de iteración de los conjuntos (que cambia entre procesos)
+def expand_head(prods, gram, progress=None):
+    exp_set = set()
+    for prod in prods:
+        exp_set |= expand_prod(prod, gram, progress)
+    return sorted(exp_set)
+
+class ExpansionCancelled(Exception):
+    pass
+
+# Un solo pool para todas las conversiones del proceso: se crea la primera vez que hace
+# falta (o cuando cambia la cantidad de procesos) y lo usa una expansión a la vez. Con la
+# marca de cancelación puesta, los procesos cortan la cabeza que están expandiendo y
+# descartan las tareas pendientes.
+_expand_pool = None
+_expand_pool_size = None
+_expand_cancel = None
+_expand_lock = threading.Lock()
+# Cada cuánto el proceso principal revisa la cancelación mientras espera a los procesos
+EXPAND_POLL_INTERVAL = 0.2
+
+# En cada proceso: la gramática de la expansión en curso, por nombre de segmento
+_expand_worker_grammar = (None, None)
+
+def _init_expand_worker(cancel):
+    global _expand_cancel
+    _expand_cancel = cancel
+
+# La gramática de solo lectura se deserializa una vez por proceso y por expansión: las
+# tareas llevan solo el nombre del segmento compartido y sus cabezas
+def _expand_grammar(name):
+    global _expand_worker_grammar
+    if _expand_worker_grammar[0] != name:
+        segment = shared_memory.SharedMemory(name=name)
+        try:
+            gram = pickle.loads(segment.buf)
+        finally:
+            segment.close()
+        _expand_worker_grammar = (name, gram)
+    return _expand_worker_grammar[1]
+
+def _check_expand_cancel(stage, produced):
+    if _expand_cancel.is_set():
+        raise ExpansionCancelled()
+
+def _expand_heads(task):
+    name, heads = task
+    gram = _expand_grammar(name)
+    results = []
+    for A in heads:
+        _check_expand_cancel("to_gnf: expand_prod", 0)
+        results.append(expand_head(gram[A], gram, _check_expand_cancel))
+    return results
+
+def _expansion_pool(workers):
+    global _expand_pool, _expand_pool_size, _expand_cancel
+    if _expand_pool is not None and _expand_pool_size != workers:
+        _expand_pool.terminate()
+        _expand_pool.join()
+        _expand_pool = None
+    if _expand_pool is None:
+        # Los procesos heredan el resource_tracker del principal: adjuntar el segmento no
+        # lo registra en un rastreador propio que luego lo daría por perdido
+        resource_tracker.ensure_running()
+        context = multiprocessing.get_context("fork")
+        _expand_cancel = context.Event()
+        _expand_pool = context.Pool(workers, initializer=_init_expand_worker, initargs=(_expand_cancel,))
+        _expand_pool_size = workers
+    return _expand_pool
+
+def expand_all(gram, progress=None, workers=None):
+    heads = list(gram)
+    expanded = {}
+    produced = 0
+    if not workers or workers <= 1 or len(heads) < 2:
+        for A in heads:
+            if progress is not None:
+                progress("to_gnf: expand_prod", produced)
+            expanded[A] = expand_head(gram[A], gram, progress)
+            produced += len(expanded[A])
+        return expanded
+    size = max(1, len(heads) // (workers * 4))
+    chunks = [heads[i:i + size] for i in range(0, len(heads), size)]
+    # Mientras espera, sea el pool o un resultado, sigue avisando para poder cancelar
+    while not _expand_lock.acquire(timeout=EXPAND_POLL_INTERVAL):
+        if progress is not None:
+            progress("to_gnf: expand_prod", produced)
+    segment = None
+    try:
+        pool = _expansion_pool(workers)
+        data = pickle.dumps(gram, protocol=pickle.HIGHEST_PROTOCOL)
+        segment = shared_memory.SharedMemory(create=True, size=len(data))
+        segment.buf[:len(data)] = data
+        # imap conserva el orden de las tareas: la unión es determinista
+        pending = pool.imap(_expand_heads, [(segment.name, part) for part in chunks])
+        try:
+            for part in chunks:
+                while True:
+                    try:
+                        results = pending.next(EXPAND_POLL_INTERVAL)
+                        break
+                    except multiprocessing.TimeoutError:
+                        if progress is not None:
+                            progress("to_gnf: expand_prod", produced)
+                for A, prods in zip(part, results):
+                    expanded[A] = prods
+                    produced += len(prods)
+                if progress is not None:
+                    progress("to_gnf: expand_prod", produced)
+        except BaseException:
+            # Antes de liberar el pool, sus procesos terminan de descartar esta expansión
+            _expand_cancel.set()
+            for _ in chunks:
+                try:
+                    pending.next()
+                except StopIteration:
+                    break
+                except Exception:
+                    pass
+            raise
+    finally:
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+        if _expand_cancel is not None:
+            _expand_cancel.clear()
+        _expand_lock.release()
+    return expanded
+
+def grammar_to_text(grammar):
+    result = []
+    for head, prods in grammar.items():
+        result.append(f"{head} -> {' | '.join(prods)}")
+    return "\n".join(result)
@@ -0,0 +1,270 @@
+import os
+import threading
+import time
+from grammar import parse_grammar, to_gnf
+from equivalence import reference_language, compare_language
+from minimize import minimize_grammar, grammar_size
+from ll1 import build_ll1_table
+from lalr import build_lalr_tables
+from passes import run_pipeline, WELL_FORMED, CHOMSKY
+from factoring import left_factor, branching_stats
+from regular import compile_regular
+from ambiguity import find_ambiguity, search_length
+from sandbox import CPULimitExceeded
+from pcfg import compile_tables, to_weighted_cnf, weighted_grammar_to_text
+
+class ConversionCancelled(Exception):
+    pass
+
+# Longitud máxima de cadena en la búsqueda de ambigüedad y cadenas por longitud que se
+# guardan; con alfabetos grandes la longitud se acorta (ambiguity.search_length)
+AMBIGUITY_MAX_LEN = 15
+AMBIGUITY_MAX_STRINGS = 20_000
+
+# A partir de cuántos no terminales la expansión de Greibach se reparte entre procesos
+GNF_PARALLEL_MIN_HEADS = 8
+
+# Estado que un proceso de trabajo devuelve al terminar la conversión
+RESULT_FIELDS = ("stored", "computed", "timings", "results", "factored", "sizes", "checks",
+                 "passes", "properties", "ll1", "lalr", "regular", "ambiguity", "weighted", "error", "phases")
+# Lo que el proceso de trabajo publica a medida que termina cada etapa: de los diccionarios
+# por etapa, cada entrada nueva; del resto, el valor cuando cambia
+STAGE_FIELDS = ("stored", "computed", "timings", "results", "factored", "sizes", "checks", "passes", "properties")
+VALUE_FIELDS = ("ll1", "lalr", "regular", "ambiguity", "weighted")
+
+class ConversionJob:
+    # Ejecuta la conversión en un hilo aparte; la UI solo lee su estado. Con pool, el hilo
+    # solo espera a que un proceso de trabajo aislado haga la conversión.
+    def __init__(self, input_text, start, skip=(), minimize=False, factor=(), store=None, pool=None,
+                 parallel=True, progress=None, publish=None):
+        self.input_text = input_text
+        self.start_symbol = start
+        self.skip = list(skip)
+        self.minimize = minimize
+        self.factor = list(factor)
+        self.store = store
+        self.pool = pool
+        self.parallel = parallel
+        self.progress = progress
+        self.publish = publish
+        self._published = {}
+        # Etapas sin minimizar tal como salen de la conversión, con su tiempo
+        self.stored = {}
+        self.computed = {}
+        self.timings = {}
+        self.results = {}
+        self.factored = {}
+        self.sizes = {}
+        self.checks = {}
+        # Registro del gestor de pasadas por etapa y propiedades de la gramática resultante
+        self.passes = {}
+        self.properties = {}
+        self.ll1 = None
+        self.lalr = None
+        self.regular = None
+        self.ambiguity = None
+        # Tablas de la FNC ponderada si la gramática trae pesos (S -> aB [0.7])
+        self.weighted = None
+        self.stage = None
+        self.produced = 0
+        # Segundos acumulados por etapa informada, desde su primer aviso hasta el siguiente cambio
+        self.phases = {}
+        self._stage_started = None
+        self.error = None
+        self.cancelled = False
+        self.done = False
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def report(self, stage, produced):
+        # Punto de cancelación cooperativa: se llama desde los bucles de cada etapa
+        if self._cancel_event.is_set():
+            raise ConversionCancelled()
+        if stage != self.stage:
+            self._close_phase()
+            self._publish()
+        self.stage = stage
+        self.produced = produced
+        if self.progress is not None:
+            self.progress(stage, produced)
+
+    def _close_phase(self):
+        now = time.perf_counter()
+        if self.stage is not None and self._stage_started is not None:
+            self.phases[self.stage] = self.phases.get(self.stage, 0.0) + now - self._stage_started
+        self._stage_started = now
+
+    def _minimized(self, key, grammar):
+        if not self.minimize:
+            return grammar
+        self.report("minimize_grammar", grammar_size(grammar)[1])
+        minimized, merged = minimize_grammar(grammar, self.start_symbol)
+        self.sizes[key] = (grammar_size(grammar), grammar_size(minimized))
+        return minimized
+
+    # Toma la etapa del almacén persistente si ya estaba; si no, la calcula y mide
+    def _stage(self, key, compute):
+        if key in self.stored:
+            return self.stored[key]
+        started = time.perf_counter()
+        result = compute()
+        self.timings[key] = time.perf_counter() - started
+        self.computed[key] = result
+        return result
+
+    def _save(self):
+        if self.store is None or not self.computed:
+            return
+        results = dict(self.stored)
+        results.update(self.computed)
+        self.store.put(self.input_text, self.start_symbol, results, self.timings)
+
+    def _factor(self, key):
+        if key not in self.factor:
+            return
+        grammar = self.results[key]
+        self.report("left_factor", grammar_size(grammar)[1])
+        factored = left_factor(grammar)
+        self.factored[key] = (factored, branching_stats(grammar), branching_stats(factored))
+
+    # Una sola vez por entrada: la UI solo evalúa cadenas sobre estas tablas
+    def _weighted(self, grammar, weights):
+        self.report("to_weighted_cnf", 0)
+        try:
+            cnf, probs, aliases = to_weighted_cnf(grammar, weights, self.start_symbol)
+            tables = compile_tables(cnf, probs, self.start_symbol, grammar, aliases)
+        except ValueError as e:
+            self.weighted = {"error": str(e)}
+            return
+        self.weighted = {"tables": tables, "text": weighted_grammar_to_text(cnf, probs)}
+
+    def _pipeline(self, key, grammar, pipeline, properties=None):
+        run = run_pipeline(grammar, self.start_symbol, pipeline, properties, self.report)
+        self.passes[key] = run["log"]
+        self.properties[key] = run["properties"]
+        return run["grammar"]
+
+    # En el proceso de trabajo: envía lo que cambió desde el último envío
+    def _publish(self):
+        if self.publish is None:
+            return
+        for name in STAGE_FIELDS:
+            for key, value in getattr(self, name).items():
+                if self._published.get((name, key)) is not value:
+                    self._published[(name, key)] = value
+                    self.publish(name, key, value)
+        for name in VALUE_FIELDS:
+            value = getattr(self, name)
+            if self._published.get(name) is not value:
+                self._published[name] = value
+                self.publish(name, None, value)
+
+    # En el proceso principal: incorpora una etapa publicada para que la UI la muestre ya
+    def _merge(self, name, key, value):
+        if key is None:
+            setattr(self, name, value)
+        else:
+            getattr(self, name)[key] = value
+
+    def _run_isolated(self):
+        try:
+            state = self.pool.run(run_isolated, self.input_text, self.start_symbol, self.skip,
+                                  self.minimize, self.factor, self.store, progress=self.report,
+                                  publish=self._merge)
+        except ConversionCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        else:
+            for name, value in state.items():
+                setattr(self, name, value)
+            self.done = True
+            return
+        try:
+            # El proceso se descartó sin guardar: se guardan las etapas que alcanzó a publicar
+            self._save()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def _run(self):
+        if self.pool is not None:
+            self._run_isolated()
+            return
+        start = self.start_symbol
+        try:
+            weights = {}
+            grammar = parse_grammar(self.input_text, weights)
+            self.results["original"] = grammar
+            # Vía rápida para gramáticas lineales: AFD mínimo con pertenencia en tiempo lineal
+            self.report("compile_regular", 0)
+            self.regular = compile_regular(grammar, start)
+            if self.store is not None:
+                cached = self.store.get(self.input_text, start)
+                if cached is not None:
+                    self.stored = cached["results"]
+                    self.timings = cached["timings"]
+            well_formed = self._stage("bien_formada", lambda: self._pipeline("bien_formada", grammar, WELL_FORMED))
+            self.results["bien_formada"] = well_formed
+            self._factor("bien_formada")
+            # El lenguaje de la original se calcula una sola vez para las tres comparaciones
+            reference = reference_language(grammar, start, progress=self.report)
+            self.checks["bien_formada"] = compare_language(reference, well_formed, start, progress=self.report)
+            # Sobre la gramática ingresada: cualquier forma normal puede fusionar derivaciones
+            max_len = search_length(grammar, AMBIGUITY_MAX_LEN, AMBIGUITY_MAX_STRINGS)
+            self.ambiguity = find_ambiguity(grammar, start, max_len, AMBIGUITY_MAX_STRINGS, progress=self.report)
+            if start in well_formed:
+                self.report("build_lalr_tables", 0)
+                self.lalr = build_lalr_tables(well_formed, start)
+            if weights and "chomsky" not in self.skip:
+                self._weighted(grammar, weights)
+            if "chomsky" not in self.skip or "chomsky" in self.stored:
+                # Parte de la bien formada: las pasadas de limpieza cuyas propiedades ya valen se omiten
+                cnf = self._stage("chomsky", lambda: self._pipeline(
+                    "chomsky", well_formed, CHOMSKY, self.properties.get("bien_formada")))
+                self.results["chomsky"] = self._minimized("chomsky", cnf)
+                self.checks["chomsky"] = compare_language(reference, self.results["chomsky"], start, progress=self.report)
+            if "greibach" not in self.skip or "greibach" in self.stored:
+                workers = os.cpu_count() if self.parallel and len(well_formed) >= GNF_PARALLEL_MIN_HEADS else None
+                gnf = self._stage("greibach", lambda: to_gnf(grammar, start, self.report, workers))
+                self.results["greibach"] = self._minimized("greibach", gnf)
+                self._factor("greibach")
+                self.checks["greibach"] = compare_language(reference, self.results["greibach"], start, progress=self.report)
+                if start in self.results["greibach"]:
+                    self.report("build_ll1_table", 0)
+                    self.ll1 = build_ll1_table(self.results["greibach"], start)
+        except ConversionCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        try:
+            # Lo que alcanzó a calcularse se guarda aunque luego se cancele o falle
+            self._save()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._close_phase()
+            self.done = True
+
+# Se ejecuta dentro del proceso de trabajo: la misma conversión, sin hilo ni procesos hijos
+def run_isolated(input_text, start, skip, minimize, factor, store, progress=None, publish=None):
+    job = ConversionJob(input_text, start, skip, minimize, factor, store, parallel=False,
+                        progress=progress, publish=publish)
+    try:
+        job._run()
+    except CPULimitExceeded:
+        # La etapa terminada después del último aviso también llega antes de reciclar el proceso
+        job._publish()
+        raise
+    # Sin memoria el proceso queda en mal estado: se avisa al grupo para que lo reemplace
+    if isinstance(job.error, MemoryError):
+        raise job.error
+    return {name: getattr(job, name) for name in RESULT_FIELDS}
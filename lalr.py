@@ -0,0 +1,372 @@
+import json
+from array import array
+from grammar import find_nullable
+
+END = "$"
+
+def _prepare(grammar, start):
+    nonterminals = ["<inicio>"] + list(grammar)
+    nt_id = {head: i for i, head in enumerate(nonterminals)}
+    terminals = sorted({s for prods in grammar.values() for prod in prods if prod != '*'
+                        for s in prod if s not in grammar})
+    n_nt = len(nonterminals)
+    sym_id = dict(nt_id)
+    sym_id.update({t: n_nt + i for i, t in enumerate(terminals)})
+    # Regla 0: <inicio> -> S (gramática aumentada)
+    rules = [(0, (nt_id[start],))]
+    for head, prods in grammar.items():
+        for prod in prods:
+            rhs = () if prod == '*' else tuple(sym_id[s] for s in prod)
+            rules.append((nt_id[head], rhs))
+    return nonterminals, terminals, rules
+
+# Algoritmo "digraph" de DeRemer y Pennello: une los conjuntos (bitsets) a lo largo
+# de una relación, colapsando componentes fuertemente conexas. Iterativo para no
+# depender del límite de recursión.
+def _digraph(edges, init):
+    n = len(init)
+    done = n + 2
+    depth = [0] * n
+    result = list(init)
+    stack = []
+    for root in range(n):
+        if depth[root]:
+            continue
+        stack.append(root)
+        depth[root] = len(stack)
+        calls = [(root, len(stack), iter(edges[root]))]
+        while calls:
+            x, d, it = calls[-1]
+            for y in it:
+                if depth[y] == 0:
+                    stack.append(y)
+                    depth[y] = len(stack)
+                    calls.append((y, len(stack), iter(edges[y])))
+                    break
+                depth[x] = min(depth[x], depth[y])
+                result[x] |= result[y]
+            else:
+                calls.pop()
+                if depth[x] == d:
+                    while True:
+                        top = stack.pop()
+                        depth[top] = done
+                        result[top] = result[x]
+                        if top == x:
+                            break
+                if calls:
+                    parent = calls[-1][0]
+                    depth[parent] = min(depth[parent], depth[x])
+                    result[parent] |= result[x]
+    return result
+
+# Autómata LR(0): los ítems son enteros (base de la regla + posición del punto) y
+# cada estado se identifica por el hash de su núcleo ordenado
+def _lr0_automaton(rules, n_nt):
+    item_rule = []
+    item_next = []
+    base = []
+    for r, (lhs, rhs) in enumerate(rules):
+        base.append(len(item_rule))
+        for dot in range(len(rhs) + 1):
+            item_rule.append(r)
+            item_next.append(rhs[dot] if dot < len(rhs) else -1)
+    rules_of = [[] for _ in range(n_nt)]
+    for r, (lhs, rhs) in enumerate(rules):
+        rules_of[lhs].append(r)
+    # predict[B]: ítems con el punto al inicio que agrega el cierre de B
+    predict = []
+    for B in range(n_nt):
+        seen = {B}
+        stack = [B]
+        items = []
+        while stack:
+            A = stack.pop()
+            for r in rules_of[A]:
+                items.append(base[r])
+                rhs = rules[r][1]
+                if rhs and rhs[0] < n_nt and rhs[0] not in seen:
+                    seen.add(rhs[0])
+                    stack.append(rhs[0])
+        predict.append(items)
+
+    kernels = [(base[0],)]
+    index = {kernels[0]: 0}
+    transitions = []
+    reductions = []
+    for state_kernel in kernels:
+        items = list(state_kernel)
+        added = set(items)
+        predicted = set()
+        for item in state_kernel:
+            B = item_next[item]
+            if 0 <= B < n_nt and B not in predicted:
+                predicted.add(B)
+                for new in predict[B]:
+                    if new not in added:
+                        added.add(new)
+                        items.append(new)
+        groups = {}
+        reduce_rules = []
+        for item in items:
+            X = item_next[item]
+            if X < 0:
+                reduce_rules.append(item_rule[item])
+            else:
+                groups.setdefault(X, []).append(item + 1)
+        goto = {}
+        for X, advanced in groups.items():
+            kernel = tuple(sorted(advanced))
+            target = index.get(kernel)
+            if target is None:
+                target = len(kernels)
+                index[kernel] = target
+                kernels.append(kernel)
+            goto[X] = target
+        transitions.append(goto)
+        reductions.append(reduce_rules)
+    return kernels, transitions, reductions
+
+def _lookaheads(rules, n_nt, transitions, reductions, nullable, end_bit):
+    # Transiciones sobre no terminales (p, A), numeradas; nt_index[p][A] = número
+    keys = []
+    nt_index = []
+    for p, goto in enumerate(transitions):
+        index = {}
+        for A in goto:
+            if A < n_nt:
+                index[A] = len(keys)
+                keys.append((p, A))
+        nt_index.append(index)
+    # DR(p, A): terminales que se pueden desplazar justo después de la transición
+    direct = []
+    reads = []
+    for p, A in keys:
+        r = transitions[p][A]
+        bits = 0
+        rel = []
+        for X in transitions[r]:
+            if X >= n_nt:
+                bits |= 1 << (X - n_nt)
+            elif X in nullable:
+                rel.append(nt_index[r][X])
+        if p == 0 and A == rules[0][1][0]:
+            bits |= end_bit
+        direct.append(bits)
+        reads.append(rel)
+    read = _digraph(reads, direct)
+
+    # includes: (p, A) incluye (p', B) si B -> βAγ, γ anulable y p' --β--> p
+    # lookback: (q, B -> ω) mira hacia atrás a (p', B) si p' --ω--> q
+    rules_of = [[] for _ in range(n_nt)]
+    include_from = []
+    for r, (lhs, rhs) in enumerate(rules):
+        rules_of[lhs].append(r)
+        # Solo generan includes las posiciones seguidas de un sufijo anulable:
+        # desde el último símbolo no anulable en adelante
+        i = len(rhs) - 1
+        while i >= 0 and rhs[i] in nullable:
+            i -= 1
+        include_from.append(max(i, 0))
+    includes = [[] for _ in keys]
+    lookback = [{} for _ in transitions]
+    for x, (p_start, B) in enumerate(keys):
+        for r in rules_of[B]:
+            rhs = rules[r][1]
+            first = include_from[r]
+            p = p_start
+            for i, X in enumerate(rhs):
+                if i >= first and X < n_nt:
+                    includes[nt_index[p][X]].append(x)
+                p = transitions[p][X]
+            lookback[p].setdefault(r, []).append(x)
+    follow = _digraph(includes, read)
+    la = {}
+    for q, reduce_rules in enumerate(reductions):
+        for r in reduce_rules:
+            bits = 0
+            for x in lookback[q].get(r, ()):
+                bits |= follow[x]
+            la[(q, r)] = bits
+    return la
+
+# Compresión por desplazamiento de filas: todas las filas dispersas se encajan en un
+# solo vector; check[i] guarda la fila dueña de la posición i. Se prueba primero-que-
+# encaje sobre las posiciones libres, con un máximo de intentos por fila.
+def compress_rows(rows, max_tries=64):
+    base = array('i', [0] * len(rows))
+    value = array('i')
+    check = array('i')
+    # skip[i] apunta, para una posición ocupada, hacia la siguiente posiblemente libre
+    skip = []
+
+    def next_free(i):
+        path = []
+        while i < len(check) and check[i] >= 0:
+            path.append(i)
+            i = skip[i]
+        for j in path:
+            skip[j] = i
+        return i
+
+    for row in sorted(range(len(rows)), key=lambda i: -len(rows[i])):
+        entries = rows[row]
+        if not entries:
+            continue
+        cols = sorted(entries)
+        slot = next_free(0)
+        for _ in range(max_tries):
+            b = slot - cols[0]
+            if all(b + c >= len(check) or check[b + c] < 0 for c in cols):
+                break
+            slot = next_free(slot + 1)
+        else:
+            b = len(check) - cols[0]
+        needed = b + cols[-1] + 1
+        if needed > len(check):
+            grow = needed - len(check)
+            skip.extend(range(len(check) + 1, needed + 1))
+            value.extend([0] * grow)
+            check.extend([-1] * grow)
+        for c in cols:
+            value[b + c] = entries[c]
+            check[b + c] = row
+        base[row] = b
+    return {"base": base, "value": value, "check": check}
+
+def _lookup(table, row, col):
+    i = table["base"][row] + col
+    if 0 <= i < len(table["check"]) and table["check"][i] == row:
+        return table["value"][i]
+    return 0
+
+# Acciones codificadas: n + 1 = desplazar al estado n, -(r + 1) = reducir por la regla r,
+# -1 (reducir por la regla 0) = aceptar, 0 = error
+def build_lalr_tables(grammar, start):
+    nonterminals, terminals, rules = _prepare(grammar, start)
+    n_nt = len(nonterminals)
+    columns = terminals + [END]
+    end_col = len(terminals)
+    nullable_heads = find_nullable(grammar)
+    nullable = {i for i, head in enumerate(nonterminals) if head in nullable_heads}
+    kernels, transitions, reductions = _lr0_automaton(rules, n_nt)
+    la = _lookaheads(rules, n_nt, transitions, reductions, nullable, 1 << end_col)
+
+    action_rows = []
+    goto_rows = []
+    conflicts = []
+    for q, goto in enumerate(transitions):
+        actions = {}
+        gotos = {}
+        for X, target in goto.items():
+            if X < n_nt:
+                gotos[X] = target
+            else:
+                actions[X - n_nt] = target + 1
+        if 0 in reductions[q]:
+            actions[end_col] = -1
+        for r in sorted(reductions[q]):
+            bits = la.get((q, r), 0)
+            col = 0
+            while bits:
+                if bits & 1:
+                    current = actions.get(col)
+                    if current is None:
+                        actions[col] = -(r + 1)
+                    else:
+                        # Como yacc: se conserva el desplazamiento o la regla anterior
+                        conflicts.append({"state": q, "symbol": columns[col], "kept": current, "rule": r})
+                bits >>= 1
+                col += 1
+        action_rows.append(actions)
+        goto_rows.append(gotos)
+    return {
+        "start": start,
+        "nonterminals": nonterminals,
+        "terminals": columns,
+        "rules": rules,
+        "states": len(kernels),
+        "action": compress_rows(action_rows),
+        "goto": compress_rows(goto_rows),
+        "dense_size": len(kernels) * (len(columns) + n_nt),
+        "conflicts": conflicts,
+    }
+
+def format_rule(tables, r):
+    lhs, rhs = tables["rules"][r]
+    names = tables["nonterminals"] + tables["terminals"]
+    body = "".join(names[s] for s in rhs) or "ε"
+    return f"{tables['nonterminals'][lhs]} → {body}"
+
+def format_lalr_conflicts(tables):
+    lines = []
+    for conflict in tables["conflicts"]:
+        kept = conflict["kept"]
+        reduce = format_rule(tables, conflict["rule"])
+        if kept > 0:
+            detail = f"desplazamiento/reducción: desplazar a {kept - 1} o reducir {reduce}"
+        else:
+            detail = f"reducción/reducción: {format_rule(tables, -kept - 1)} o {reduce}"
+        lines.append(f"Estado {conflict['state']}, '{conflict['symbol']}': conflicto {detail}")
+    return lines
+
+def lalr_parse(tables, text):
+    col_of = {t: i for i, t in enumerate(tables["terminals"][:-1])}
+    end_col = len(tables["terminals"]) - 1
+    stack = [0]
+    pos = 0
+    # Sin consumir entrada cada paso solo depende del tope (y del no terminal por apilar tras
+    # reducir): si un mismo punto reaparece sin haber desapilado por debajo de la altura en
+    # que se vio, el analizador se repetiría para siempre. Pasa con conflictos resueltos
+    # como yacc, p. ej. S -> SS | ε
+    marks = [(1, 0)]
+    active = {0}
+    while True:
+        if pos < len(text):
+            col = col_of.get(text[pos])
+            if col is None:
+                return False
+        else:
+            col = end_col
+        act = _lookup(tables["action"], stack[-1], col)
+        if act > 0:
+            stack.append(act - 1)
+            pos += 1
+            marks = [(len(stack), act - 1)]
+            active = {act - 1}
+        elif act < 0:
+            r = -act - 1
+            if r == 0:
+                return pos == len(text)
+            lhs, rhs = tables["rules"][r]
+            if rhs:
+                del stack[-len(rhs):]
+                while marks and marks[-1][0] > len(stack):
+                    active.discard(marks.pop()[1])
+            point = (stack[-1], lhs)
+            if point in active:
+                return False
+            marks.append((len(stack), point))
+            active.add(point)
+            # El estado 0 nunca es destino de un goto, así que 0 solo puede ser error
+            target = _lookup(tables["goto"], stack[-1], lhs)
+            if target == 0:
+                return False
+            stack.append(target)
+            if target in active:
+                return False
+            marks.append((len(stack), target))
+            active.add(target)
+        else:
+            return False
+
+def lalr_to_json(tables):
+    data = {
+        "start": tables["start"],
+        "nonterminals": tables["nonterminals"],
+        "terminals": tables["terminals"],
+        "rules": [[lhs, list(rhs)] for lhs, rhs in tables["rules"]],
+        "action": {k: list(v) for k, v in tables["action"].items()},
+        "goto": {k: list(v) for k, v in tables["goto"].items()},
+    }
+    return json.dumps(data, ensure_ascii=False)
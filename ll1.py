@@ -0,0 +1,242 @@
+import struct
+import sys
+from array import array
+from grammar import find_nullable
+
+END = "$"
+BINARY_MAGIC = b"LL1\x01"
+
+def _symbols(grammar):
+    heads = list(grammar)
+    terminals = []
+    seen = set(heads)
+    for prods in grammar.values():
+        for prod in prods:
+            if prod == '*':
+                continue
+            for s in prod:
+                if s not in seen:
+                    seen.add(s)
+                    terminals.append(s)
+    terminals.sort()
+    return heads, terminals
+
+# FIRST como enteros usados como conjuntos de bits (un bit por terminal) con
+# propagación por lista de trabajo: solo se revisan los dependientes de lo que cambió
+def first_sets(grammar, terminal_bit, nullable):
+    first = {head: 0 for head in grammar}
+    dependents = {head: set() for head in grammar}
+    for head, prods in grammar.items():
+        for prod in prods:
+            if prod == '*':
+                continue
+            for s in prod:
+                if s in grammar:
+                    dependents[s].add(head)
+                else:
+                    first[head] |= terminal_bit[s]
+                if s not in nullable:
+                    break
+    work = [head for head in grammar if first[head]]
+    while work:
+        changed = work.pop()
+        for head in dependents[changed]:
+            new = first[head] | first[changed]
+            if new != first[head]:
+                first[head] = new
+                work.append(head)
+    return first
+
+def _first_of(seq, first, terminal_bit, nullable):
+    bits = 0
+    for s in seq:
+        if s in first:
+            bits |= first[s]
+        else:
+            bits |= terminal_bit[s]
+        if s not in nullable:
+            return bits, False
+    return bits, True
+
+def follow_sets(grammar, start, first, terminal_bit, nullable, end_bit):
+    follow = {head: 0 for head in grammar}
+    if start in follow:
+        follow[start] |= end_bit
+    # Arista A -> B: FOLLOW(A) ⊆ FOLLOW(B) cuando B termina una producción de A
+    edges = {head: set() for head in grammar}
+    for head, prods in grammar.items():
+        for prod in prods:
+            if prod == '*':
+                continue
+            for i, s in enumerate(prod):
+                if s not in grammar:
+                    continue
+                bits, rest_nullable = _first_of(prod[i + 1:], first, terminal_bit, nullable)
+                follow[s] |= bits
+                if rest_nullable and s != head:
+                    edges[head].add(s)
+    work = [head for head in grammar if follow[head]]
+    while work:
+        changed = work.pop()
+        for head in edges[changed]:
+            new = follow[head] | follow[changed]
+            if new != follow[head]:
+                follow[head] = new
+                work.append(head)
+    return follow
+
+def _bits_to_symbols(bits, columns):
+    return [columns[i] for i in range(len(columns)) if bits >> i & 1]
+
+def build_ll1_table(grammar, start):
+    heads, terminals = _symbols(grammar)
+    columns = terminals + [END]
+    terminal_bit = {t: 1 << i for i, t in enumerate(terminals)}
+    end_bit = 1 << len(terminals)
+    nullable = find_nullable(grammar)
+    first = first_sets(grammar, terminal_bit, nullable)
+    follow = follow_sets(grammar, start, first, terminal_bit, nullable, end_bit)
+
+    rules = [(head, prod) for head in heads for prod in grammar[head]]
+    row_of = {head: i for i, head in enumerate(heads)}
+    width = len(columns)
+    # Tabla densa: entrada = índice de regla + 1, 0 = error; uint16 salvo gramáticas enormes
+    table = array('H' if len(rules) < 0xFFFF else 'I', [0]) * (len(heads) * width)
+    conflicts = {}
+    for r, (head, prod) in enumerate(rules):
+        if prod == '*':
+            bits, is_nullable = 0, True
+        else:
+            bits, is_nullable = _first_of(prod, first, terminal_bit, nullable)
+        if is_nullable:
+            bits |= follow[head]
+        base = row_of[head] * width
+        for col in range(width):
+            if not bits >> col & 1:
+                continue
+            current = table[base + col]
+            if current and current != r + 1:
+                conflicts.setdefault((head, columns[col]), [rules[current - 1][1]]).append(prod)
+            else:
+                table[base + col] = r + 1
+    return {
+        "start": start,
+        "nonterminals": heads,
+        "terminals": columns,
+        "rules": rules,
+        "table": table,
+        "first": {head: _bits_to_symbols(first[head], columns) for head in heads},
+        "follow": {head: _bits_to_symbols(follow[head], columns) for head in heads},
+        "conflicts": [(head, terminal, prods) for (head, terminal), prods in conflicts.items()],
+    }
+
+def format_conflicts(ll1):
+    lines = []
+    for head, terminal, prods in ll1["conflicts"]:
+        shown = " | ".join("ε" if p == '*' else p for p in prods)
+        lines.append(f"M[{head}, {terminal}]: {head} → {shown}")
+    return lines
+
+def table_rows(ll1):
+    width = len(ll1["terminals"])
+    rows = []
+    for i, head in enumerate(ll1["nonterminals"]):
+        row = {"": head}
+        for col, terminal in enumerate(ll1["terminals"]):
+            entry = ll1["table"][i * width + col]
+            if entry:
+                prod = ll1["rules"][entry - 1][1]
+                row[terminal] = f"{head} → {'ε' if prod == '*' else prod}"
+            else:
+                row[terminal] = ""
+        rows.append(row)
+    return rows
+
+# Analizador predictivo: tiempo lineal en la longitud de la entrada
+def ll1_parse(ll1, text):
+    row_of = {head: i for i, head in enumerate(ll1["nonterminals"])}
+    col_of = {t: i for i, t in enumerate(ll1["terminals"][:-1])}
+    width = len(ll1["terminals"])
+    end_col = width - 1
+    stack = [ll1["start"]]
+    pos = 0
+    # Con recursividad izquierda la tabla tiene conflictos y puede expandir sin consumir
+    # entrada: si un no terminal reaparece en el tope sin haber desapilado por debajo de
+    # donde se expandió antes, la expansión se repetiría para siempre
+    marks = []
+    active = set()
+    while stack:
+        top = stack.pop()
+        col = col_of.get(text[pos], -1) if pos < len(text) else end_col
+        if top in row_of:
+            if col < 0:
+                return False
+            entry = ll1["table"][row_of[top] * width + col]
+            if not entry:
+                return False
+            while marks and marks[-1][0] > len(stack):
+                active.discard(marks.pop()[1])
+            if top in active:
+                return False
+            marks.append((len(stack), top))
+            active.add(top)
+            prod = ll1["rules"][entry - 1][1]
+            if prod != '*':
+                stack.extend(reversed(prod))
+        elif pos < len(text) and text[pos] == top:
+            pos += 1
+            marks = []
+            active = set()
+        else:
+            return False
+    return pos == len(text)
+
+def _pack_str(value):
+    data = value.encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+def _unpack_str(data, offset):
+    (size,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    return data[offset:offset + size].decode("utf-8"), offset + size
+
+# Formato binario (little endian): cabecera, tablas de símbolos, reglas y la tabla densa
+def ll1_to_bytes(ll1):
+    heads = ll1["nonterminals"]
+    row_of = {head: i for i, head in enumerate(heads)}
+    table = array(ll1["table"].typecode, ll1["table"])
+    if sys.byteorder == "big":
+        table.byteswap()
+    parts = [BINARY_MAGIC, struct.pack("<IIIB", len(heads), len(ll1["terminals"]), len(ll1["rules"]), table.itemsize)]
+    parts.append(_pack_str(ll1["start"]))
+    parts.extend(_pack_str(head) for head in heads)
+    parts.extend(_pack_str(t) for t in ll1["terminals"])
+    for head, prod in ll1["rules"]:
+        parts.append(struct.pack("<I", row_of[head]) + _pack_str(prod))
+    parts.append(table.tobytes())
+    return b"".join(parts)
+
+def ll1_from_bytes(data):
+    if data[:4] != BINARY_MAGIC:
+        raise ValueError("No es una tabla LL(1) binaria.")
+    n_heads, n_terminals, n_rules, itemsize = struct.unpack_from("<IIIB", data, 4)
+    offset = 4 + struct.calcsize("<IIIB")
+    start, offset = _unpack_str(data, offset)
+    heads = []
+    for _ in range(n_heads):
+        head, offset = _unpack_str(data, offset)
+        heads.append(head)
+    terminals = []
+    for _ in range(n_terminals):
+        terminal, offset = _unpack_str(data, offset)
+        terminals.append(terminal)
+    rules = []
+    for _ in range(n_rules):
+        (row,) = struct.unpack_from("<I", data, offset)
+        prod, offset = _unpack_str(data, offset + 4)
+        rules.append((heads[row], prod))
+    table = array('H' if itemsize == 2 else 'I')
+    table.frombytes(data[offset:offset + itemsize * n_heads * n_terminals])
+    if sys.byteorder == "big":
+        table.byteswap()
+    return {"start": start, "nonterminals": heads, "terminals": terminals, "rules": rules, "table": table}
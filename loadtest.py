@@ -0,0 +1,255 @@
+import argparse
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# Gramáticas de cada tipo. Las patológicas no terminan: sirven para ver cómo los límites
+# de los procesos de trabajo protegen a las demás sesiones.
+GRAMMAR_MIX = {
+    "pequena": [
+        "S -> bA | aB\nA -> bAA | aS | a\nB -> aBB | bS | b",
+        "S -> aSb | ab",
+        "S -> aSa | bSb | a | b | *",
+        "S -> SaT | T\nT -> TbF | F\nF -> aSb | a",
+        "S -> AB | a\nA -> Aa | b | *\nB -> Bb | BA | c",
+    ],
+    "mediana": [
+        "S -> ASB | *\nA -> aAS | a\nB -> SbS | A | bb",
+        "S -> LOa | a\nA -> NA | bPA\nB -> BS | b\nL -> A | S\nM -> B | O\nN -> AMB | MS\nO -> B | L | PaP\nP -> L | LS | Sa",
+        "S -> Ba | LLa | P\nA -> M | P | PbM\nB -> MB | bAB\nL -> ALN | P | POa\nM -> AM | OAb | Pb\nN -> OaA | P\nO -> LOP | MO | SN\nP -> Ab | Mb | PM",
+    ],
+    "patologica": [
+        "S -> LMNOa | b\nL -> aL | *\nM -> aM | *\nN -> aN | *\nO -> aO | *",
+    ],
+}
+DEFAULT_MIX = "pequena=70,mediana=25,patologica=5"
+
+# AppTest crea y destruye un runtime global en cada ejecución del script, así que las
+# ejecuciones se serializan; las conversiones, que son lo costoso, siguen en paralelo
+# en los procesos de trabajo compartidos, como en el servidor.
+_SCRIPT_LOCK = threading.Lock()
+
+def parse_mix(text):
+    weights = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in GRAMMAR_MIX:
+            raise ValueError(f"Tipo de gramática desconocido: {kind}")
+        weights[kind] = float(weight or 1)
+    return weights
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def _rss(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+def _children(pid):
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            found.append(int(entry))
+    return found
+
+class MemoryMonitor:
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.peak_main = 0
+        self.peak_workers = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def sample(self):
+        pid = os.getpid()
+        main = _rss(pid)
+        workers = sum(_rss(child) for child in _children(pid))
+        self.peak_main = max(self.peak_main, main)
+        self.peak_workers = max(self.peak_workers, workers)
+        return main, workers
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+# Guarda en latencies[name] el tiempo desde que la sesión pide ejecutar el script,
+# incluida la espera del turno, y esa espera aparte en "espera {name}"
+def _run_script(at, latencies, name):
+    requested = time.perf_counter()
+    with _SCRIPT_LOCK:
+        started = time.perf_counter()
+        at.run()
+    latencies[name] = time.perf_counter() - requested
+    latencies[f"espera {name}"] = started - requested
+
+# Una sesión simulada: abre la app, escribe la gramática, pulsa Convertir y espera a que
+# la conversión termine para dibujar el resultado. Devuelve (tipo, resultado, latencias).
+def simulate_session(kind, text, timeout, sessions):
+    from streamlit.testing.v1 import AppTest
+    from sandbox import WorkerLimitExceeded
+
+    latencies = {}
+    started = time.perf_counter()
+    at = AppTest.from_file(MAIN_SCRIPT, default_timeout=timeout)
+    sessions.append(at)
+    _run_script(at, latencies, "carga")
+    at.text_area(key="input_grammar").input(text)
+    at.text_input(key="start_symbol").input("S")
+    clicked = time.perf_counter()
+    next(b for b in at.button if b.label == "Convertir").click()
+    _run_script(at, latencies, "envío")
+    if at.exception:
+        return kind, "excepción", latencies
+    job = at.session_state["conversion_job"] if "conversion_job" in at.session_state else None
+    if job is None:
+        return kind, "rechazada", latencies
+    while not job.done:
+        if time.perf_counter() - clicked > timeout:
+            job.cancel()
+            return kind, "tiempo agotado", latencies
+        time.sleep(0.02)
+    latencies["conversión"] = time.perf_counter() - clicked
+    _run_script(at, latencies, "render")
+    latencies["total"] = time.perf_counter() - started
+    for phase, seconds in job.phases.items():
+        latencies[f"etapa {phase}"] = seconds
+    if job.cancelled:
+        outcome = "cancelada"
+    elif isinstance(job.error, WorkerLimitExceeded):
+        outcome = f"límite ({job.error.kind})"
+    elif job.error is not None or at.exception:
+        outcome = "error"
+    else:
+        outcome = "ok"
+    return kind, outcome, latencies
+
+def _safe_session(kind, text, timeout, sessions):
+    try:
+        return simulate_session(kind, text, timeout, sessions)
+    except Exception as e:
+        return kind, f"excepción ({type(e).__name__})", {}
+
+def run_load(sessions, concurrency, mix, seed=0, timeout=300):
+    rng = random.Random(seed)
+    kinds = list(mix)
+    plan = []
+    for _ in range(sessions):
+        kind = rng.choices(kinds, weights=[mix[k] for k in kinds])[0]
+        plan.append((kind, rng.choice(GRAMMAR_MIX[kind])))
+    monitor = MemoryMonitor()
+    # Una sesión previa carga los módulos y crea los procesos de trabajo antes de medir
+    live = []
+    simulate_session("pequena", GRAMMAR_MIX["pequena"][1], timeout, live)
+    base_main, base_workers = monitor.sample()
+    monitor.peak_main, monitor.peak_workers = base_main, base_workers
+    monitor.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        records = list(executor.map(lambda item: _safe_session(item[0], item[1], timeout, live), plan))
+    elapsed = time.perf_counter() - started
+    # Las sesiones siguen vivas: la memoria del proceso incluye su estado
+    end_main, _ = monitor.sample()
+    monitor.stop()
+    return {
+        "records": records,
+        "elapsed": elapsed,
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "memory": {
+            "base_main": base_main,
+            "base_workers": base_workers,
+            "peak_main": monitor.peak_main,
+            "peak_workers": monitor.peak_workers,
+            "per_session": max(0, end_main - base_main) / max(1, sessions),
+        },
+    }
+
+def format_report(report):
+    lines = []
+    records = report["records"]
+    finished = [r for r in records if r[1] == "ok"]
+    lines.append(f"{report['sessions']} sesiones, {report['concurrency']} concurrentes, {report['elapsed']:.1f} s: "
+                 f"{len(finished) / report['elapsed']:.2f} conversiones correctas por segundo")
+    outcomes = {}
+    for kind, outcome, _ in records:
+        outcomes.setdefault(kind, {}).setdefault(outcome, 0)
+        outcomes[kind][outcome] += 1
+    for kind, counts in outcomes.items():
+        lines.append(f"  {kind}: " + ", ".join(f"{outcome} {n}" for outcome, n in sorted(counts.items())))
+    lines.append("")
+    lines.append("Las ejecuciones del script no son concurrentes (AppTest usa un runtime global): carga, envío y "
+                 "render incluyen la espera del turno, que también se muestra aparte.")
+    lines.append(f"{'latencia (s)':<36}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    samples = {}
+    for kind, _, latencies in records:
+        for name, seconds in latencies.items():
+            samples.setdefault(name, []).append(seconds)
+        # Con pocos procesos de trabajo las conversiones largas retrasan a las cortas
+        for name in ("conversión", "total"):
+            if name in latencies:
+                samples.setdefault(f"{name} ({kind})", []).append(latencies[name])
+    order = ["carga", "espera carga", "envío", "espera envío", "conversión", "render", "espera render", "total"]
+    for name in order + sorted(n for n in samples if n not in order):
+        if name in samples:
+            values = samples[name]
+            lines.append(f"{name:<36}{len(values):>6}{percentile(values, 50):>10.3f}"
+                         f"{percentile(values, 95):>10.3f}{percentile(values, 99):>10.3f}")
+    memory = report["memory"]
+    mb = 1024 * 1024
+    lines.append("")
+    lines.append(f"Memoria del proceso principal: {memory['base_main'] / mb:.0f} MB al inicio, "
+                 f"pico {memory['peak_main'] / mb:.0f} MB, ~{memory['per_session'] / mb:.2f} MB por sesión viva")
+    lines.append(f"Memoria de los procesos de trabajo: {memory['base_workers'] / mb:.0f} MB al inicio, "
+                 f"pico {memory['peak_workers'] / mb:.0f} MB")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la app con sesiones simuladas (AppTest), sin red.")
+    parser.add_argument("--sesiones", type=int, default=40, help="cantidad de sesiones simuladas")
+    parser.add_argument("--concurrencia", type=int, default=8, help="sesiones simultáneas")
+    parser.add_argument("--mezcla", default=DEFAULT_MIX, help=f"pesos por tipo de gramática ({', '.join(GRAMMAR_MIX)})")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla para elegir las gramáticas")
+    parser.add_argument("--timeout", type=float, default=300, help="segundos máximos por sesión")
+    parser.add_argument("--almacen", help="archivo SQLite de resultados (por defecto, uno temporal vacío)")
+    parser.add_argument("--limite-cpu", type=int, help="segundos de CPU por conversión en los procesos de trabajo")
+    parser.add_argument("--limite-memoria-mb", type=int, help="memoria por conversión en los procesos de trabajo")
+    args = parser.parse_args()
+    mix = parse_mix(args.mezcla)
+    # La app lee esta configuración al importarse, así que se fija antes de la primera sesión
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["GRAMATICAS_DB"] = args.almacen or os.path.join(tmp, "resultados.sqlite3")
+        if args.limite_cpu:
+            os.environ["GRAMATICAS_CPU_S"] = str(args.limite_cpu)
+        if args.limite_memoria_mb:
+            os.environ["GRAMATICAS_MEMORIA_MB"] = str(args.limite_memoria_mb)
+        report = run_load(args.sesiones, args.concurrencia, mix, args.semilla, args.timeout)
+    print(format_report(report))
+
+if __name__ == "__main__":
+    main()
@@ -1,353 +1,389 @@
 import streamlit as st
-from collections import defaultdict
 import copy
+import itertools
+import math
 import sys
+from grammar import parse_grammar, grammar_to_text
+from estimator import estimate_conversion, plan_conversion, format_estimate
+from ll1 import format_conflicts, table_rows, ll1_to_bytes
+from lalr import format_lalr_conflicts, lalr_to_json
+from codegen import generate_parser_source
+from export import EXPORT_FORMATS, export_grammar, export_file_name, export_mime
+from ebnf import import_ebnf
+from store import ResultStore
+from regular import dfa_accepts, dfa_to_json
+from forest import parse_forest, count_trees, iter_trees, format_tree
+from pcfg import PCFG
+from alphabet import terminal_classes
+from jobs import ConversionJob
+from sandbox import WorkerPool, WorkerLimitExceeded
 sys.setrecursionlimit(10000)
 
-def parse_grammar(input_text):
-    grammar = defaultdict(list)
-    input_text = input_text.replace("→", "->").replace("ε", "*")
-    for line in input_text.strip().split('\n'):
-        if '->' in line:
-            head, prods = line.split('->')
-            head = head.strip()
-            for prod in prods.split('|'):
-                prod = prod.strip()
-                grammar[head].append(prod)
-    return dict(grammar)
+# Etapas de la conversión en el orden en que se ejecutan: (clave, título, etiqueta del acordeón)
+CONVERSION_STAGES = [
+    ("original", "Gramática Original", "Ver gramática original"),
+    ("bien_formada", "Gramática Bien Formada", "Ver gramática bien formada"),
+    ("chomsky", "Forma Normal de Chomsky", "Ver forma normal de Chomsky"),
+    ("greibach", "Forma Normal de Greibach", "Ver forma normal de Greibach"),
+]
 
-def find_nullable(grammar):
-    nullable = set()
-    changed = True
-    while changed:
-        changed = False
-        for head, prods in grammar.items():
-            for p in prods:
-                if p == '*' or all(symbol in nullable for symbol in p):
-                    if head not in nullable:
-                        nullable.add(head)
-                        changed = True
-    return nullable
+# Por encima de estos límites la sección se pagina y se muestra colapsada
+RENDER_PAGE_SIZE = 200
+COLLAPSE_THRESHOLD = 50
 
-def remove_epsilon(grammar, start):
-    nullable = find_nullable(grammar)
-    new_grammar = defaultdict(list)
-    for head, prods in grammar.items():
-        for prod in prods:
-            if prod != '*':
-                indices = [i for i, s in enumerate(prod) if s in nullable]
-                for mask in range(1 << len(indices)):
-                    s = list(prod)
-                    for bit, idx in enumerate(indices):
-                        if mask & (1 << bit):
-                            s[idx] = ''
-                    new_prod = ''.join(c for c in s if c)
-                    if new_prod:
-                        new_grammar[head].append(new_prod)
-                    else:
-                        if head == start:
-                            new_grammar[head].append('*')
-            else:
-                pass
-    if start in nullable and '*' not in new_grammar[start]:
-        new_grammar[start].append('*')
-    return {h: list(set(ps)) for h, ps in new_grammar.items()}
+def format_grammar_line(head, prods):
+    productions = []
+    for prod in prods:
+        if prod == "*":
+            productions.append("ε")
+        else:
+            productions.append(prod)
+    productions_str = " | ".join(productions)
+    return f"**{head}** → {productions_str}"
 
-def remove_unit(grammar, start):
-    new_grammar = defaultdict(list)
-    for head in grammar:
-        stack = [head]
-        seen = set(stack)
-        while stack:
-            cur = stack.pop()
-            for prod in grammar[cur]:
-                if prod in grammar:
-                    if prod not in seen:
-                        seen.add(prod)
-                        stack.append(prod)
-                else:
-                    new_grammar[head].append(prod)
-        new_grammar[head] = list(set(new_grammar[head]))
-    return dict(new_grammar)
+def display_grammar(grammar, container):
+    # Un único bloque markdown por sección en lugar de uno por no terminal
+    lines = [format_grammar_line(head, prods) for head, prods in grammar.items()]
+    container.markdown("  \n".join(lines))
 
-def remove_useless(grammar, start):
-    reachable = set([start])
-    changed = True
-    while changed:
-        changed = False
-        for head in list(reachable):
-            for prod in grammar.get(head, []):
-                for s in prod:
-                    if s.isupper() and s not in reachable:
-                        reachable.add(s)
-                        changed = True
-    productive = set()
-    changed = True
-    while changed:
-        changed = False
-        for head, prods in grammar.items():
-            for prod in prods:
-                if all((not c.isupper()) or c in productive for c in prod) and head not in productive:
-                    productive.add(head)
-                    changed = True
-    valid = reachable & productive
-    return {h: [p for p in prods if all((not c.isupper()) or c in valid for c in p)]
-            for h, prods in grammar.items() if h in valid}
+@st.fragment
+def display_grammar_paged(grammar, key):
+    # Búsqueda y paginación se re-ejecutan solo dentro de este fragmento
+    query = st.text_input("Buscar no terminal:", key=f"{key}_buscar").strip()
+    if query:
+        heads = [head for head in grammar if query in head]
+        heads.sort(key=lambda head: head != query)
+    else:
+        heads = list(grammar)
+    pages = max(1, -(-len(heads) // RENDER_PAGE_SIZE))
+    page = 1
+    if st.session_state.get(f"{key}_pagina", 1) > pages:
+        st.session_state[f"{key}_pagina"] = 1
+    if pages > 1:
+        page = st.number_input(f"Página (de {pages}):", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_pagina")
+    first = (page - 1) * RENDER_PAGE_SIZE
+    shown = heads[first:first + RENDER_PAGE_SIZE]
+    if not shown:
+        st.info("Ningún no terminal coincide con la búsqueda.")
+        return
+    st.caption(f"Mostrando {first + 1}–{first + len(shown)} de {len(heads)} no terminales")
+    display_grammar({head: grammar[head] for head in shown}, st)
 
-def to_cnf(grammar, start):
-    G = remove_unit(remove_epsilon(remove_useless(grammar, start), start), start)
-    counters = {'X': 0}
-    mapping = {}
-    letter_mapping = {0: 'E', 1: 'F', 2: 'G', 3: 'H', 4: 'I', 5: 'J', 6: 'K'}
-    cnf = defaultdict(list)
-    for head, prods in G.items():
-        for prod in prods:
-            if prod != '*':
-                if len(prod) > 1:
-                    new_prod = []
-                    for c in prod:
-                        if c.islower():
-                            if c not in mapping:
-                                if c == 'a':
-                                    mapping[c] = 'D'
-                                    cnf['D'] = [c]
-                                elif c == 'b':
-                                    mapping[c] = 'C'
-                                    cnf['C'] = [c]
-                                else:
-                                    counters['X'] += 1
-                                    next_letter = letter_mapping.get(counters['X'], f"X{counters['X']}")
-                                    mapping[c] = next_letter
-                                    cnf[next_letter] = [c]
-                            new_prod.append(mapping[c])
-                        else:
-                            new_prod.append(c)
-                    cnf[head].append(''.join(new_prod))
-                else:
-                    cnf[head].append(prod)
-            else:
-                if head == start:
-                    cnf[head].append('*')
-    final_cnf = defaultdict(list)
-    split_mapping = {}
-    split_counter = 1
-    for head, prods in cnf.items():
-        for prod in prods:
-            if prod == '*' or len(prod) <= 2:
-                final_cnf[head].append(prod)
-            else:
-                current_prod = prod
-                while len(current_prod) > 2:
-                    A = current_prod[0]
-                    rest = current_prod[1:]
-                    if rest in split_mapping:
-                        X = split_mapping[rest]
-                    else:
-                        split_counter += 1
-                        X = letter_mapping.get(split_counter, f"X{split_counter}")
-                        split_mapping[rest] = X
-                        final_cnf[X] = [rest]
-                    current_prod = A + X
-                final_cnf[head].append(current_prod)
-    return {h: list(set(ps)) for h, ps in final_cnf.items()}
-def to_gnf(grammar, start):
-    # Función auxiliar: devuelve una letra mayúscula (de "A" a "Z") que no esté en used
-    def get_fresh_symbol(used, candidates="ABCDEFGHIJKLMNOPQRSTUVWXYZ"):
-        for c in candidates:
-            if c not in used:
-                used.add(c)
-                return c
-        raise Exception("No hay símbolos frescos disponibles.")
+def show_grammar_section(title, label, grammar, key, caption=None):
+    st.markdown(f'<div class="section-header"><h3>{title}</h3></div>', unsafe_allow_html=True)
+    if caption:
+        st.caption(caption)
+    large = len(grammar) > COLLAPSE_THRESHOLD
+    if large:
+        label = f"{label} ({len(grammar)} no terminales)"
+    with st.expander(label, expanded=not large):
+        st.markdown('<div class="grammar-container">', unsafe_allow_html=True)
+        if large:
+            display_grammar_paged(grammar, key)
+        else:
+            display_grammar(grammar, st)
+        st.markdown('</div>', unsafe_allow_html=True)
 
-    ##############################
-    # Paso 1: Eliminación de ε
-    ##############################
-    def remove_epsilon_local(gram, start):
-        nullable = set()
-        change = True
-        while change:
-            change = False
-            for A, prods in gram.items():
-                for prod in prods:
-                    if prod == "*" or all(ch in nullable for ch in prod):
-                        if A not in nullable:
-                            nullable.add(A)
-                            change = True
-        new_gram = {}
-        from itertools import product
-        for A, prods in gram.items():
-            new_set = set()
-            for prod in prods:
-                if prod == "*":
-                    continue
-                indices = [i for i, ch in enumerate(prod) if ch in nullable]
-                for mask in product([0,1], repeat=len(indices)):
-                    lst = list(prod)
-                    for j, bit in enumerate(mask):
-                        if bit:
-                            lst[indices[j]] = ""
-                    cand = "".join(lst)
-                    if cand == "":
-                        cand = "*"
-                    new_set.add(cand)
-            if A == start and "*" in gram.get(A, []):
-                new_set.add("*")
-            new_gram[A] = list(new_set)
-        return new_gram
+@st.fragment(run_every=0.5)
+def show_job_progress(job):
+    # Se refresca solo este fragmento mientras el hilo de conversión trabaja
+    if job.done or len(job.results) != st.session_state.get("conversion_shown", 0):
+        st.rerun()
+    completed = max(len(job.results) - 1, 0)
+    total = len(CONVERSION_STAGES) - 1 - len(job.skip)
+    stage = job.stage or "parse_grammar"
+    st.progress(completed / total, text=f"Etapa: {stage} · {job.produced} reglas producidas")
+    if st.button("Cancelar", type="secondary", key="cancelar_conversion"):
+        job.cancel()
+        st.info("Cancelando la conversión...")
 
-    ##############################
-    # Paso 2: Eliminación de producciones unitarias
-    ##############################
-    def remove_unit_local(gram):
-        new_gram = {}
-        for A in gram:
-            new_prods = set()
-            stack = [A]
-            visited = {A}
-            while stack:
-                B = stack.pop()
-                for prod in gram[B]:
-                    if len(prod) == 1 and prod.isupper():
-                        if prod not in visited:
-                            visited.add(prod)
-                            stack.append(prod)
-                    else:
-                        new_prods.add(prod)
-            new_gram[A] = list(new_prods)
-        return new_gram
+def show_equivalence_checks(checks):
+    if not checks:
+        return
+    st.markdown('<div class="section-header"><h3>Verificación de equivalencia</h3></div>', unsafe_allow_html=True)
+    lines = []
+    for key, title, label in CONVERSION_STAGES:
+        result = checks.get(key)
+        if result is None:
+            continue
+        if result["equivalent"] is None:
+            lines.append(f"⚠️ **{title}**: no concluyente, el lenguaje tiene demasiadas cadenas por longitud")
+        elif result["equivalent"]:
+            lines.append(f"✅ **{title}**: mismo lenguaje que la original hasta longitud {result['max_len']}")
+        else:
+            shown = result["string"] or "ε"
+            lines.append(f"❌ **{title}**: `{shown}` (longitud {len(result['string'])}) solo la genera la gramática {result['only_in']}")
+    st.markdown("  \n".join(lines))
 
-    ##############################
-    # Paso 3: Eliminación de símbolos inútiles
-    ##############################
-    def remove_useless_local(gram, start):
-        reachable = {start}
-        change = True
-        while change:
-            change = False
-            for A in list(reachable):
-                for prod in gram.get(A, []):
-                    for ch in prod:
-                        if ch.isupper() and ch not in reachable:
-                            reachable.add(ch)
-                            change = True
-        productive = set()
-        change = True
-        while change:
-            change = False
-            for A, prods in gram.items():
-                for prod in prods:
-                    if all((not c.isupper()) or c in productive for c in prod):
-                        if A not in productive:
-                            productive.add(A)
-                            change = True
-        valid = reachable & productive
-        return {A: [p for p in prods if all((not c.isupper()) or c in valid for c in p)]
-                for A, prods in gram.items() if A in valid}
+def show_ll1_table(ll1):
+    st.markdown('<div class="section-header"><h3>Tabla LL(1)</h3></div>', unsafe_allow_html=True)
+    conflicts = format_conflicts(ll1)
+    if conflicts:
+        st.warning(f"La forma normal de Greibach no es LL(1): {len(conflicts)} celdas con conflicto.")
+    else:
+        st.success("La forma normal de Greibach es LL(1): se puede analizar en tiempo lineal.")
+    with st.expander("Ver tabla de análisis predictivo", expanded=not conflicts and len(ll1["nonterminals"]) <= COLLAPSE_THRESHOLD):
+        if conflicts:
+            st.markdown("  \n".join(f"`{line}`" for line in conflicts))
+        st.dataframe(table_rows(ll1), hide_index=True, use_container_width=True)
+    st.download_button(label="Descargar tabla LL(1) (binaria)", data=lambda: ll1_to_bytes(ll1), file_name="tabla_ll1.bin", mime="application/octet-stream", on_click="ignore")
+    st.download_button(label="Descargar analizador descendente (Python)", data=lambda: generate_parser_source(ll1), file_name="analizador.py", mime="text/x-python", on_click="ignore")
 
-    ##############################
-    # Paso 4: Eliminación de recursividad izquierda inmediata
-    # Se separa para cada no terminal A:
-    #   nonrec = {p que no comienzan con A}
-    #   rec    = {p[1:] para las producciones de la forma A -> Aα}
-    # Si rec no es vacío se introduce un nuevo no terminal (con símbolo de longitud 1)
-    ##############################
-    def remove_left_rec_all(gram):
-        new_gram = {}
-        # Para elegir nuevos símbolos, empezamos con los usados presentes en la gramática
-        used = set(gram.keys())
-        for A in gram:
-            rec = []
-            nonrec = []
-            for prod in gram[A]:
-                if prod != "*" and prod and prod[0] == A:
-                    rec.append(prod[1:])
-                else:
-                    nonrec.append(prod)
-            if rec:
-                X = get_fresh_symbol(used)  # nuevo no terminal (una única letra)
-                new_rules_A = nonrec + [beta + X for beta in nonrec if beta != "*"]
-                new_rules_X = rec + [gamma + X for gamma in rec]
-                new_gram[A] = list(set(new_rules_A))
-                new_gram[X] = list(set(new_rules_X))
-            else:
-                new_gram[A] = gram[A]
-        return new_gram
+def show_lalr_tables(tables):
+    st.markdown('<div class="section-header"><h3>Tablas LALR(1)</h3></div>', unsafe_allow_html=True)
+    compressed = len(tables["action"]["value"]) + len(tables["goto"]["value"])
+    st.caption(f"{tables['states']} estados · tablas comprimidas por desplazamiento de filas: "
+               f"{compressed} celdas frente a {tables['dense_size']} en forma densa")
+    conflicts = format_lalr_conflicts(tables)
+    if conflicts:
+        st.warning(f"La gramática bien formada no es LALR(1): {len(conflicts)} conflictos (se resuelven prefiriendo desplazar y la regla anterior).")
+        with st.expander("Ver conflictos", expanded=False):
+            st.markdown("  \n".join(f"`{line}`" for line in conflicts[:RENDER_PAGE_SIZE]))
+            if len(conflicts) > RENDER_PAGE_SIZE:
+                st.caption(f"Se muestran {RENDER_PAGE_SIZE} de {len(conflicts)} conflictos.")
+    else:
+        st.success("La gramática bien formada es LALR(1).")
+    st.download_button(label="Descargar tablas LALR(1) (JSON)", data=lambda: lalr_to_json(tables), file_name="tablas_lalr.json", mime="application/json", on_click="ignore")
 
-    ##############################
-    # Paso 5: Expansión recursiva para que cada producción inicie con un terminal
-    # Si una producción comienza con un no terminal se expande usando sus producciones.
-    ##############################
-    def expand_prod(prod, gram):
-        if prod == "*" or (prod and prod[0].islower()):
-            return {prod}
-        results = set()
-        B = prod[0]
-        suffix = prod[1:]
-        for gamma in gram.get(B, []):
-            tails = expand_prod(suffix, gram) if suffix else {""}
-            for t in tails:
-                results.add(gamma + t)
-        return results
+@st.fragment
+def show_regular(dfa):
+    st.markdown('<div class="section-header"><h3>Autómata finito</h3></div>', unsafe_allow_html=True)
+    st.badge("Gramática regular", icon="✅", color="green")
+    kind = "derecha" if dfa["kind"] == "right" else "izquierda"
+    st.caption(f"Lineal por la {kind} · AFN {dfa['nfa_states']} estados → AFD {dfa['dfa_states']} → "
+               f"AFD mínimo {dfa['states']} estados · alfabeto {{{', '.join(dfa['alphabet'])}}}")
+    text = st.text_input("Probar cadena (vacía = ε):", key="regular_cadena")
+    if dfa_accepts(dfa, text):
+        st.markdown(f"✅ `{text or 'ε'}` pertenece al lenguaje.")
+    else:
+        st.markdown(f"❌ `{text or 'ε'}` no pertenece al lenguaje.")
+    st.download_button(label="Descargar AFD mínimo (JSON)", data=lambda: dfa_to_json(dfa), file_name="afd_minimo.json",
+                       mime="application/json", on_click="ignore")
 
-    ##############################
-    # Paso 6: Corrección de producciones (terminales en posiciones > 0)
-    # Cada producción debe quedar en la forma aV, donde "a" es terminal.
-    # Si en algún lugar (después del primero) aparece un terminal, se sustituye por un no terminal nuevo de longitud 1.
-    ##############################
-    def fix_trailing_prods(gram):
-        # Usaremos un conjunto para símbolos ya asignados; para nuevos símbolos se escogerá de "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-        used = set(gram.keys())
-        mapping = {}  # mapea terminal -> no terminal (letra única)
-        def get_fresh(mapping):
-            return get_fresh_symbol(used)
-        fixed_gram = {}
-        for A, prods in gram.items():
-            fixed = set()
-            for prod in prods:
-                if prod == "*" or len(prod) == 1:
-                    fixed.add(prod)
-                else:
-                    new_prod = prod[0]  # el primer símbolo se deja
-                    for ch in prod[1:]:
-                        if ch.islower():
-                            if ch not in mapping:
-                                mapping[ch] = get_fresh(mapping)
-                            new_prod += mapping[ch]
-                        else:
-                            new_prod += ch
-                    fixed.add(new_prod)
-            fixed_gram[A] = list(fixed)
-        # Agregar las reglas de los nuevos no terminales: X -> t
-        for t, X in mapping.items():
-            fixed_gram[X] = [t]
-        return fixed_gram
+def show_ambiguity(result):
+    st.markdown('<div class="section-header"><h3>Ambigüedad</h3></div>', unsafe_allow_html=True)
+    if result["ambiguous"]:
+        st.warning(f"La gramática es ambigua: `{result['string'] or 'ε'}` es la cadena más corta con dos árboles de derivación distintos.")
+        st.code("\n".join(format_tree(tree) for tree in result["trees"]), language=None)
+    elif result["ambiguous"] is None:
+        st.info("Análisis de ambigüedad no concluyente: el lenguaje tiene demasiadas cadenas por longitud.")
+    else:
+        st.success(f"Ninguna cadena de longitud ≤ {result['max_len']} tiene dos árboles de derivación.")
+    st.caption("Calculado sobre la gramática ingresada, con sus producciones ε y unitarias; un no terminal "
+               "que se deriva a sí mismo sin consumir símbolos da infinitos árboles (∞).")
+    with st.expander("Derivaciones y cadenas distintas por longitud"):
+        rows = [{"Longitud": n, "Derivaciones": "∞" if derivations == math.inf else str(derivations),
+                 "Cadenas distintas": "" if distinct is None else distinct}
+                for n, derivations, distinct in result["by_length"]]
+        st.dataframe(rows, hide_index=True)
 
-    # -------------------------------
-    # Aplicación secuencial de los pasos generales
-    # -------------------------------
-    gram1 = remove_epsilon_local(grammar, start)
-    gram2 = remove_unit_local(gram1)
-    gram3 = remove_useless_local(gram2, start)
-    gram4 = remove_left_rec_all(gram3)
-    expanded = {}
-    for A, prods in gram4.items():
-        exp_set = set()
-        for prod in prods:
-            exp_set |= expand_prod(prod, gram4)
-        expanded[A] = list(exp_set)
-    final = fix_trailing_prods(expanded)
-    return final
+# Árboles que se muestran del bosque; el resto solo se cuenta
+TREE_PREVIEW = 5
+MAX_FOREST_INPUT = 300
 
-def display_grammar(grammar, container):
-    for head, prods in grammar.items():
-        productions = []
-        for prod in prods:
-            if prod == "*":
-                productions.append("ε")
-            else:
-                productions.append(prod)
-        productions_str = " | ".join(productions)
-        container.markdown(f"**{head}** → {productions_str}")
+# Solo si la gramática trae pesos (S -> aB [0.7]): probabilidad de la cadena y su mejor árbol.
+# La FNC ponderada ya viene armada del trabajo de conversión.
+def show_probabilities(weighted, text):
+    st.markdown('<div class="section-header"><h3>Gramática probabilística</h3></div>', unsafe_allow_html=True)
+    if "error" in weighted:
+        st.warning(f"No se pueden calcular probabilidades: {weighted['error']}")
+        return
+    model = PCFG(weighted["tables"])
+    [total] = model.inside([text])
+    [(best, tree)] = model.viterbi([text])
+    if tree is None:
+        st.markdown(f"`{text or 'ε'}` tiene probabilidad 0.")
+    else:
+        st.markdown(f"P(`{text or 'ε'}`) = {math.exp(total):.4g} · log P = {total:.4f}")
+        st.caption(f"Árbol más probable (log P = {best:.4f}, {math.exp(best - total):.1%} de la probabilidad de la cadena):")
+        st.code(format_tree(tree), language=None)
+    with st.expander("Ver forma normal de Chomsky ponderada"):
+        st.code(weighted["text"], language=None)
+
+def show_forest(cnf, original, start, text):
+    try:
+        forest = parse_forest(cnf, start, text, original)
+    except ValueError as e:
+        st.warning(f"No se puede analizar: {e}")
+        return
+    if forest is None:
+        st.markdown(f"❌ `{text or 'ε'}` no pertenece al lenguaje.")
+        return
+    nodes, packed = forest.size()
+    total = count_trees(forest)
+    st.caption(f"{total} árbol(es) · bosque compartido con {nodes} nodos y {packed} alternativas empaquetadas")
+    trees = [format_tree(tree) for tree in itertools.islice(iter_trees(forest), TREE_PREVIEW)]
+    st.code("\n".join(trees), language=None)
+    if total > TREE_PREVIEW:
+        st.caption(f"Se muestran {TREE_PREVIEW} de {total} árboles.")
+
+# La probabilidad no depende del bosque: una cadena fuera del lenguaje tiene probabilidad 0
+@st.fragment
+def show_parse_forest(cnf, original, start, weighted):
+    st.markdown('<div class="section-header"><h3>Árboles de derivación</h3></div>', unsafe_allow_html=True)
+    text = st.text_input("Cadena a analizar con la forma normal de Chomsky (vacía = ε):", key="bosque_cadena")
+    if len(text) > MAX_FOREST_INPUT:
+        st.warning(f"La cadena supera {MAX_FOREST_INPUT} símbolos.")
+        return
+    if cnf is not None:
+        show_forest(cnf, original, start, text)
+    if weighted is not None:
+        show_probabilities(weighted, text)
+
+def show_job_results(job):
+    for key, title, label in CONVERSION_STAGES:
+        if key in job.results:
+            notes = []
+            if key in job.stored:
+                notes.append(f"Recuperada del almacén persistente (calculada en {job.timings.get(key, 0):.3f} s)")
+            elif key in job.timings:
+                notes.append(f"Calculada en {job.timings[key]:.3f} s")
+            if key == "original":
+                classes = terminal_classes(job.results[key])
+                if len(classes) < classes.terminals():
+                    notes.append(f"{classes.terminals()} terminales en {len(classes)} clases de equivalencia "
+                                 "(aparecen en los mismos contextos)")
+            skipped = [entry["pass"] for entry in job.passes.get(key, ()) if entry["skipped"]]
+            if skipped:
+                notes.append(f"Pasadas omitidas porque sus propiedades ya se cumplían: {', '.join(skipped)}")
+            if key in job.sizes:
+                (heads_before, rules_before), (heads_after, rules_after) = job.sizes[key]
+                notes.append(f"Minimización: {heads_before} → {heads_after} no terminales, "
+                             f"{rules_before} → {rules_after} reglas")
+            caption = " · ".join(notes) or None
+            show_grammar_section(title, label, job.results[key], key, caption)
+        if key in job.factored:
+            factored, (rules_before, branching_before), (rules_after, branching_after) = job.factored[key]
+            caption = (f"Reglas: {rules_before} → {rules_after} · ramificación media por terminal inicial: "
+                       f"{branching_before:.2f} → {branching_after:.2f}")
+            if key == "greibach":
+                caption += " · los restos factorizados pueden empezar con no terminales"
+            show_grammar_section(f"{title} factorizada por la izquierda", f"{label} factorizada", factored, f"{key}_factorizada", caption)
+    if job.regular is not None:
+        show_regular(job.regular)
+    if job.ambiguity is not None:
+        show_ambiguity(job.ambiguity)
+    cnf = job.results.get("chomsky")
+    if cnf is not None and job.start_symbol not in cnf:
+        cnf = None
+    if job.done and (cnf is not None or job.weighted is not None):
+        show_parse_forest(cnf, job.results["original"], job.start_symbol, job.weighted)
+    show_equivalence_checks(job.checks)
+    if job.lalr is not None:
+        show_lalr_tables(job.lalr)
+    if job.ll1 is not None:
+        show_ll1_table(job.ll1)
+    for key, title, label in CONVERSION_STAGES:
+        if key in job.skip:
+            st.warning(f"Se omitió la {title}: la estimación de reglas supera el presupuesto configurado.")
+    if job.cancelled:
+        st.warning("Conversión cancelada. Se muestran las etapas que alcanzaron a completarse.")
+    if isinstance(job.error, WorkerLimitExceeded):
+        st.error(f"{job.error} Prueba con una gramática más pequeña o omite etapas.")
+    elif job.error is not None:
+        st.error(f"Error al procesar la gramática: {str(job.error)}")
+        st.error("Asegúrate de que la gramática esté correctamente formateada.")
+    if job.done:
+        show_downloads(job)
+
+# Fragmento: cambiar el formato o la compresión solo vuelve a ejecutar esta sección
+@st.fragment
+def show_downloads(job):
+    downloads = [
+        ("bien_formada", "Descargar Bien Formada", "gramatica_bien_formada"),
+        ("chomsky", "Descargar Chomsky", "forma_normal_chomsky"),
+        ("greibach", "Descargar Greibach", "forma_normal_greibach"),
+    ]
+    if any(key in job.results for key, _, _ in downloads):
+        st.markdown('<div class="section-header"><h3>Descargar resultados</h3></div>', unsafe_allow_html=True)
+        col_format, col_compress = st.columns(2)
+        with col_format:
+            fmt = st.selectbox("Formato", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f][0], key="export_format")
+        with col_compress:
+            compress = st.checkbox("Comprimir (gzip)", key="export_gzip")
+        cols = st.columns(3)
+        for col, (key, label, base) in zip(cols, downloads):
+            if key in job.results:
+                with col:
+                    # El archivo se genera por bloques al hacer clic, no en cada ejecución del script
+                    st.download_button(label=label, data=lambda grammar=job.results[key]: export_grammar(grammar, fmt, compress),
+                                       file_name=export_file_name(base, fmt, compress), mime=export_mime(fmt, compress), on_click="ignore")
+
+# Un solo almacén por proceso; el archivo SQLite se comparte entre réplicas
+@st.cache_resource
+def get_result_store():
+    try:
+        return ResultStore()
+    except Exception:
+        return None
+
+# Procesos de trabajo con límites de memoria y CPU, compartidos por todas las sesiones.
+# Donde no se pueden crear (sin fork ni resource) la conversión corre en el propio proceso.
+@st.cache_resource
+def get_worker_pool():
+    try:
+        return WorkerPool()
+    except Exception:
+        return None
+
+def show_imported_symbols(imported):
+    rows = [{"Símbolo": symbol, "Nombre": name} for symbol, name in imported["names"].items()]
+    with st.expander(f"Símbolos importados ({len(rows)})"):
+        st.caption("Cada nombre o token se representa con un solo carácter: mayúsculas para no terminales y minúsculas para terminales.")
+        st.dataframe(rows, hide_index=True)
+
+def show_estimate(input_text, start):
+    # Análisis estático previo a "Convertir": predice el tamaño de cada etapa
+    try:
+        estimate = estimate_conversion(parse_grammar(input_text), start)
+    except Exception:
+        return False, []
+    refused, skipped = plan_conversion(estimate)
+    st.caption(
+        f"Estimación previa (aproximada, el tamaño real puede ser mayor): "
+        f"{estimate['nullable']} no terminales anulables · "
+        f"bien formada ~{format_estimate(estimate['bien_formada'])} reglas · "
+        f"Chomsky ~{format_estimate(estimate['chomsky'])} · "
+        f"Greibach ~{format_estimate(estimate['greibach'])}"
+    )
+    if estimate["indirect_left_recursive"]:
+        st.caption(f"Recursividad izquierda indirecta en: {', '.join(sorted(estimate['indirect_left_recursive']))}")
+    if refused:
+        st.warning("La gramática bien formada excede el presupuesto de reglas; la conversión será rechazada.")
+    elif skipped:
+        st.warning(f"Etapas que se omitirán por exceder el presupuesto: {', '.join(skipped)}")
+    return refused, skipped
+
+# Conversiones terminadas que se conservan por sesión, por entrada
+SESSION_JOBS = 5
+
+# Reutiliza la conversión de la misma entrada (gramática, inicial y opciones) si ya
+# terminó bien o sigue en curso; solo se calcula de nuevo si se canceló o falló
+def start_conversion(key):
+    jobs = st.session_state.setdefault("conversion_jobs", {})
+    previous = st.session_state.get("conversion_job")
+    if previous is not None and not previous.done and jobs.get(key) is not previous:
+        # Una conversión a medias de otra entrada se cancela y se descarta
+        previous.cancel()
+        for old in [k for k, j in jobs.items() if j is previous]:
+            del jobs[old]
+    job = jobs.pop(key, None)
+    if job is None or job.cancelled or job.error is not None:
+        input_text, start, skipped, minimize, factor = key
+        job = ConversionJob(input_text, start, skipped, minimize, factor, get_result_store(), get_worker_pool()).start()
+    jobs[key] = job
+    while len(jobs) > SESSION_JOBS:
+        jobs.pop(next(iter(jobs))).cancel()
+    st.session_state.conversion_job = job
+
+def clear_inputs():
+    job = st.session_state.pop("conversion_job", None)
+    if job is not None:
+        job.cancel()
+    st.session_state.conversion_jobs = {}
+    st.session_state.input_grammar = ""
+    st.session_state.input_ebnf = ""
+    st.session_state.start_symbol = "S"
 
 def main():
     st.set_page_config(page_title="Conversor de Gramáticas", page_icon="🔤", layout="wide")
@@ -391,6 +427,7 @@ def main():
     </style>
     """, unsafe_allow_html=True)
     st.markdown('<h1 class="main-title">Conversor de Gramáticas</h1>', unsafe_allow_html=True)
+    st.session_state.setdefault("start_symbol", "S")
     with st.sidebar:
         st.header("Acerca de las conversiones")
         st.markdown("""
@@ -424,9 +461,33 @@ def main():
         - `->` para las producciones
         - `|` para separar alternativas
         - `*` para representar epsilon/vacío
+        - `[0.7]` al final de una alternativa para darle un peso (opcional)
         """)
-        input_grammar = st.text_area("Gramática:", height=200, placeholder="S -> bA | aB\nA -> bAA | aS | a\nB -> aBB | bS | b")
-        start_symbol = st.text_input("Símbolo inicial:", value='S')
+        input_format = st.radio("Formato de entrada:", ["Un carácter por símbolo", "BNF / EBNF"], horizontal=True)
+        if input_format == "BNF / EBNF":
+            input_grammar = st.text_area("Gramática:", height=200, key="input_ebnf", placeholder='<expr> ::= <term> ("+" <term>)*\n<term> ::= "x" | "(" <expr> ")"')
+            start_symbol = None
+            if input_grammar:
+                try:
+                    imported = import_ebnf(input_grammar)
+                except ValueError as e:
+                    st.error(f"No se pudo importar la gramática: {e}")
+                    input_grammar = ""
+                else:
+                    # El resto de la aplicación trabaja sobre la gramática traducida
+                    input_grammar = grammar_to_text(imported["grammar"])
+                    start_symbol = imported["start"]
+                    st.caption(f"Símbolo inicial: {imported['names'][start_symbol]} ({start_symbol}), la primera regla.")
+                    show_imported_symbols(imported)
+        else:
+            input_grammar = st.text_area("Gramática:", height=200, key="input_grammar", placeholder="S -> bA | aB\nA -> bAA | aS | a\nB -> aBB | bS | b")
+            start_symbol = st.text_input("Símbolo inicial:", key="start_symbol")
+        minimize = st.checkbox("Fusionar no terminales equivalentes en Chomsky y Greibach", value=True)
+        factor = st.multiselect("Factorizar por la izquierda:", ["bien_formada", "greibach"],
+                                format_func={"bien_formada": "Gramática bien formada", "greibach": "Forma normal de Greibach"}.get)
+        refused, skipped = False, []
+        if input_grammar:
+            refused, skipped = show_estimate(input_grammar, start_symbol)
     with col2:
         st.markdown('<div class="info-box">', unsafe_allow_html=True)
         st.markdown("""
@@ -439,52 +500,22 @@ def main():
         """)
         st.markdown('</div>', unsafe_allow_html=True)
         convert_button = st.button("Convertir", type="primary", use_container_width=True)
-        if st.button("Limpiar", type="secondary", use_container_width=True):
-            st.session_state.input_grammar = ""
-            st.session_state.start_symbol = "S"
-            st.experimental_rerun()
+        # El callback corre antes de volver a crear los widgets, así que puede reiniciarlos
+        st.button("Limpiar", type="secondary", use_container_width=True, on_click=clear_inputs)
     if convert_button and input_grammar:
-        try:
-            grammar = parse_grammar(input_grammar)
-            st.markdown('<div class="section-header"><h3>Gramática Original</h3></div>', unsafe_allow_html=True)
-            with st.expander("Ver gramática original", expanded=True):
-                st.markdown('<div class="grammar-container">', unsafe_allow_html=True)
-                display_grammar(grammar, st)
-                st.markdown('</div>', unsafe_allow_html=True)
-            st.markdown('<div class="section-header"><h3>Gramática Bien Formada</h3></div>', unsafe_allow_html=True)
-            well_formed = remove_useless(remove_unit(remove_epsilon(grammar, start_symbol), start_symbol), start_symbol)
-            with st.expander("Ver gramática bien formada", expanded=True):
-                st.markdown('<div class="grammar-container">', unsafe_allow_html=True)
-                display_grammar(well_formed, st)
-                st.markdown('</div>', unsafe_allow_html=True)
-            st.markdown('<div class="section-header"><h3>Forma Normal de Chomsky</h3></div>', unsafe_allow_html=True)
-            cnf = to_cnf(grammar, start_symbol)
-            with st.expander("Ver forma normal de Chomsky", expanded=True):
-                st.markdown('<div class="grammar-container">', unsafe_allow_html=True)
-                display_grammar(cnf, st)
-                st.markdown('</div>', unsafe_allow_html=True)
-            st.markdown('<div class="section-header"><h3>Forma Normal de Greibach</h3></div>', unsafe_allow_html=True)
-            gnf = to_gnf(grammar, start_symbol)
-            with st.expander("Ver forma normal de Greibach", expanded=True):
-                st.markdown('<div class="grammar-container">', unsafe_allow_html=True)
-                display_grammar(gnf, st)
-                st.markdown('</div>', unsafe_allow_html=True)
-            st.markdown('<div class="section-header"><h3>Descargar resultados</h3></div>', unsafe_allow_html=True)
-            col1, col2, col3 = st.columns(3)
-            def grammar_to_text(grammar):
-                result = []
-                for head, prods in grammar.items():
-                    result.append(f"{head} -> {' | '.join(prods)}")
-                return "\n".join(result)
-            with col1:
-                st.download_button(label="Descargar Bien Formada", data=grammar_to_text(well_formed), file_name="gramatica_bien_formada.txt", mime="text/plain")
-            with col2:
-                st.download_button(label="Descargar Chomsky", data=grammar_to_text(cnf), file_name="forma_normal_chomsky.txt", mime="text/plain")
-            with col3:
-                st.download_button(label="Descargar Greibach", data=grammar_to_text(gnf), file_name="forma_normal_greibach.txt", mime="text/plain")
-        except Exception as e:
-            st.error(f"Error al procesar la gramática: {str(e)}")
-            st.error("Asegúrate de que la gramática esté correctamente formateada.")
+        if refused:
+            previous = st.session_state.pop("conversion_job", None)
+            if previous is not None:
+                previous.cancel()
+            st.error("Conversión rechazada: la estimación de reglas excede el presupuesto. Reduce los símbolos anulables o el tamaño de la gramática.")
+        else:
+            start_conversion((input_grammar, start_symbol, tuple(skipped), minimize, tuple(factor)))
+    job = st.session_state.get("conversion_job")
+    if job is not None:
+        st.session_state.conversion_shown = len(job.results)
+        if not job.done:
+            show_job_progress(job)
+        show_job_results(job)
     st.markdown("---")
     st.markdown("""
         <div style='text-align: center; opacity: 0.7;'>
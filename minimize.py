@@ -0,0 +1,75 @@
+from collections import defaultdict
+
+def grammar_size(grammar):
+    return len(grammar), sum(len(prods) for prods in grammar.values())
+
+# Firma de un no terminal: su conjunto de reglas con cada no terminal
+# reemplazado por el bloque al que pertenece
+def _signature(prods, block, heads):
+    return frozenset(tuple(block[s] if s in heads else s for s in prod) for prod in prods)
+
+# Refinamiento de particiones: se parte de un único bloque y se divide cada bloque
+# según la firma de sus miembros hasta que ninguno cambia. Como en Hopcroft, la
+# parte más grande conserva el identificador del bloque y solo se revisan los
+# no terminales que usan a los que cambiaron de bloque.
+def equivalent_nonterminals(grammar):
+    heads = set(grammar)
+    users = defaultdict(set)
+    for head, prods in grammar.items():
+        for prod in prods:
+            for s in prod:
+                if s in heads:
+                    users[s].add(head)
+    block = {head: 0 for head in grammar}
+    members = {0: list(grammar)}
+    next_id = 1
+    dirty = set(grammar)
+    while dirty:
+        pending = {block[head] for head in dirty}
+        dirty = set()
+        for b in pending:
+            groups = defaultdict(list)
+            for head in members[b]:
+                groups[_signature(grammar[head], block, heads)].append(head)
+            if len(groups) == 1:
+                continue
+            parts = sorted(groups.values(), key=len, reverse=True)
+            members[b] = parts[0]
+            for part in parts[1:]:
+                members[next_id] = part
+                for head in part:
+                    block[head] = next_id
+                    dirty |= users[head]
+                next_id += 1
+    return [part for part in members.values() if len(part) > 1]
+
+def minimize_grammar(grammar, start):
+    merged = {}
+    current = grammar
+    while True:
+        classes = equivalent_nonterminals(current)
+        if not classes:
+            return current, merged
+        order = {head: i for i, head in enumerate(current)}
+        rename = {}
+        for part in classes:
+            # Representante estable: el inicial si está en la clase, si no el primero en aparecer
+            rep = start if start in part else min(part, key=order.get)
+            for head in part:
+                if head != rep:
+                    rename[head] = rep
+                    merged[head] = rep
+        for old, new in merged.items():
+            if new in rename:
+                merged[old] = rename[new]
+        result = {}
+        for head, prods in current.items():
+            if head in rename:
+                continue
+            seen = []
+            for prod in prods:
+                new_prod = ''.join(rename.get(s, s) for s in prod)
+                if new_prod not in seen:
+                    seen.append(new_prod)
+            result[head] = seen
+        current = result
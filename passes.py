@@ -0,0 +1,271 @@
+import argparse
+import time
+from symbols import EXTRA_UPPER
+from grammar import parse_grammar, find_nullable, useful_symbols, remove_epsilon, remove_unit, remove_useless, cnf_from_clean, to_gnf, grammar_to_text
+
+# Propiedades que la gramática lleva consigo entre pasadas
+EPSILON_FREE = "sin_epsilon"
+UNIT_FREE = "sin_unitarias"
+NO_USELESS = "sin_inutiles"
+NO_LEFT_RECURSION = "sin_recursion_izquierda"
+CNF = "fnc"
+GNF = "fng"
+PROPERTY_LABELS = {
+    EPSILON_FREE: "sin ε",
+    UNIT_FREE: "sin unitarias",
+    NO_USELESS: "sin símbolos inútiles",
+    NO_LEFT_RECURSION: "sin recursión izquierda",
+    CNF: "FNC",
+    GNF: "FNG",
+}
+ALL_PROPERTIES = frozenset(PROPERTY_LABELS)
+
+def _is_nonterminal(grammar, s):
+    return s in grammar or s.isupper()
+
+# Solo el inicial puede derivar ε y, si lo hace, cada producción ya trae sus variantes
+# sin el inicial, como deja remove_epsilon. Basta con mirar borrados de a una ocurrencia:
+# la variante también está en la gramática y se revisa a su vez.
+def _epsilon_free(grammar, start):
+    if any('*' in prods for head, prods in grammar.items() if head != start):
+        return False
+    nullable = find_nullable(grammar)
+    if not nullable <= {start}:
+        return False
+    if start not in nullable:
+        return True
+    for prods in grammar.values():
+        present = set(prods)
+        for prod in prods:
+            for i, s in enumerate(prod):
+                if s == start and prod[:i] + prod[i + 1:] and prod[:i] + prod[i + 1:] not in present:
+                    return False
+    return True
+
+def _unit_free(grammar, start):
+    return not any(prod in grammar for prods in grammar.values() for prod in prods)
+
+# Lo mismo que remove_useless(grammar, start) == grammar, sin construir la gramática limpia
+def _no_useless(grammar, start):
+    valid = useful_symbols(grammar, start)
+    if not set(grammar) <= valid:
+        return False
+    return all(not s.isupper() or s in valid for prods in grammar.values() for prod in prods for s in prod)
+
+# Recursión izquierda directa o indirecta: un ciclo en la relación "B es esquina izquierda
+# de A" (B aparece en A -> αBβ con α anulable)
+def _no_left_recursion(grammar, start):
+    nullable = find_nullable(grammar)
+    corners = {}
+    for head, prods in grammar.items():
+        edges = set()
+        for prod in prods:
+            if prod == '*':
+                continue
+            for s in prod:
+                if s in grammar:
+                    edges.add(s)
+                if s not in nullable:
+                    break
+        corners[head] = edges
+    state = {}
+    for root in grammar:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(corners[root]))]
+        while stack:
+            node, edges = stack[-1]
+            for nxt in edges:
+                if state.get(nxt) == 1:
+                    return False
+                if nxt not in state:
+                    state[nxt] = 1
+                    stack.append((nxt, iter(corners[nxt])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+    return True
+
+def _cnf(grammar, start):
+    for head, prods in grammar.items():
+        for prod in prods:
+            if prod == '*':
+                if head != start:
+                    return False
+            elif len(prod) == 1:
+                if _is_nonterminal(grammar, prod):
+                    return False
+            elif len(prod) != 2 or not all(s in grammar for s in prod):
+                return False
+    return True
+
+def _gnf(grammar, start):
+    for head, prods in grammar.items():
+        for prod in prods:
+            if prod == '*':
+                if head != start:
+                    return False
+            elif _is_nonterminal(grammar, prod[0]) or not all(_is_nonterminal(grammar, s) for s in prod[1:]):
+                return False
+    return True
+
+CHECKS = {
+    EPSILON_FREE: _epsilon_free,
+    UNIT_FREE: _unit_free,
+    NO_USELESS: _no_useless,
+    NO_LEFT_RECURSION: _no_left_recursion,
+    CNF: _cnf,
+    GNF: _gnf,
+}
+
+# Propiedades que se deducen de otras sin mirar la gramática
+IMPLIED = {
+    CNF: {UNIT_FREE},
+    GNF: {UNIT_FREE, NO_LEFT_RECURSION},
+}
+
+def _with_implied(properties):
+    return frozenset(properties).union(*(IMPLIED.get(p, ()) for p in properties))
+
+def detect_properties(grammar, start):
+    return frozenset(name for name, check in CHECKS.items() if check(grammar, start))
+
+# Algoritmo de Paull: se sustituyen las esquinas izquierdas anteriores en el orden de las
+# cabezas y después se quita la recursión inmediata con A -> β | βX, X -> α | αX. Si el
+# inicial deriva ε puede quedar recursión oculta a través de él, por eso la pasada
+# verifica NO_LEFT_RECURSION en lugar de garantizarla.
+def remove_left_recursion(grammar, start, progress=None):
+    heads = list(grammar)
+    used = set(heads) | {s for prods in grammar.values() for prod in prods for s in prod}
+    # Fuera de las letras ASCII, que to_cnf y to_gnf usan para sus propios símbolos frescos
+    pool = (c for c in EXTRA_UPPER if c not in used)
+    result = {}
+    for i, A in enumerate(heads):
+        if progress is not None:
+            progress("remove_left_recursion", i)
+        earlier = set(heads[:i])
+        prods = list(grammar[A])
+        # Sin ε cada ronda sube el índice de la esquina izquierda, así que bastan i rondas;
+        # con ε (si la pasada corre sin sus requisitos) la sustitución podría no terminar
+        for _ in range(i):
+            if not any(prod != '*' and prod[0] in earlier for prod in prods):
+                break
+            expanded = []
+            for prod in prods:
+                if prod != '*' and prod[0] in earlier:
+                    for alpha in result[prod[0]]:
+                        if alpha == '*':
+                            expanded.append(prod[1:] or '*')
+                        else:
+                            expanded.append(alpha + prod[1:])
+                else:
+                    expanded.append(prod)
+            prods = list(dict.fromkeys(expanded))
+        rec = [prod[1:] for prod in prods if prod != '*' and prod[0] == A and len(prod) > 1]
+        nonrec = [prod for prod in prods if prod == '*' or prod[0] != A]
+        if rec:
+            X = next(pool, None)
+            if X is None:
+                raise ValueError("No quedan símbolos libres para eliminar la recursión izquierda.")
+            nonrec = nonrec + [("" if beta == '*' else beta) + X for beta in nonrec]
+            result[X] = list(dict.fromkeys(rec + [alpha + X for alpha in rec]))
+        result[A] = list(dict.fromkeys(nonrec))
+    # Las cabezas originales primero, como en el resto de las transformaciones
+    ordered = {head: result[head] for head in heads}
+    ordered.update(result)
+    return ordered
+
+# Cada pasada declara qué propiedades necesita, cuáles deja establecidas y cuáles conserva
+# sin necesidad de volver a comprobarlas. Las de verify son las que establece o conserva
+# salvo en casos borde: son las únicas que se comprueban después de ejecutarla.
+class Pass:
+    def __init__(self, name, run, requires=(), establishes=(), preserves=(), verify=()):
+        self.name = name
+        self.run = run
+        self.requires = frozenset(requires)
+        self.establishes = frozenset(establishes)
+        self.preserves = frozenset(preserves)
+        self.verify = frozenset(verify)
+
+PASSES = {p.name: p for p in (
+    # Quitar reglas puede dejar inalcanzable una cabeza que solo aparecía en ellas
+    Pass("remove_useless", remove_useless, establishes={NO_USELESS}, preserves=ALL_PROPERTIES, verify={NO_USELESS}),
+    # Si el inicial es anulable y aparece en un cuerpo, A -> S deja anulable a A
+    Pass("remove_epsilon", remove_epsilon, establishes={EPSILON_FREE}, preserves={NO_LEFT_RECURSION, GNF},
+         verify={EPSILON_FREE}),
+    # Con el inicial anulable, A -> S pasa a A -> ε
+    Pass("remove_unit", remove_unit, establishes={UNIT_FREE}, preserves={EPSILON_FREE, NO_LEFT_RECURSION, CNF, GNF},
+         verify={EPSILON_FREE}),
+    Pass("remove_left_recursion", remove_left_recursion, requires={EPSILON_FREE, UNIT_FREE},
+         establishes={NO_LEFT_RECURSION}, verify={NO_LEFT_RECURSION}),
+    # Los no terminales nuevos son alcanzables y productivos y no agregan esquinas
+    # izquierdas; A -> SB con el inicial anulable ya no tiene su variante A -> B, y un
+    # no terminal sin reglas deja fuera de la FNC los cuerpos donde aparece
+    Pass("to_cnf", cnf_from_clean, requires={EPSILON_FREE, UNIT_FREE}, establishes={CNF},
+         preserves={EPSILON_FREE, NO_USELESS, NO_LEFT_RECURSION}, verify={EPSILON_FREE, CNF}),
+    # to_gnf hace su propia limpieza, que no coincide del todo con las pasadas de arriba
+    Pass("to_gnf", to_gnf, establishes={GNF}, verify={GNF}),
+)}
+
+# El orden de main() para la gramática bien formada y el de to_cnf para la FNC
+WELL_FORMED = ("remove_epsilon", "remove_unit", "remove_useless")
+CHOMSKY = ("remove_useless", "remove_epsilon", "remove_unit", "remove_useless", "to_cnf")
+
+# Ejecuta las pasadas en orden. Las propiedades se detectan una vez al principio y después
+# se siguen con lo que cada pasada declara; solo se comprueban las de verify que la pasada
+# buscaba o que valían antes. Una pasada cuyas propiedades ya valen se omite sin mirar
+# la gramática. Si falta un requisito la pasada se ejecuta igual, lo que establece o
+# conserva pasa a comprobarse y queda anotado en el registro.
+def run_pipeline(grammar, start, pipeline, properties=None, progress=None):
+    if properties is None:
+        properties = detect_properties(grammar, start)
+    properties = _with_implied(properties)
+    log = []
+    for name in pipeline:
+        if name not in PASSES:
+            raise ValueError(f"Pasada desconocida: {name}")
+        step = PASSES[name]
+        if step.establishes <= properties:
+            log.append({"pass": name, "skipped": True, "seconds": 0.0, "missing": []})
+            continue
+        missing = sorted(step.requires - properties)
+        started = time.perf_counter()
+        grammar = step.run(grammar, start, progress)
+        verify = step.verify | step.establishes | step.preserves if missing else step.verify
+        candidates = verify & (step.establishes | properties)
+        trusted = ((properties & step.preserves) | step.establishes) - verify
+        properties = _with_implied(trusted | frozenset(p for p in candidates if CHECKS[p](grammar, start)))
+        log.append({"pass": name, "skipped": False, "seconds": time.perf_counter() - started, "missing": missing})
+    return {"grammar": grammar, "properties": properties, "log": log}
+
+def format_log(log):
+    lines = []
+    for entry in log:
+        if entry["skipped"]:
+            lines.append(f"{entry['pass']}: omitida")
+            continue
+        line = f"{entry['pass']}: {1000 * entry['seconds']:.1f} ms"
+        if entry["missing"]:
+            line += " (sin garantizar: " + ", ".join(PROPERTY_LABELS[p] for p in entry["missing"]) + ")"
+        lines.append(line)
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta una secuencia de pasadas sobre una gramática.")
+    parser.add_argument("archivo", help="archivo con la gramática")
+    parser.add_argument("pasadas", nargs="*", default=list(CHOMSKY), help=f"pasadas en orden: {', '.join(PASSES)}")
+    parser.add_argument("--inicial", default="S", help="símbolo inicial")
+    args = parser.parse_args()
+    with open(args.archivo, encoding="utf-8") as f:
+        grammar = parse_grammar(f.read())
+    run = run_pipeline(grammar, args.inicial, args.pasadas)
+    print(grammar_to_text(run["grammar"]))
+    print()
+    for line in format_log(run["log"]):
+        print(line)
+    print("Propiedades: " + ", ".join(PROPERTY_LABELS[p] for p in PROPERTY_LABELS if p in run["properties"]))
+
+if __name__ == "__main__":
+    main()
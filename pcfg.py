@@ -0,0 +1,547 @@
+import argparse
+import math
+import random
+import time
+import numpy as np
+from symbols import EXTRA_UPPER
+from forest import format_tree
+from grammar import parse_grammar
+
+# Las probabilidades de terminar y de derivar ε son el menor punto fijo de un sistema
+# polinomial x = f(x); se busca con el método de Newton desde cero hasta que deja de cambiar
+FIXED_POINT_TOLERANCE = 1e-12
+FIXED_POINT_ITERATIONS = 200
+# En raíces dobles (gramáticas críticas) Newton se frena cerca de 1: lo que queda a esta
+# distancia se toma como 1
+SNAP_TO_ONE = 1e-6
+# Oraciones de la misma longitud que se analizan juntas en un mismo diagrama
+DEFAULT_BATCH = 64
+# Elementos como máximo del tensor (oraciones, inicios, cortes, reglas) en cada paso del
+# diagrama: los cortes de una longitud se recorren en tramos y se acumulan
+CHART_CHUNK = 1 << 21
+
+def _is_nonterminal(grammar, s):
+    return s in grammar or s.isupper()
+
+# Probabilidades por cabeza a partir de los pesos de parse_grammar: una regla sin peso
+# vale 1 y los pesos de cada cabeza se dividen por su suma
+def normalize_weights(grammar, weights):
+    probs = {}
+    for head, prods in grammar.items():
+        rules = list(dict.fromkeys(prods))
+        values = [weights.get((head, prod), 1.0) for prod in rules]
+        total = sum(values)
+        if total <= 0:
+            raise ValueError(f"Los pesos de las reglas de {head} suman cero.")
+        for prod, value in zip(rules, values):
+            if value > 0:
+                probs[(head, prod)] = value / total
+    return probs
+
+# factors(prod) da los no terminales cuyo valor se multiplica en el cuerpo, o None si el
+# cuerpo no aporta. Desde cero, Newton crece de forma monótona hacia el menor punto fijo.
+def _least_fixed_point(rules, factors):
+    heads = list(rules)
+    index = {head: i for i, head in enumerate(heads)}
+    terms = []
+    for head, prods in rules.items():
+        for prod, p in prods.items():
+            symbols = factors(prod)
+            if symbols is not None and all(s in index for s in symbols):
+                terms.append((index[head], p, [index[s] for s in symbols]))
+    x = np.zeros(len(heads))
+    for _ in range(FIXED_POINT_ITERATIONS):
+        f = np.zeros(len(heads))
+        jacobian = np.zeros((len(heads), len(heads)))
+        for A, p, symbols in terms:
+            values = x[symbols]
+            f[A] += p * math.prod(values)
+            for k, B in enumerate(symbols):
+                jacobian[A, B] += p * math.prod(np.delete(values, k))
+        try:
+            step = np.linalg.solve(np.eye(len(heads)) - jacobian, f - x)
+        except np.linalg.LinAlgError:
+            step = f - x
+        if not np.all(np.isfinite(step)):
+            step = f - x
+        updated = np.clip(x + step, x, 1.0)
+        change = np.max(updated - x, initial=0.0)
+        x = updated
+        if change < FIXED_POINT_TOLERANCE:
+            break
+    return {head: 1.0 if x[i] > 1.0 - SNAP_TO_ONE else float(x[i]) for head, i in index.items()}
+
+# Dividir por la suma y no por t(A) o 1 - e(A) evita arrastrar el error del punto fijo
+def _normalize(prods):
+    total = sum(prods.values())
+    return {prod: p / total for prod, p in prods.items()}
+
+def _reachable(rules, start):
+    seen = {start}
+    stack = [start]
+    while stack:
+        for prod in rules.get(stack.pop(), {}):
+            for s in prod:
+                if s in rules and s not in seen:
+                    seen.add(s)
+                    stack.append(s)
+    return {head: prods for head, prods in rules.items() if head in seen}
+
+# FNC ponderada equivalente como distribución: cada cadena no vacía conserva su
+# probabilidad (condicionada a que la derivación termine). Devuelve (fnc, probs, alias)
+# con probs = {(cabeza, producción): probabilidad} y alias = {copia: inicial} si hizo
+# falta una copia del inicial que no derive ε. Los pasos son los de to_cnf, pero con
+# sus propias cuentas:
+#   - se condiciona a terminar: p'(A -> α) = p(A -> α)·Π t(B) / t(A), con t(B) la
+#     probabilidad de que B derive alguna cadena; las reglas con t = 0 desaparecen;
+#   - ε: cada A pasa a significar "A deriva algo no vacío". Borrar la ocurrencia de B
+#     multiplica por e(B) y conservarla por 1 - e(B), y se divide por 1 - e(A);
+#   - unitarias: con U[A, B] = p(A -> B), A hereda las reglas de B con peso (I - U)⁻¹[A, B];
+#   - binarización y terminales en reglas largas: los ayudantes nuevos tienen probabilidad 1.
+def to_weighted_cnf(grammar, weights, start):
+    rules = {}
+    for (head, prod), p in normalize_weights(grammar, weights).items():
+        rules.setdefault(head, {})[prod] = p
+
+    def nonterminals(prod):
+        return [s for s in prod if _is_nonterminal(grammar, s)]
+
+    t = _least_fixed_point(rules, nonterminals)
+    if t.get(start, 0.0) == 0.0:
+        raise ValueError(f"El símbolo inicial {start} no deriva ninguna cadena.")
+    finite = {}
+    for head, prods in rules.items():
+        kept = {prod: p * math.prod(t.get(s, 0.0) for s in nonterminals(prod)) for prod, p in prods.items()}
+        kept = {prod: p for prod, p in kept.items() if p > 0}
+        if kept:
+            finite[head] = _normalize(kept)
+    finite = _reachable(finite, start)
+
+    def only_nonterminals(prod):
+        if prod == '*':
+            return []
+        return list(prod) if all(s in finite for s in prod) else None
+
+    e = _least_fixed_point(finite, only_nonterminals)
+    nonempty = {}
+    for head, prods in finite.items():
+        if e[head] >= 1.0:
+            continue
+        out = {}
+        for prod, p in prods.items():
+            if prod == '*':
+                continue
+            optional = [i for i, s in enumerate(prod) if e.get(s, 0.0) > 0]
+            for mask in range(1 << len(optional)):
+                q = p
+                deleted = set()
+                for bit, i in enumerate(optional):
+                    if mask >> bit & 1:
+                        q *= e[prod[i]]
+                        deleted.add(i)
+                body = "".join(s for i, s in enumerate(prod) if i not in deleted)
+                if not body:
+                    continue
+                q *= math.prod(1.0 - e[s] for s in body if s in finite)
+                if q > 0:
+                    out[body] = out.get(body, 0.0) + q
+        if out:
+            nonempty[head] = _normalize(out)
+    aliases = {}
+    used = set(grammar) | {s for prods in grammar.values() for prod in prods for s in prod}
+    fresh = (c for c in EXTRA_UPPER if c not in used)
+
+    def new_symbol():
+        symbol = next(fresh, None)
+        if symbol is None:
+            raise ValueError("No quedan símbolos libres para la FNC ponderada.")
+        return symbol
+
+    empty = e[start]
+    if empty > 0:
+        # Si el inicial aparece en algún cuerpo, ahí se usa una copia que no deriva ε
+        if any(start in prod for prods in nonempty.values() for prod in prods):
+            copy = new_symbol()
+            aliases[copy] = start
+            nonempty = {head: {prod.replace(start, copy): p for prod, p in prods.items()}
+                        for head, prods in nonempty.items()}
+            nonempty[copy] = nonempty[start]
+            nonempty[start] = {copy: 1.0 - empty}
+        else:
+            nonempty[start] = {prod: p * (1.0 - empty) for prod, p in nonempty.get(start, {}).items()}
+        nonempty[start]['*'] = empty
+
+    heads = list(nonempty)
+    index = {head: i for i, head in enumerate(heads)}
+    unit = np.zeros((len(heads), len(heads)))
+    for head, prods in nonempty.items():
+        for prod, p in prods.items():
+            if prod in index:
+                unit[index[head], index[prod]] += p
+    closure = np.linalg.inv(np.eye(len(heads)) - unit)
+    unit_free = {}
+    for A in heads:
+        out = {}
+        for B in heads:
+            w = closure[index[A], index[B]]
+            if w <= 0:
+                continue
+            for prod, p in nonempty[B].items():
+                if prod not in index:
+                    out[prod] = out.get(prod, 0.0) + w * p
+        unit_free[A] = out
+    unit_free = _reachable(unit_free, start)
+
+    cnf = {}
+    probs = {}
+
+    def add(head, prod, p):
+        if (head, prod) not in probs:
+            cnf.setdefault(head, []).append(prod)
+        probs[(head, prod)] = probs.get((head, prod), 0.0) + p
+
+    wrappers = {}
+    suffixes = {}
+
+    def wrap(s):
+        if s in unit_free:
+            return s
+        if s not in wrappers:
+            wrappers[s] = new_symbol()
+            add(wrappers[s], s, 1.0)
+        return wrappers[s]
+
+    for head, prods in unit_free.items():
+        for prod, p in prods.items():
+            if prod == '*' or len(prod) == 1:
+                add(head, prod, p)
+                continue
+            symbols = [wrap(s) for s in prod]
+            current, weight = head, p
+            while len(symbols) > 2:
+                rest = "".join(symbols[1:])
+                known = rest in suffixes
+                if not known:
+                    suffixes[rest] = new_symbol()
+                add(current, symbols[0] + suffixes[rest], weight)
+                if known:
+                    break
+                current, weight, symbols = suffixes[rest], 1.0, symbols[1:]
+            else:
+                add(current, "".join(symbols), weight)
+    # Las cabezas originales primero, como en el resto de las transformaciones
+    ordered = {head: cnf[head] for head in grammar if head in cnf}
+    ordered.update(cnf)
+    return ordered, probs, aliases
+
+def weighted_grammar_to_text(grammar, probs):
+    result = []
+    for head, prods in grammar.items():
+        result.append(f"{head} -> {' | '.join(f'{prod} [{probs[(head, prod)]:.4g}]' for prod in prods)}")
+    return "\n".join(result)
+
+def _logsumexp(x, axis):
+    top = x.max(axis=axis, keepdims=True)
+    top = np.where(np.isfinite(top), top, 0.0)
+    with np.errstate(divide="ignore"):
+        return np.log(np.exp(x - top).sum(axis=axis)) + np.squeeze(top, axis)
+
+# Tablas compiladas de una FNC ponderada, todas arreglos de NumPy para poder guardarlas en
+# memoria compartida (shared.py): nombres de los no terminales, matriz léxica por terminal,
+# reglas binarias ordenadas por cabeza y su índice por cabeza. Sin probs cada regla vale 1:
+# inside da el logaritmo de la cantidad de árboles y Viterbi sirve de reconocedor.
+def compile_tables(cnf, probs, start, original=None, aliases=None):
+    symbols = list(cnf)
+    aliases = aliases or {}
+    index = {head: i for i, head in enumerate(symbols)}
+    # Los no terminales que agregó la FNC se disuelven en su padre al armar el árbol,
+    # salvo las copias, que se muestran con el nombre del original
+    helpers = set(cnf) - set(original) - set(aliases) if original is not None else set()
+    empty = -math.inf
+    lexical = {}
+    binary = []
+    for head, prods in cnf.items():
+        for prod in prods:
+            logp = 0.0 if probs is None else math.log(probs[(head, prod)])
+            if prod == '*':
+                if head != start:
+                    raise ValueError(f"La gramática no está en FNC: {head} -> ε")
+                empty = logp
+            elif len(prod) == 1 and prod not in cnf:
+                lexical.setdefault(prod, {})[index[head]] = logp
+            elif len(prod) == 2 and prod[0] in cnf and prod[1] in cnf:
+                binary.append((index[head], index[prod[0]], index[prod[1]], logp))
+            else:
+                raise ValueError(f"La gramática no está en FNC: {head} -> {prod}")
+    if start not in index:
+        raise ValueError(f"El símbolo inicial {start} no tiene producciones.")
+    # Una fila por terminal y una última, toda -inf, para los símbolos desconocidos
+    terminals = list(lexical)
+    matrix = np.full((len(terminals) + 1, len(symbols)), -math.inf)
+    for row, t in enumerate(terminals):
+        for A, logp in lexical[t].items():
+            matrix[row, A] = logp
+    binary.sort()
+    # Reglas agrupadas por cabeza en una matriz rellenada con un índice centinela
+    groups = {}
+    for r, rule in enumerate(binary):
+        groups.setdefault(rule[0], []).append(r)
+    width = max((len(rs) for rs in groups.values()), default=1)
+    group_rules = np.full((len(groups), width), len(binary), dtype=np.intp)
+    for g, rs in enumerate(groups.values()):
+        group_rules[g, :len(rs)] = rs
+    return {
+        "symbols": np.array(symbols, dtype=str),
+        "labels": np.array([aliases.get(head, head) for head in symbols], dtype=str),
+        "helpers": np.array([head in helpers for head in symbols], dtype=bool),
+        "terminals": np.array(terminals, dtype=str),
+        "lexical": matrix,
+        "rule_head": np.array([r[0] for r in binary], dtype=np.intp),
+        "rule_left": np.array([r[1] for r in binary], dtype=np.intp),
+        "rule_right": np.array([r[2] for r in binary], dtype=np.intp),
+        "rule_logp": np.array([r[3] for r in binary], dtype=float),
+        "group_heads": np.array(list(groups), dtype=np.intp),
+        "group_rules": group_rules,
+        "root": np.array(index[start], dtype=np.intp),
+        "empty": np.array(empty),
+    }
+
+# Motor CYK probabilístico sobre las tablas compiladas. Cada celda del diagrama es un vector
+# de log-probabilidades por no terminal, y las oraciones de igual longitud se procesan
+# juntas: el diagrama tiene forma (oraciones, inicio, fin, no terminales) y cada longitud
+# de intervalo se calcula con una sola cuenta vectorizada sobre todos los inicios, cortes
+# y reglas binarias. Los arreglos se usan tal cual, sin copiarlos.
+class PCFG:
+    def __init__(self, tables):
+        self.tables = tables
+        self.symbols = tables["symbols"].tolist()
+        self.labels = tables["labels"].tolist()
+        self.helpers = set(np.flatnonzero(tables["helpers"]).tolist())
+        self.terminals = {t: i for i, t in enumerate(tables["terminals"].tolist())}
+        self.lexical = tables["lexical"]
+        self.rule_head = tables["rule_head"]
+        self.rule_left = tables["rule_left"]
+        self.rule_right = tables["rule_right"]
+        self.rule_logp = tables["rule_logp"]
+        self.group_heads = tables["group_heads"]
+        self.group_rules = tables["group_rules"]
+        self.root = int(tables["root"])
+        self.start = self.symbols[self.root]
+        self.empty = float(tables["empty"])
+
+    def _tokens(self, texts):
+        unknown = len(self.terminals)
+        return np.array([[self.terminals.get(t, unknown) for t in text] for text in texts], dtype=np.intp)
+
+    # Llena el diagrama de un grupo de oraciones de longitud n >= 1. Con viterbi se toma
+    # el máximo en lugar de la suma y se guardan la regla y el corte elegidos.
+    def _chart(self, texts, viterbi):
+        batch, n = len(texts), len(texts[0])
+        chart = np.full((batch, n, n + 1, len(self.symbols)), -math.inf)
+        positions = np.arange(n)
+        chart[:, positions, positions + 1] = self.lexical[self._tokens(texts)]
+        back = None
+        if viterbi:
+            back = (np.zeros(chart.shape, dtype=np.intp), np.zeros(chart.shape, dtype=np.intp))
+        if not len(self.rule_logp):
+            return chart, back
+        for length in range(2, n + 1):
+            starts = np.arange(n - length + 1)[:, None]
+            offsets = np.arange(1, length)
+            step = max(1, CHART_CHUNK // (batch * len(starts) * len(self.rule_logp)))
+            by_rule = best_cut = None
+            for first in range(0, length - 1, step):
+                cuts = starts + offsets[None, first:first + step]
+                left = chart[:, starts, cuts][..., self.rule_left]
+                right = chart[:, cuts, starts + length][..., self.rule_right]
+                # (oraciones, inicios, cortes del tramo, reglas)
+                scores = left + right + self.rule_logp
+                if viterbi:
+                    cut = scores.argmax(axis=2)
+                    best = np.take_along_axis(scores, cut[:, :, None, :], axis=2)[:, :, 0]
+                    cut += first
+                    if by_rule is None:
+                        by_rule, best_cut = best, cut
+                    else:
+                        # Solo si mejora: ante empates queda el primer corte, como con argmax
+                        better = best > by_rule
+                        by_rule = np.where(better, best, by_rule)
+                        best_cut = np.where(better, cut, best_cut)
+                else:
+                    total = _logsumexp(scores, axis=2)
+                    by_rule = total if by_rule is None else np.logaddexp(by_rule, total)
+            padded = np.concatenate([by_rule, np.full(by_rule.shape[:2] + (1,), -math.inf)], axis=2)
+            grouped = padded[..., self.group_rules]
+            i = starts[:, 0]
+            rows, cols = i[:, None], (i + length)[:, None]
+            if viterbi:
+                slot = grouped.argmax(axis=3)
+                rule = self.group_rules[np.arange(len(self.group_heads)), slot]
+                chart[:, rows, cols, self.group_heads] = np.take_along_axis(grouped, slot[..., None], axis=3)[..., 0]
+                back[0][:, rows, cols, self.group_heads] = rule
+                back[1][:, rows, cols, self.group_heads] = np.take_along_axis(best_cut, rule, axis=2) + 1 + i[None, :, None]
+            else:
+                chart[:, rows, cols, self.group_heads] = _logsumexp(grouped, axis=3)
+        return chart, back
+
+    def _batches(self, texts, batch_size):
+        by_length = {}
+        for position, text in enumerate(texts):
+            by_length.setdefault(len(text), []).append(position)
+        for n, positions in by_length.items():
+            for first in range(0, len(positions), batch_size):
+                yield n, positions[first:first + batch_size]
+
+    # Log-probabilidad (natural) de cada oración: suma sobre todos sus árboles
+    def inside(self, texts, batch_size=DEFAULT_BATCH):
+        texts = list(texts)
+        result = [-math.inf] * len(texts)
+        root = self.root
+        for n, positions in self._batches(texts, batch_size):
+            if n == 0:
+                for position in positions:
+                    result[position] = self.empty
+                continue
+            chart, _ = self._chart([texts[p] for p in positions], viterbi=False)
+            for b, position in enumerate(positions):
+                result[position] = float(chart[b, 0, n, root])
+        return result
+
+    # Mejor árbol de cada oración como (log-probabilidad, árbol), con el árbol en el formato
+    # de forest.format_tree, o (-inf, None) si la oración no pertenece al lenguaje
+    def viterbi(self, texts, batch_size=DEFAULT_BATCH):
+        texts = list(texts)
+        result = [(-math.inf, None)] * len(texts)
+        root = self.root
+        for n, positions in self._batches(texts, batch_size):
+            if n == 0:
+                if self.empty > -math.inf:
+                    for position in positions:
+                        result[position] = (self.empty, (self.start, []))
+                continue
+            batch = [texts[p] for p in positions]
+            chart, back = self._chart(batch, viterbi=True)
+            for b, position in enumerate(positions):
+                score = float(chart[b, 0, n, root])
+                if score > -math.inf:
+                    result[position] = (score, self._tree(batch[b], back[0][b], back[1][b], root, 0, n))
+        return result
+
+    def _children(self, text, rules, cuts, A, i, j):
+        if j == i + 1:
+            return [text[i]]
+        r, k = rules[i, j, A], cuts[i, j, A]
+        children = []
+        for B, start, end in ((self.rule_left[r], i, k), (self.rule_right[r], k, j)):
+            if B in self.helpers:
+                children.extend(self._children(text, rules, cuts, B, start, end))
+            else:
+                children.append(self._tree(text, rules, cuts, B, start, end))
+        return children
+
+    def _tree(self, text, rules, cuts, A, i, j):
+        return (self.labels[A], self._children(text, rules, cuts, A, i, j))
+
+def build_pcfg(grammar, weights, start):
+    cnf, probs, aliases = to_weighted_cnf(grammar, weights, start)
+    return PCFG(compile_tables(cnf, probs, start, grammar, aliases))
+
+# Inside por oración con diccionarios y bucles de Python, para comparar en la prueba
+def _inside_reference(model, text):
+    n = len(text)
+    if n == 0:
+        return model.empty
+    chart = {}
+    for i, t in enumerate(text):
+        column = model.terminals.get(t)
+        for A in range(len(model.symbols)):
+            if column is not None and model.lexical[column, A] > -math.inf:
+                chart[(i, i + 1, A)] = math.exp(model.lexical[column, A])
+    rules = list(zip(model.rule_head, model.rule_left, model.rule_right, np.exp(model.rule_logp)))
+    for length in range(2, n + 1):
+        for i in range(n - length + 1):
+            j = i + length
+            for k in range(i + 1, j):
+                for A, B, C, p in rules:
+                    left, right = chart.get((i, k, B)), chart.get((k, j, C))
+                    if left and right:
+                        chart[(i, j, A)] = chart.get((i, j, A), 0.0) + p * left * right
+    value = chart.get((0, n, model.root), 0.0)
+    return math.log(value) if value > 0 else -math.inf
+
+def _sample(rules, start, rng, limit):
+    out = []
+    stack = [start]
+    while stack and len(out) < limit:
+        symbol = stack.pop()
+        if symbol not in rules:
+            out.append(symbol)
+            continue
+        prods = list(rules[symbol])
+        prod = rng.choices(prods, weights=[rules[symbol][p] for p in prods])[0]
+        if prod != '*':
+            stack.extend(reversed(prod))
+    return "".join(out) if not stack else None
+
+BENCH_GRAMMAR = "S -> SS [0.3] | aSb [0.3] | ab [0.4]"
+
+def benchmark(sentences, length, batch_size=DEFAULT_BATCH, seed=0):
+    weights = {}
+    grammar = parse_grammar(BENCH_GRAMMAR, weights)
+    model = build_pcfg(grammar, weights, "S")
+    rules = {}
+    for (head, prod), p in normalize_weights(grammar, weights).items():
+        rules.setdefault(head, {})[prod] = p
+    rng = random.Random(seed)
+    texts = []
+    while len(texts) < sentences:
+        text = _sample(rules, "S", rng, length)
+        if text and length // 2 <= len(text) <= length:
+            texts.append(text)
+    started = time.perf_counter()
+    scores = model.inside(texts, batch_size)
+    vectorized = time.perf_counter() - started
+    started = time.perf_counter()
+    model.viterbi(texts, batch_size)
+    best = time.perf_counter() - started
+    sample = texts[:max(1, sentences // 10)]
+    started = time.perf_counter()
+    reference = [_inside_reference(model, text) for text in sample]
+    loops = (time.perf_counter() - started) * len(texts) / len(sample)
+    error = max(abs(a - b) for a, b in zip(scores, reference))
+    print(f"{sentences} oraciones de {length // 2}–{length} símbolos (lotes de {batch_size}):")
+    print(f"  inside vectorizado: {vectorized:.3f} s, Viterbi vectorizado: {best:.3f} s")
+    print(f"  inside con bucles de Python (estimado sobre {len(sample)}): {loops:.3f} s "
+          f"({loops / vectorized:.1f}x); diferencia máxima {error:.2e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Puntúa cadenas con una gramática ponderada (S -> aB [0.7]).")
+    parser.add_argument("archivo", nargs="?", help="archivo con la gramática ponderada")
+    parser.add_argument("cadenas", nargs="*", help="cadenas a puntuar")
+    parser.add_argument("--inicial", default="S", help="símbolo inicial")
+    parser.add_argument("--fnc", action="store_true", help="muestra la FNC ponderada")
+    parser.add_argument("--bench", type=int, metavar="N", help="prueba de rendimiento con N oraciones")
+    parser.add_argument("--longitud", type=int, default=30, help="longitud máxima de las oraciones de la prueba")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark(args.bench, args.longitud)
+        return
+    if not args.archivo:
+        parser.error("falta el archivo con la gramática")
+    weights = {}
+    with open(args.archivo, encoding="utf-8") as f:
+        grammar = parse_grammar(f.read(), weights)
+    cnf, probs, aliases = to_weighted_cnf(grammar, weights, args.inicial)
+    if args.fnc:
+        print(weighted_grammar_to_text(cnf, probs))
+        print()
+    model = PCFG(compile_tables(cnf, probs, args.inicial, grammar, aliases))
+    for text, logp, (_, tree) in zip(args.cadenas, model.inside(args.cadenas), model.viterbi(args.cadenas)):
+        shown = text or "ε"
+        if tree is None:
+            print(f"{shown}: no pertenece")
+        else:
+            print(f"{shown}: log P = {logp:.4f} (P = {math.exp(logp):.4g}); mejor árbol {format_tree(tree)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import json
+from array import array
+
+# "right" si la gramática es lineal por la derecha (A -> wB | w), "left" si es lineal
+# por la izquierda (A -> Bw | w), None si no es regular en ninguna de las dos formas
+def linearity(grammar):
+    def is_nt(s):
+        return s in grammar or s.isupper()
+
+    right = left = True
+    for prods in grammar.values():
+        for prod in prods:
+            if prod == '*':
+                continue
+            positions = [i for i, s in enumerate(prod) if is_nt(s)]
+            if len(positions) > 1:
+                return None
+            if positions:
+                right = right and positions[0] == len(prod) - 1
+                left = left and positions[0] == 0
+    if right:
+        return "right"
+    if left:
+        return "left"
+    return None
+
+class _NFA:
+    def __init__(self):
+        self.moves = []
+        self.eps = []
+
+    def state(self):
+        self.moves.append({})
+        self.eps.append(set())
+        return len(self.moves) - 1
+
+    # Transición por una cadena de terminales, con estados intermedios nuevos
+    def path(self, source, word, target):
+        if not word:
+            self.eps[source].add(target)
+            return
+        for s in word[:-1]:
+            nxt = self.state()
+            self.moves[source].setdefault(s, set()).add(nxt)
+            source = nxt
+        self.moves[source].setdefault(word[-1], set()).add(target)
+
+def _build_nfa(grammar, start, kind):
+    nfa = _NFA()
+    index = {head: nfa.state() for head in grammar}
+    extra = nfa.state()
+    for head, prods in grammar.items():
+        for prod in prods:
+            word = "" if prod == '*' else prod
+            last = word[-1:] if kind == "right" else word[:1]
+            if last and last in index:
+                word = word[:-1] if kind == "right" else word[1:]
+                B = index[last]
+            elif last and last.isupper():
+                continue  # no terminal sin producciones: la regla no genera nada
+            else:
+                B = extra
+            if kind == "right":
+                # A -> wB: A --w--> B; A -> w: A --w--> final
+                nfa.path(index[head], word, B)
+            else:
+                # A -> Bw: B --w--> A; A -> w: inicial --w--> A
+                nfa.path(B, word, index[head])
+    if kind == "right":
+        return nfa, index[start], {extra}
+    return nfa, extra, {index[start]}
+
+def _closure(nfa, states):
+    stack = list(states)
+    seen = set(states)
+    while stack:
+        q = stack.pop()
+        for r in nfa.eps[q]:
+            if r not in seen:
+                seen.add(r)
+                stack.append(r)
+    return frozenset(seen)
+
+# Construcción de subconjuntos; el AFD resultante es parcial (sin estado sumidero)
+def _determinize(nfa, start, accepting, alphabet):
+    first = _closure(nfa, {start})
+    index = {first: 0}
+    subsets = [first]
+    moves = []
+    for subset in subsets:
+        row = {}
+        for a in alphabet:
+            target = set()
+            for q in subset:
+                target |= nfa.moves[q].get(a, set())
+            if not target:
+                continue
+            target = _closure(nfa, target)
+            if target not in index:
+                index[target] = len(subsets)
+                subsets.append(target)
+            row[a] = index[target]
+        moves.append(row)
+    final = {i for i, subset in enumerate(subsets) if subset & accepting}
+    return moves, final
+
+# Minimización de Hopcroft sobre el AFD completado con un sumidero (el último estado).
+# Devuelve (tabla densa, aceptación, inicial) sin el bloque del sumidero.
+def _minimize(moves, final, alphabet):
+    n = len(moves) + 1
+    sink = n - 1
+    delta = [[row.get(a, sink) for a in alphabet] for row in moves] + [[sink] * len(alphabet)]
+    inverse = [[[] for _ in range(n)] for _ in alphabet]
+    for q in range(n):
+        for c in range(len(alphabet)):
+            inverse[c][delta[q][c]].append(q)
+    accepting = set(final)
+    rejecting = set(range(n)) - accepting
+    partition = [block for block in (accepting, rejecting) if block]
+    block_of = [0] * n
+    for b, block in enumerate(partition):
+        for q in block:
+            block_of[q] = b
+    # Conjunto de trabajo: basta con el bloque más pequeño de la partición inicial
+    work = {min(range(len(partition)), key=lambda b: len(partition[b]))} if len(partition) == 2 else set()
+    while work:
+        splitter = partition[work.pop()]
+        for c in range(len(alphabet)):
+            pre = set()
+            for q in splitter:
+                pre.update(inverse[c][q])
+            touched = {}
+            for q in pre:
+                touched.setdefault(block_of[q], set()).add(q)
+            for b, inside in touched.items():
+                block = partition[b]
+                if len(inside) == len(block):
+                    continue
+                outside = block - inside
+                partition[b] = inside
+                partition.append(outside)
+                new = len(partition) - 1
+                for q in outside:
+                    block_of[q] = new
+                if b in work:
+                    work.add(new)
+                else:
+                    work.add(b if len(inside) <= len(outside) else new)
+    # Renumeración: el inicial es 0, los demás en orden de recorrido; el sumidero se omite
+    dead = block_of[sink]
+    order = {block_of[0]: 0}
+    queue = [block_of[0]]
+    for b in queue:
+        rep = next(iter(partition[b]))
+        for c in range(len(alphabet)):
+            target = block_of[delta[rep][c]]
+            if target != dead and target not in order:
+                order[target] = len(order)
+                queue.append(target)
+    table = array('i', [-1]) * (len(order) * len(alphabet))
+    accept = set()
+    for b, i in order.items():
+        rep = next(iter(partition[b]))
+        if rep in accepting:
+            accept.add(i)
+        for c in range(len(alphabet)):
+            target = block_of[delta[rep][c]]
+            if target != dead:
+                table[i * len(alphabet) + c] = order[target]
+    return table, accept
+
+def compile_regular(grammar, start):
+    kind = linearity(grammar)
+    if kind is None or start not in grammar:
+        return None
+    alphabet = sorted({s for prods in grammar.values() for prod in prods if prod != '*'
+                       for s in prod if s not in grammar and not s.isupper()})
+    nfa, nfa_start, nfa_accepting = _build_nfa(grammar, start, kind)
+    moves, final = _determinize(nfa, nfa_start, nfa_accepting, alphabet)
+    table, accepting = _minimize(moves, final, alphabet)
+    return {
+        "kind": kind,
+        "start": start,
+        "alphabet": alphabet,
+        "nfa_states": len(nfa.moves),
+        "dfa_states": len(moves),
+        "states": len(table) // len(alphabet) if alphabet else 1,
+        "table": table,
+        "accepting": sorted(accepting),
+    }
+
+# Pertenencia en tiempo lineal: un acceso a la tabla por símbolo
+def dfa_accepts(dfa, text):
+    col_of = {a: i for i, a in enumerate(dfa["alphabet"])}
+    width = len(dfa["alphabet"])
+    table = dfa["table"]
+    state = 0
+    for s in text:
+        col = col_of.get(s)
+        if col is None:
+            return False
+        state = table[state * width + col]
+        if state < 0:
+            return False
+    return state in set(dfa["accepting"])
+
+# Tabla de transiciones compacta: filas densas, -1 = sin transición
+def dfa_to_json(dfa):
+    width = len(dfa["alphabet"])
+    data = {
+        "start": 0,
+        "alphabet": dfa["alphabet"],
+        "accepting": dfa["accepting"],
+        "transitions": [list(dfa["table"][i * width:(i + 1) * width]) for i in range(dfa["states"])],
+    }
+    return json.dumps(data, ensure_ascii=False)
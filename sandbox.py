@@ -0,0 +1,216 @@
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Límites por trabajo: memoria por encima de la que el proceso ya tenía al arrancar,
+# segundos de CPU y cantidad de trabajos antes de reemplazar el proceso
+DEFAULT_MEMORY_LIMIT = int(os.environ.get("GRAMATICAS_MEMORIA_MB", 1024)) * 1024 * 1024
+DEFAULT_CPU_LIMIT = int(os.environ.get("GRAMATICAS_CPU_S", 120))
+DEFAULT_MAX_JOBS = 50
+# Cada cuánto el proceso principal revisa la cancelación mientras espera
+POLL_INTERVAL = 0.2
+# Intervalo mínimo entre dos avisos de progreso enviados por el trabajador
+PROGRESS_INTERVAL = 0.05
+
+LIMIT_MESSAGES = {
+    "memoria": "La conversión superó el límite de memoria del proceso de trabajo ({} MB).",
+    "cpu": "La conversión superó el límite de tiempo de CPU del proceso de trabajo ({} s).",
+    "terminado": "El proceso de trabajo terminó inesperadamente durante la conversión.",
+}
+
+class WorkerLimitExceeded(Exception):
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+class WorkerTimeout(Exception):
+    pass
+
+# Se lanza dentro del proceso de trabajo al agotar la CPU. Deriva de BaseException para que
+# los "except Exception" de la conversión no la atrapen; quien corre en el proceso puede
+# atraparla para dejar su estado en orden y volver a lanzarla.
+class CPULimitExceeded(BaseException):
+    pass
+
+def _raise_cpu_limit(signum, frame):
+    raise CPULimitExceeded()
+
+def _virtual_memory():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+def _worker_main(conn, memory_limit, cpu_limit):
+    # La interrupción desde la terminal la maneja el proceso principal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_limit:
+        limit = _virtual_memory() + memory_limit
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_limit:
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    while True:
+        try:
+            fn, args = conn.recv()
+        except EOFError:
+            return
+        last = [0.0]
+
+        def progress(stage, produced):
+            now = time.monotonic()
+            if now - last[0] >= PROGRESS_INTERVAL:
+                last[0] = now
+                conn.send(("progress", stage, produced))
+
+        # Resultados parciales: llegan al proceso principal aunque el trabajo no termine
+        def publish(*item):
+            conn.send(("stage",) + item)
+
+        try:
+            if cpu_limit:
+                # RLIMIT_CPU cuenta toda la vida del proceso: el límite blando se corre en cada trabajo
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                soft = int(usage.ru_utime + usage.ru_stime) + cpu_limit
+                resource.setrlimit(resource.RLIMIT_CPU, (soft, resource.getrlimit(resource.RLIMIT_CPU)[1]))
+            result = fn(*args, progress=progress, publish=publish)
+        except MemoryError:
+            conn.send(("limit", "memoria"))
+            return
+        except CPULimitExceeded:
+            conn.send(("limit", "cpu"))
+            return
+        except Exception as e:
+            conn.send(("error", e))
+            continue
+        try:
+            conn.send(("ok", result))
+        except Exception as e:
+            conn.send(("error", RuntimeError(f"No se pudo devolver el resultado: {e}")))
+
+class _Worker:
+    def __init__(self, context, memory_limit, cpu_limit):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, memory_limit, cpu_limit), daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+# Procesos creados de antemano con límites de memoria y CPU. Cada trabajo ocupa un proceso
+# libre; si supera un límite, muere o se cancela, el proceso se descarta y se crea otro,
+# y lo mismo pasa al completar max_jobs trabajos.
+class WorkerPool:
+    def __init__(self, size=None, memory_limit=DEFAULT_MEMORY_LIMIT, cpu_limit=DEFAULT_CPU_LIMIT, max_jobs=DEFAULT_MAX_JOBS):
+        if resource is None:
+            raise RuntimeError("El módulo resource no está disponible en esta plataforma.")
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+        self.max_jobs = max_jobs
+        self._context = multiprocessing.get_context("fork")
+        self._lock = threading.Lock()
+        self.counters = {"jobs": 0, "recycled": 0, "memoria": 0, "cpu": 0, "terminado": 0}
+        self._idle = queue.Queue()
+        for _ in range(size or os.cpu_count() or 1):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        return _Worker(self._context, self.memory_limit, self.cpu_limit)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _limit_error(self, kind):
+        self._count(kind)
+        value = {"memoria": self.memory_limit // (1024 * 1024), "cpu": self.cpu_limit}.get(kind)
+        return WorkerLimitExceeded(kind, LIMIT_MESSAGES[kind].format(value))
+
+    # Espera un proceso libre sin dejar de avisar, para que también se pueda cancelar en la
+    # cola; vencido el plazo, el trabajo ni se envía
+    def _acquire(self, progress, deadline):
+        while True:
+            wait = POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    raise WorkerTimeout()
+            try:
+                worker = self._idle.get(timeout=wait)
+            except queue.Empty:
+                if progress is not None:
+                    progress("esperando_proceso", 0)
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                self._idle.put(worker)
+                raise WorkerTimeout()
+            return worker
+
+    # Ejecuta fn(*args, progress=..., publish=...) en un proceso libre. fn debe poder importarse
+    # desde un módulo; progress se llama en este hilo y puede lanzar una excepción para cancelar,
+    # y publish recibe en este hilo lo que fn publique mientras corre. deadline (time.monotonic)
+    # cubre la espera del proceso y la ejecución: al vencer lanza WorkerTimeout.
+    def run(self, fn, *args, progress=None, publish=None, deadline=None):
+        worker = self._acquire(progress, deadline)
+        healthy = False
+        try:
+            worker.conn.send((fn, args))
+            worker.jobs += 1
+            self._count("jobs")
+            # Hasta el primer aviso del trabajador no hay etapa que repetir
+            last = None
+            while True:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise WorkerTimeout()
+                if not worker.conn.poll(POLL_INTERVAL):
+                    if progress is not None and last is not None:
+                        progress(*last)
+                    continue
+                try:
+                    message = worker.conn.recv()
+                except EOFError:
+                    raise self._limit_error("terminado") from None
+                kind = message[0]
+                if kind == "progress":
+                    last = message[1:]
+                    if progress is not None:
+                        progress(*last)
+                elif kind == "stage":
+                    if publish is not None:
+                        publish(*message[1:])
+                elif kind == "ok":
+                    healthy = True
+                    return message[1]
+                elif kind == "error":
+                    healthy = True
+                    raise message[1]
+                else:
+                    raise self._limit_error(message[1])
+        finally:
+            if healthy and worker.jobs < self.max_jobs:
+                self._idle.put(worker)
+            else:
+                worker.stop()
+                self._count("recycled")
+                self._idle.put(self._spawn())
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters["idle"] = self._idle.qsize()
+        return counters
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
@@ -0,0 +1,269 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import error as urlerror, request as urlrequest
+from grammar import parse_grammar, remove_epsilon, remove_unit, remove_useless, to_cnf, to_gnf
+from estimator import estimate_conversion, plan_conversion
+from sandbox import WorkerPool, WorkerLimitExceeded, WorkerTimeout
+
+FORMS = ("bien_formada", "chomsky", "greibach")
+# Tamaño máximo del cuerpo de una petición, en bytes
+MAX_BODY = 256 * 1024
+# Segundos que una petición espera su resultado antes de responder 504
+DEFAULT_TIMEOUT = 30.0
+# Límites superiores (segundos) de las cubetas del histograma de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Se ejecuta en los procesos del pool: recibe texto y devuelve gramáticas serializables.
+# Los avisos de progreso le permiten al proceso principal cortar la conversión a tiempo.
+def convert(text, start, forms, progress=None, publish=None):
+    grammar = parse_grammar(text)
+    if progress is not None:
+        progress("parse_grammar", len(grammar))
+    results = {}
+    if "bien_formada" in forms:
+        well_formed = remove_epsilon(grammar, start, progress)
+        well_formed = remove_unit(well_formed, start, progress)
+        results["bien_formada"] = remove_useless(well_formed, start, progress)
+    if "chomsky" in forms:
+        results["chomsky"] = to_cnf(grammar, start, progress)
+    if "greibach" in forms:
+        results["greibach"] = to_gnf(grammar, start, progress)
+    return results
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+    def to_dict(self):
+        # Cuentas acumuladas por cubeta, como en Prometheus; "+Inf" cubre todo
+        cumulative = {}
+        running = 0
+        for bound, n in zip(list(self.buckets) + ["+Inf"], self.counts):
+            running += n
+            cumulative[str(bound)] = running
+        return {"buckets": cumulative, "sum": round(self.total, 6), "count": self.count}
+
+class ConversionService:
+    def __init__(self, workers=None, timeout=DEFAULT_TIMEOUT, max_body=MAX_BODY, budget=None):
+        # Una conversión que supera el tiempo se corta matando su proceso, que el pool reemplaza
+        self.pool = WorkerPool(workers)
+        self.timeout = timeout
+        self.max_body = max_body
+        self.budget = budget
+        self.lock = threading.Lock()
+        # Conversiones en curso por clave: las peticiones idénticas esperan el mismo Future
+        self.in_flight = {}
+        self.waiting = 0
+        self.counters = {"requests": 0, "coalesced": 0, "computed": 0, "timeouts": 0, "rejected": 0,
+                         "limits": 0, "errors": 0}
+        self.latency = {}
+
+    def _submit(self, key, text, start, forms):
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.counters["coalesced"] += 1
+                return future
+            future = Future()
+            self.in_flight[key] = future
+            self.counters["computed"] += 1
+        future.add_done_callback(lambda f: self._finished(key, f))
+        threading.Thread(target=self._compute, args=(future, text, start, forms), daemon=True).start()
+        return future
+
+    # Espera un proceso libre y convierte; el plazo corre desde que llegó la primera petición
+    # y cubre también la espera en la cola
+    def _compute(self, future, text, start, forms):
+        def progress(stage, produced):
+            if stage != "esperando_proceso" and not future.running():
+                future.set_running_or_notify_cancel()
+
+        try:
+            future.set_result(self.pool.run(convert, text, start, forms, progress=progress,
+                                            deadline=time.monotonic() + self.timeout))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _finished(self, key, future):
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def observe(self, endpoint, seconds):
+        with self.lock:
+            self.latency.setdefault(endpoint, Histogram()).observe(seconds)
+
+    # Devuelve (código HTTP, cuerpo JSON)
+    def handle_convert(self, payload):
+        self.count("requests")
+        if not isinstance(payload, dict) or not isinstance(payload.get("grammar"), str):
+            self.count("rejected")
+            return 400, {"error": "Se esperaba un objeto JSON con el campo 'grammar'."}
+        text = payload["grammar"].strip()
+        start = payload.get("start", "S")
+        forms = payload.get("forms", list(FORMS))
+        if not isinstance(start, str) or not isinstance(forms, list) or any(f not in FORMS for f in forms):
+            self.count("rejected")
+            return 400, {"error": f"'start' debe ser texto y 'forms' una lista con valores de {list(FORMS)}."}
+        try:
+            grammar = parse_grammar(text)
+        except Exception as e:
+            self.count("rejected")
+            return 400, {"error": f"Gramática inválida: {e}"}
+        if start not in grammar:
+            self.count("rejected")
+            return 400, {"error": f"El símbolo inicial '{start}' no tiene producciones."}
+        # Límite por tamaño estimado: misma estimación previa que usa la interfaz. Es una
+        # heurística, no una cota, así que el límite de memoria del proceso sigue haciendo falta.
+        estimate = estimate_conversion(grammar, start)
+        refused, over = plan_conversion(estimate, self.budget)
+        over = [form for form in over if form in forms]
+        if refused or over:
+            self.count("rejected")
+            return 413, {"error": "La estimación de reglas excede el presupuesto.", "over_budget": over,
+                         "estimate": {form: estimate[form] for form in FORMS}}
+        key = (text, start, tuple(sorted(set(forms))))
+        with self.lock:
+            self.waiting += 1
+        try:
+            future = self._submit(key, text, start, sorted(set(forms)))
+            results = future.result(timeout=self.timeout)
+        except (FutureTimeout, WorkerTimeout):
+            # Las peticiones idénticas que lleguen después no se suman a la conversión vencida
+            self._finished(key, future)
+            self.count("timeouts")
+            return 504, {"error": f"La conversión superó {self.timeout} s."}
+        except WorkerLimitExceeded as e:
+            # Misma gramática, mismo resultado: reintentar no sirve, como con el presupuesto
+            self.count("limits")
+            return 413, {"error": str(e), "limit": e.kind}
+        except Exception as e:
+            self.count("errors")
+            return 500, {"error": f"Error al procesar la gramática: {e}"}
+        finally:
+            with self.lock:
+                self.waiting -= 1
+        return 200, {"start": start, "results": results}
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "queue_depth": sum(1 for f in self.in_flight.values() if not f.running()),
+                "in_flight": len(self.in_flight),
+                "waiting_requests": self.waiting,
+                "workers": self.pool.stats(),
+                "counters": dict(self.counters),
+                "latency_seconds": {endpoint: h.to_dict() for endpoint, h in self.latency.items()},
+            }
+
+    def close(self):
+        self.pool.close()
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._send(200, service.metrics())
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": "Ruta desconocida."})
+
+        def do_POST(self):
+            started = time.perf_counter()
+            if self.path != "/convert":
+                self._send(404, {"error": "Ruta desconocida."})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                service.count("requests")
+                service.count("rejected")
+                status, body = 400, {"error": "Content-Length inválido."}
+                self.close_connection = True
+            elif length > service.max_body:
+                service.count("requests")
+                service.count("rejected")
+                status, body = 413, {"error": f"El cuerpo supera {service.max_body} bytes."}
+                # El cuerpo no se lee: se cierra la conexión después de responder
+                self.close_connection = True
+            else:
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"null")
+                except ValueError:
+                    status, body = 400, {"error": "JSON inválido."}
+                else:
+                    status, body = service.handle_convert(payload)
+            self._send(status, body)
+            service.observe("/convert", time.perf_counter() - started)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def serve(service, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+# Cliente local mínimo: devuelve (código HTTP, cuerpo JSON)
+def request_conversion(url, text, start="S", forms=FORMS, timeout=60):
+    data = json.dumps({"grammar": text, "start": start, "forms": list(forms)}).encode("utf-8")
+    req = urlrequest.Request(url.rstrip("/") + "/convert", data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urlrequest.urlopen(req, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urlerror.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local para convertir gramáticas.")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección de escucha (por defecto solo local)")
+    parser.add_argument("--port", type=int, default=8765, help="puerto")
+    parser.add_argument("--workers", type=int, default=None, help="procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="segundos máximos por petición")
+    parser.add_argument("--max-body", type=int, default=MAX_BODY, help="bytes máximos por petición")
+    args = parser.parse_args()
+    service = ConversionService(args.workers, args.timeout, args.max_body)
+    server = serve(service, args.host, args.port)
+    print(f"Escuchando en http://{args.host}:{args.port} (POST /convert, GET /metrics, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import random
+import string
+import time
+import weakref
+from multiprocessing import shared_memory
+import numpy as np
+from symbols import EXTRA_UPPER
+from pcfg import PCFG, compile_tables
+
+# Cada arreglo empieza en un múltiplo de esta cantidad de bytes dentro del segmento
+ALIGNMENT = 64
+# Los primeros bytes del segmento guardan el largo del índice en JSON que va a continuación
+HEADER_SIZE = 8
+# Oraciones por tarea en parallel_inside
+DEFAULT_CHUNK = 256
+# Segundos que la prueba espera a que cada proceso termine de inicializarse
+READY_TIMEOUT = 120
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _release(segment):
+    segment.close()
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+def _attach_segment(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Antes de Python 3.13 adjuntar también registra el segmento en el resource_tracker.
+        # Los procesos del pool comparten el del proceso principal, así que el registro
+        # repetido no tiene efecto y el borrado sigue a cargo del dueño.
+        return shared_memory.SharedMemory(name=name)
+
+# Arreglos de NumPy guardados una sola vez en un segmento de memoria compartida. El proceso
+# que lo crea es el dueño: el segmento se borra al llamar a close, al salir del bloque with
+# o al terminar el intérprete. Los demás procesos lo adjuntan por nombre y reciben vistas
+# de solo lectura sobre la misma memoria, sin copiar ni deserializar nada.
+class SharedTables:
+    def __init__(self, segment, arrays, owner):
+        self.segment = segment
+        self.name = segment.name
+        self.size = segment.size
+        self.arrays = arrays
+        self._finalizer = weakref.finalize(self, _release, segment) if owner else None
+
+    # En un proceso que solo adjuntó el segmento, cerrar exige no tener vistas vivas
+    def close(self):
+        if self._finalizer is not None:
+            self._finalizer()
+        else:
+            self.arrays = None
+            self.segment.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def share_tables(arrays):
+    layout = {}
+    offset = 0
+    for key, array in arrays.items():
+        array = np.asarray(array)
+        layout[key] = [array.dtype.str, list(array.shape), offset]
+        offset = _align(offset + array.nbytes)
+    manifest = json.dumps(layout).encode()
+    base = _align(HEADER_SIZE + len(manifest))
+    segment = shared_memory.SharedMemory(create=True, size=base + offset)
+    segment.buf[:HEADER_SIZE] = len(manifest).to_bytes(HEADER_SIZE, "little")
+    segment.buf[HEADER_SIZE:HEADER_SIZE + len(manifest)] = manifest
+    for key, array in arrays.items():
+        dtype, shape, start = layout[key]
+        np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=base + start)[...] = array
+    return SharedTables(segment, None, owner=True)
+
+def attach_tables(name):
+    segment = _attach_segment(name)
+    length = int.from_bytes(segment.buf[:HEADER_SIZE], "little")
+    layout = json.loads(bytes(segment.buf[HEADER_SIZE:HEADER_SIZE + length]))
+    base = _align(HEADER_SIZE + length)
+    arrays = {}
+    for key, (dtype, shape, start) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=base + start)
+        view.flags.writeable = False
+        arrays[key] = view
+    return SharedTables(segment, arrays, owner=False)
+
+# Modelos adjuntados en este proceso, por nombre de segmento. Las vistas viven mientras
+# viva el proceso; el dueño borra el segmento y el sistema libera el mapeo al salir.
+_attached = {}
+
+def attached_pcfg(name):
+    if name not in _attached:
+        tables = attach_tables(name)
+        _attached[name] = (tables, PCFG(tables.arrays))
+    return _attached[name][1]
+
+def _inside_chunk(name, texts):
+    return attached_pcfg(name).inside(texts)
+
+# Reparte las oraciones entre procesos: las tablas compiladas del modelo se copian una vez
+# a memoria compartida y cada proceso las adjunta al arrancar, en lugar de recibir la
+# gramática serializada y compilarla por su cuenta
+def parallel_inside(model, texts, workers=None, chunk=DEFAULT_CHUNK, context=None):
+    texts = list(texts)
+    chunks = [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+    with share_tables(model.tables) as tables:
+        pool_context = multiprocessing.get_context(context)
+        with pool_context.Pool(workers, initializer=attached_pcfg, initargs=(tables.name,)) as pool:
+            parts = pool.starmap(_inside_chunk, [(tables.name, part) for part in chunks])
+    return [score for part in parts for score in part]
+
+# FNC sintética grande: tantos no terminales como símbolos de una letra hay disponibles
+def _large_cnf(heads, rules, seed=0):
+    rng = random.Random(seed)
+    symbols = (list(string.ascii_uppercase) + EXTRA_UPPER)[:heads]
+    alphabet = string.ascii_lowercase + string.digits
+    cnf = {}
+    for A in symbols:
+        prods = {rng.choice(symbols) + rng.choice(symbols) for _ in range(rules)}
+        cnf[A] = sorted(prods) + rng.sample(alphabet, 3)
+    return cnf, symbols[0]
+
+def _memory(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0]) * 1024
+    return values["Rss"], values["Pss"]
+
+_bench_model = None
+_bench_barrier = None
+
+def _bench_init(mode, payload, ready, barrier):
+    global _bench_model, _bench_barrier
+    started = time.perf_counter()
+    if mode == "pickle":
+        cnf, start = payload
+        _bench_model = PCFG(compile_tables(cnf, None, start))
+    elif mode == "compartida":
+        _bench_model = attached_pcfg(payload)
+    _bench_barrier = barrier
+    ready.put((os.getpid(), time.perf_counter() - started))
+
+def _bench_task(texts):
+    # La barrera obliga a que cada proceso tome exactamente una tarea
+    _bench_barrier.wait()
+    if _bench_model is None:
+        return None
+    return _bench_model.inside(texts, batch_size=1)
+
+def _measure(mode, payload, workers, texts, context):
+    pool_context = multiprocessing.get_context(context)
+    ready = pool_context.Queue()
+    barrier = pool_context.Barrier(workers)
+    started = time.perf_counter()
+    pool = pool_context.Pool(workers, initializer=_bench_init, initargs=(mode, payload, ready, barrier))
+    try:
+        inits = [ready.get(timeout=READY_TIMEOUT) for _ in range(workers)]
+        startup = time.perf_counter() - started
+        per_worker = [texts[i::workers] for i in range(workers)]
+        scores = pool.map(_bench_task, per_worker, chunksize=1)
+        rss = pss = 0
+        for pid, _ in inits:
+            worker_rss, worker_pss = _memory(pid)
+            rss += worker_rss
+            pss += worker_pss
+    finally:
+        pool.terminate()
+        pool.join()
+    seconds = sorted(s for _, s in inits)
+    return {"startup": startup, "init_p50": seconds[len(seconds) // 2], "init_max": seconds[-1],
+            "rss": rss, "pss": pss, "scores": scores}
+
+def benchmark(workers=16, heads=429, rules=400, context="spawn", seed=0):
+    cnf, start = _large_cnf(heads, rules, seed)
+    started = time.perf_counter()
+    model = PCFG(compile_tables(cnf, None, start))
+    compile_seconds = time.perf_counter() - started
+    rng = random.Random(seed)
+    terminals = list(model.terminals)
+    texts = ["".join(rng.choice(terminals) for _ in range(5)) for _ in range(2 * workers)]
+    mb = 1024 * 1024
+    with share_tables(model.tables) as tables:
+        print(f"FNC: {len(cnf)} no terminales, {len(model.rule_head)} reglas binarias; compilarla lleva "
+              f"{1000 * compile_seconds:.0f} ms. Diccionario serializado: {len(pickle.dumps((cnf, start))) / mb:.1f} MB, "
+              f"segmento compartido: {tables.size / mb:.1f} MB")
+        print(f"{workers} procesos ({context}):")
+        print(f"{'':<22}{'arranque (s)':>14}{'init p50 (ms)':>15}{'init máx (ms)':>15}{'RSS (MB)':>11}{'PSS (MB)':>11}")
+        results = {}
+        for mode, payload in (("sin tablas", None), ("pickle", (cnf, start)), ("compartida", tables.name)):
+            result = _measure(mode, payload, workers, texts, context)
+            results[mode] = result
+            print(f"{mode:<22}{result['startup']:>14.2f}{1000 * result['init_p50']:>15.1f}{1000 * result['init_max']:>15.1f}"
+                  f"{result['rss'] / mb:>11.0f}{result['pss'] / mb:>11.0f}")
+    assert results["pickle"]["scores"] == results["compartida"]["scores"]
+    base = results["sin tablas"]
+    for mode in ("pickle", "compartida"):
+        print(f"{mode}: +{(results[mode]['pss'] - base['pss']) / mb:.0f} MB de PSS sobre procesos vacíos")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tablas de la FNC en memoria compartida entre procesos de trabajo.")
+    parser.add_argument("--trabajadores", type=int, default=16, help="cantidad de procesos")
+    parser.add_argument("--no-terminales", type=int, default=429, help="no terminales de la FNC sintética")
+    parser.add_argument("--reglas", type=int, default=400, help="reglas binarias por no terminal")
+    parser.add_argument("--contexto", default="spawn", choices=multiprocessing.get_all_start_methods(),
+                        help="cómo se crean los procesos")
+    args = parser.parse_args()
+    benchmark(args.trabajadores, args.no_terminales, args.reglas, args.contexto)
+
+if __name__ == "__main__":
+    main()
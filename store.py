@@ -0,0 +1,181 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from grammar import parse_grammar, remove_epsilon, remove_unit, remove_useless, to_cnf, to_gnf, grammar_to_text
+
+# Archivo compartido por todas las réplicas de la aplicación en la misma máquina
+DEFAULT_PATH = os.environ.get("GRAMATICAS_DB", "resultados.sqlite3")
+# Tamaño máximo (bytes de JSON guardado) antes de desalojar los resultados menos usados
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+STAGES = ("bien_formada", "chomsky", "greibach")
+# Versión de las conversiones que entra en la clave: se incrementa cada vez que cambia lo
+# que produce alguna etapa, y los resultados anteriores dejan de servirse (el desalojo
+# por tamaño los termina borrando). 2: to_cnf con símbolos nuevos libres. 3: to_cnf quita
+# los símbolos inútiles que deja la eliminación de ε.
+ALGORITHM_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    grammar TEXT NOT NULL,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+# Texto canónico: mismo formato que grammar_to_text, sin espacios ni líneas sobrantes
+def normalize(text):
+    return grammar_to_text(parse_grammar(text))
+
+def store_key(text, start):
+    return hashlib.sha256(f"{ALGORITHM_VERSION}\0{normalize(text)}\0{start}".encode("utf-8")).hexdigest()
+
+def convert_with_timings(text, start):
+    grammar = parse_grammar(text)
+    results = {}
+    timings = {}
+    started = time.perf_counter()
+    results["bien_formada"] = remove_useless(remove_unit(remove_epsilon(grammar, start), start), start)
+    timings["bien_formada"] = time.perf_counter() - started
+    started = time.perf_counter()
+    results["chomsky"] = to_cnf(grammar, start)
+    timings["chomsky"] = time.perf_counter() - started
+    started = time.perf_counter()
+    results["greibach"] = to_gnf(grammar, start)
+    timings["greibach"] = time.perf_counter() - started
+    return results, timings
+
+# Almacén persistente en SQLite. Cada operación abre su propia conexión, así que se
+# puede usar desde varios hilos y procesos; WAL permite lecturas concurrentes con una
+# escritura y busy_timeout reintenta cuando otro proceso tiene el bloqueo.
+class ResultStore:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return _Closing(conn)
+
+    # Devuelve {"results": {etapa: gramática}, "timings": {etapa: segundos}} o None
+    def get(self, text, start):
+        key = store_key(text, start)
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, text, start, results, timings):
+        key = store_key(text, start)
+        data = json.dumps({"results": {stage: results[stage] for stage in STAGES if stage in results},
+                           "timings": timings}, ensure_ascii=False)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (key, start, normalize(text), data, len(data), now, now))
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    # Desalojo por tamaño: se borran los menos usados hasta quedar bajo el límite
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def get_or_compute(self, text, start):
+        cached = self.get(text, start)
+        if cached is not None:
+            return cached, True
+        results, timings = convert_with_timings(text, start)
+        self.put(text, start, results, timings)
+        return {"results": results, "timings": timings}, False
+
+    def stats(self):
+        with self._connect() as conn:
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
+            conn.execute("VACUUM")
+
+class _Closing:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+# Precarga: cada archivo del directorio es una gramática; "S" como símbolo inicial salvo
+# que la primera línea sea "# inicial: X"
+def warm(store, directory, start="S"):
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        # parse_grammar ignora las líneas sin "->", así que el comentario puede quedarse
+        first = text.lstrip().split("\n", 1)[0]
+        file_start = first.split(":", 1)[1].strip() if first.startswith("# inicial:") else start
+        try:
+            entry, cached = store.get_or_compute(text, file_start)
+        except Exception as e:
+            print(f"{name}: error ({e})")
+            continue
+        if cached:
+            print(f"{name}: ya estaba almacenada")
+        else:
+            total = sum(entry["timings"].values())
+            print(f"{name}: convertida en {total:.3f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacén persistente de conversiones compartido entre procesos.")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="archivo SQLite (variable GRAMATICAS_DB)")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="tamaño máximo antes de desalojar")
+    commands = parser.add_subparsers(dest="command", required=True)
+    warm_parser = commands.add_parser("warm", help="precarga las gramáticas de un directorio")
+    warm_parser.add_argument("directorio", help="directorio con un archivo por gramática")
+    warm_parser.add_argument("--inicial", default="S", help="símbolo inicial por defecto")
+    commands.add_parser("stats", help="muestra entradas y tamaño")
+    commands.add_parser("clear", help="borra todos los resultados")
+    args = parser.parse_args()
+    store = ResultStore(args.db, args.max_bytes)
+    if args.command == "warm":
+        warm(store, args.directorio, args.inicial)
+    elif args.command == "clear":
+        store.clear()
+    stats = store.stats()
+    print(f"{stats['entries']} resultados, {stats['bytes']} de {stats['max_bytes']} bytes")
+
+if __name__ == "__main__":
+    main()
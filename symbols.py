@@ -0,0 +1,7 @@
+# El proyecto trabaja con un carácter por símbolo: mayúscula = no terminal, minúscula =
+# terminal. Estos conjuntos son la reserva de caracteres para los símbolos nuevos: los
+# que asigna el importador EBNF y los frescos de las conversiones.
+ASCII_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+ASCII_LOWER = "abcdefghijklmnopqrstuvwxyz"
+EXTRA_UPPER = [chr(c) for c in range(0xC0, 0x530) if chr(c).isupper() and len(chr(c).lower()) == 1]
+EXTRA_LOWER = [chr(c) for c in range(0xDF, 0x530) if chr(c).islower() and chr(c) != "ε"]
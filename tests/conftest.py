@@ -0,0 +1,92 @@
+import itertools
+import random
+from equivalence import language_by_length
+from grammar import parse_grammar
+
+# Gramáticas de ejemplo: las de la barra lateral y la prueba de carga, más casos con ε,
+# unitarias, recursividad izquierda y símbolos inútiles
+SAMPLES = [
+    "S -> bA | aB\nA -> bAA | aS | a\nB -> aBB | bS | b",
+    "S -> aSb | ab",
+    "S -> aSa | bSb | a | b | *",
+    "S -> SaT | T\nT -> TbF | F\nF -> aSb | a",
+    "S -> AB | a\nA -> Aa | b | *\nB -> Bb | BA | c",
+    "S -> ASB | *\nA -> aAS | a\nB -> SbS | A | bb",
+    "S -> SS | aSb | *",
+    "S -> A | B\nA -> a\nB -> a",
+    "S -> aS | Sb | c\nC -> cC",
+    "S -> AA | a\nA -> S | b",
+]
+
+def grammars():
+    return [parse_grammar(text) for text in SAMPLES]
+
+# Todas las cadenas de la gramática hasta max_len, en un solo conjunto
+def language(grammar, start, max_len):
+    return set().union(*language_by_length(grammar, start, max_len))
+
+def all_strings(alphabet, max_len):
+    for n in range(max_len + 1):
+        for letters in itertools.product(alphabet, repeat=n):
+            yield "".join(letters)
+
+# Gramáticas chicas al azar sobre {a, b}: con ε (si epsilon), unitarias, recursividad y
+# cabezas inaccesibles o improductivas
+def random_grammar(rng, heads="SAB", max_rules=3, max_body=3, epsilon=True):
+    symbols = heads + "ab"
+    grammar = {}
+    for head in heads:
+        prods = []
+        for _ in range(rng.randint(1, max_rules)):
+            body = "".join(rng.choice(symbols) for _ in range(rng.randint(0 if epsilon else 1, max_body)))
+            prods.append(body or "*")
+        grammar[head] = list(dict.fromkeys(prods))
+    return grammar
+
+def random_grammars(count, seed=0, **kwargs):
+    rng = random.Random(seed)
+    return [random_grammar(rng, **kwargs) for _ in range(count)]
+
+# Gramáticas al azar sin reglas ε ni unitarias, donde las derivaciones se cuentan por fuerza bruta
+def grammars_without_cycles(count, seed):
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        grammar = {}
+        for head in "SAB":
+            prods = set()
+            for _ in range(rng.randint(1, 4)):
+                size = rng.randint(1, 3)
+                body = "".join(rng.choice("SABab" if size > 1 else "ab") for _ in range(size))
+                prods.add(body)
+            grammar[head] = sorted(prods)
+        result.append(grammar)
+    return result
+
+# Cantidad de árboles de derivación de text desde symbol, por fuerza bruta; solo para
+# gramáticas sin reglas unitarias ni ε (salvo la del inicial con la cadena vacía)
+def count_derivations(grammar, symbol, text, memo=None):
+    memo = {} if memo is None else memo
+    if symbol not in grammar:
+        return 1 if text == symbol else 0
+    key = (symbol, text)
+    if key not in memo:
+        memo[key] = sum(_count_sequence(grammar, prod, text, memo) for prod in dict.fromkeys(grammar[symbol]))
+    return memo[key]
+
+def _count_sequence(grammar, prod, text, memo):
+    if prod == '*':
+        return 1 if not text else 0
+    if len(prod) == 1:
+        return count_derivations(grammar, prod, text, memo)
+    total = 0
+    for k in range(1, len(text) - len(prod) + 2):
+        left = count_derivations(grammar, prod[0], text[:k], memo)
+        if left:
+            total += left * _count_sequence(grammar, prod[1:], text[k:], memo)
+    return total
+
+def tree_yield(tree):
+    if isinstance(tree, str):
+        return tree
+    return "".join(tree_yield(child) for child in tree[1])
@@ -0,0 +1,36 @@
+import itertools
+import pytest
+from conftest import all_strings, language, random_grammars
+from alphabet import BENCH_GRAMMAR, compress_terminals, terminal_classes
+from grammar import parse_grammar
+
+MAX_LEN = 5
+
+def test_expression_grammar_classes():
+    classes = terminal_classes(parse_grammar(BENCH_GRAMMAR))
+    assert classes.terminals() == 36 + 6
+    assert sorted(map(len, classes.classes)) == [1, 1, 2, 2, 36]
+    assert classes.map("(x+7)%q") == classes.map("(a-0)/a")
+
+# Cada a de la gramática al azar se duplica con c en todas las combinaciones, así a y c
+# aparecen en los mismos contextos y quedan en la misma clase
+def with_twin(grammar):
+    result = {}
+    for head, prods in grammar.items():
+        out = []
+        for prod in prods:
+            choices = [("a", "c") if s == "a" else (s,) for s in prod]
+            out.extend("".join(p) for p in itertools.product(*choices))
+        result[head] = list(dict.fromkeys(out))
+    return result
+
+@pytest.mark.parametrize("grammar", random_grammars(30, seed=13))
+def test_compressed_grammar_keeps_language(grammar):
+    grammar = with_twin(grammar)
+    compressed, classes = compress_terminals(grammar)
+    if any(s == "a" for prods in grammar.values() for prod in prods for s in prod):
+        assert ["a", "c"] in classes.classes
+    expected = language(grammar, "S", MAX_LEN)
+    reduced = language(compressed, "S", MAX_LEN)
+    for text in all_strings("abcz", MAX_LEN):
+        assert (classes.map(text) in reduced) == (text in expected), text
@@ -0,0 +1,69 @@
+import math
+import pytest
+from conftest import all_strings, count_derivations, grammars_without_cycles, tree_yield
+from ambiguity import derivation_counts, find_ambiguity, search_length
+from grammar import parse_grammar
+
+MAX_LEN = 7
+
+SAMPLES = [parse_grammar(text) for text in (
+    "S -> aSb | ab",
+    "S -> SS | aSb | ab",
+    "S -> A | B\nA -> a\nB -> a",
+    "S -> aS | Sa | b",
+    "S -> bA | aB\nA -> bAA | aS | a\nB -> aBB | bS | b",
+)]
+
+def test_known_answers():
+    assert find_ambiguity(SAMPLES[0], "S", MAX_LEN)["ambiguous"] is False
+    assert find_ambiguity(SAMPLES[1], "S", MAX_LEN)["string"] == "ababab"
+    assert find_ambiguity(SAMPLES[2], "S", MAX_LEN)["string"] == "a"
+    assert find_ambiguity(SAMPLES[3], "S", MAX_LEN)["string"] == "aba"
+    # La de la barra lateral: aababb tiene dos árboles
+    assert find_ambiguity(SAMPLES[4], "S", MAX_LEN)["string"] == "aababb"
+
+# Un ciclo de producciones unitarias o ε da infinitas derivaciones de la misma cadena
+@pytest.mark.parametrize("text, string", [("S -> S | a", "a"), ("S -> SA | a\nA -> *", "a"), ("S -> AS | b\nA -> A | *", "b")])
+def test_cycles_give_infinite_derivations(text, string):
+    grammar = parse_grammar(text)
+    assert derivation_counts(grammar, 3)["S"][len(string)] == math.inf
+    result = find_ambiguity(grammar, "S", 3)
+    assert result["string"] == string
+    assert len(result["trees"]) == 2 and result["trees"][0] != result["trees"][1]
+
+@pytest.mark.parametrize("grammar", SAMPLES + grammars_without_cycles(40, seed=8))
+def test_matches_brute_force(grammar):
+    counts = derivation_counts(grammar, MAX_LEN)["S"]
+    by_string = {}
+    for text in all_strings("ab", MAX_LEN):
+        by_string[text] = count_derivations(grammar, "S", text)
+    for n in range(MAX_LEN + 1):
+        assert counts[n] == sum(c for text, c in by_string.items() if len(text) == n)
+    ambiguous = sorted((len(text), text) for text, c in by_string.items() if c > 1)
+    result = find_ambiguity(grammar, "S", MAX_LEN)
+    if not ambiguous:
+        assert result["ambiguous"] is False and result["string"] is None
+        assert [row[1] for row in result["by_length"]] == counts
+        return
+    string = ambiguous[0][1]
+    assert result["ambiguous"] is True and result["string"] == string
+    first, second = result["trees"]
+    assert first != second and tree_yield(first) == tree_yield(second) == string
+
+def test_search_length_shrinks_with_alphabet():
+    assert search_length(parse_grammar("S -> aS | *"), 15, 20_000) == 15
+    assert search_length(parse_grammar("S -> aS | bS | cS | *"), 15, 20_000) == 9
+    assert search_length(parse_grammar("S -> aS | bS | *"), 15, 20_000) == 14
+
+def test_progress_can_cancel():
+    class Stop(Exception):
+        pass
+    seen = []
+
+    def progress(stage, produced):
+        seen.append(stage)
+        if len(seen) > 5:
+            raise Stop()
+    with pytest.raises(Stop):
+        find_ambiguity(parse_grammar("S -> aSb | SS | *"), "S", 15, progress=progress)
+    assert "ambigüedad: derivaciones" in seen
@@ -0,0 +1,42 @@
+import pytest
+from conftest import all_strings, grammars, random_grammars
+from codegen import generate_parser_source, load_generated
+from grammar import parse_grammar, to_gnf
+from ll1 import build_ll1_table, ll1_parse
+
+def check_parser(ll1, alphabet="ab+cz"):
+    parser = load_generated(generate_parser_source(ll1))
+    assert parser["START"] == ll1["start"]
+    for text in all_strings(alphabet, 5):
+        assert parser["accepts"](text) == ll1_parse(ll1, text), text
+
+# El módulo generado acepta exactamente lo mismo que el analizador de la tabla
+@pytest.mark.parametrize("text", ["S -> aSb | c", "S -> aT\nT -> +aT | *"])
+def test_generated_parser_for_ll1_grammars(text):
+    check_parser(build_ll1_table(parse_grammar(text), "S"))
+
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(20, seed=16, epsilon=False))
+def test_generated_parser_matches_gnf_table(grammar):
+    gnf = to_gnf(grammar, "S")
+    if "S" in gnf:
+        check_parser(build_ll1_table(gnf, "S"))
+
+# Con recursividad izquierda en la tabla, el analizador generado también tiene que rechazar
+@pytest.mark.parametrize("grammar", [parse_grammar("S -> Sa | b"), parse_grammar("S -> AS | b\nA -> *")]
+                         + grammars() + random_grammars(20, seed=17))
+def test_generated_parser_stops_on_left_recursion(grammar):
+    check_parser(build_ll1_table(grammar, "S"))
+
+def test_conflicts_are_listed_in_the_source():
+    ll1 = build_ll1_table(parse_grammar("S -> aSb | ab"), "S")
+    source = generate_parser_source(ll1)
+    assert "# La gramática no es LL(1)" in source and "M[S, a]" in source
+
+def test_long_input():
+    parser = load_generated(generate_parser_source(build_ll1_table(parse_grammar("S -> aSb | c"), "S")))
+    assert parser["accepts"]("a" * 3000 + "c" + "b" * 3000)
+    assert not parser["accepts"]("a" * 3000 + "c" + "b" * 2999)
+
+def test_empty_language_is_rejected():
+    with pytest.raises(ValueError):
+        generate_parser_source(build_ll1_table({"A": ["a"]}, "S"))
@@ -0,0 +1,49 @@
+import pytest
+from conftest import all_strings, grammars, language, random_grammars
+from cyk import IncrementalCYK, _full_cyk, cyk_accepts
+from grammar import parse_grammar, to_cnf
+from passes import CHECKS, CHOMSKY, CNF, run_pipeline
+
+MAX_LEN = 6
+
+# Una cabeza que solo derivaba ε no puede quedar en los cuerpos de la FNC
+@pytest.mark.parametrize("grammar", [parse_grammar("S -> BB | aaa | *\nB -> *")]
+                         + grammars() + random_grammars(30, seed=6))
+def test_cnf_output_is_in_cnf(grammar):
+    for cnf in (to_cnf(grammar, "S"), run_pipeline(grammar, "S", CHOMSKY)["grammar"]):
+        assert CHECKS[CNF](cnf, "S")
+        if "S" in cnf:
+            IncrementalCYK(cnf, "S")
+
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(30, seed=6))
+def test_cyk_matches_language(grammar):
+    cnf = to_cnf(grammar, "S")
+    if "S" not in cnf:
+        return
+    expected = language(grammar, "S", MAX_LEN)
+    for text in all_strings("abz", MAX_LEN):
+        assert cyk_accepts(cnf, "S", text) == (text in expected), text
+        assert _full_cyk(cnf, "S", text) == (text in expected), text
+
+# Agregar y deshacer símbolos da lo mismo que reconocer cada prefijo desde cero
+def test_incremental_prefixes_and_undo():
+    cnf = to_cnf(parse_grammar("S -> aSb | SS | ab"), "S")
+    text = "aabbabaabbab"
+    recognizer = IncrementalCYK(cnf, "S")
+    answers = [recognizer.append(token) for token in text]
+    assert answers == [cyk_accepts(cnf, "S", text[:i + 1]) for i in range(len(text))]
+    assert len(recognizer) == len(text)
+    for i in range(len(text) - 1, 0, -1):
+        assert recognizer.undo() == cyk_accepts(cnf, "S", text[:i])
+    recognizer.undo()
+    assert len(recognizer) == 0 and recognizer.undo() is False
+    assert recognizer.extend("abab") is True
+
+def test_empty_string_only_with_start_epsilon():
+    assert cyk_accepts(to_cnf(parse_grammar("S -> aSb | *"), "S"), "S", "")
+    assert not cyk_accepts(to_cnf(parse_grammar("S -> aSb | ab"), "S"), "S", "")
+
+@pytest.mark.parametrize("text", ["S -> aSb | ab", "S -> AB\nA -> *\nB -> b", "S -> A\nA -> a"])
+def test_rejects_grammars_not_in_cnf(text):
+    with pytest.raises(ValueError):
+        IncrementalCYK(parse_grammar(text), "S")
@@ -0,0 +1,70 @@
+import re
+import pytest
+from conftest import all_strings, language
+from ebnf import EXAMPLE_EBNF, import_ebnf, tokenize
+from grammar import to_cnf, to_gnf
+
+# Cadenas de la gramática importada escritas con los tokens originales
+def imported_language(imported, max_len):
+    names = imported["names"]
+    show = lambda s: "".join(names.get(c, '"' + c + '"')[1:-1] for c in s)
+    return {show(s) for s in language(imported["grammar"], imported["start"], max_len)}
+
+# Cada construcción EBNF de una sola regla contra la expresión regular equivalente
+CONSTRUCTS = [
+    ('s ::= "a"* "b"', r"a*b"),
+    ('s ::= {"a"} "b"', r"a*b"),
+    ('s ::= ("a" "b")+', r"(ab)+"),
+    ('s ::= "a" ["b"] "a"', r"ab?a"),
+    ('s ::= "a" "b"? "a"', r"ab?a"),
+    ('s ::= ("a" | "b" "b")* "a"', r"(a|bb)*a"),
+    ('s ::= "a" ("" | "b")', r"ab?"),
+    ('s ::= ε | "a" s "b"', None),
+]
+
+@pytest.mark.parametrize("text, pattern", CONSTRUCTS)
+def test_constructs_match_regex(text, pattern):
+    strings = imported_language(import_ebnf(text), 6)
+    if pattern is None:
+        assert strings == {"a" * n + "b" * n for n in range(4)}
+    else:
+        assert strings == {s for s in all_strings("ab", 6) if re.fullmatch(pattern, s)}
+
+def test_example_names_and_language():
+    imported = import_ebnf(EXAMPLE_EBNF)
+    grammar, start = imported["grammar"], imported["start"]
+    assert start == "E"
+    assert [imported["names"][c] for c in "ETF"] == ["<expr>", "<term>", "<factor>"]
+    # Los tokens de una letra minúscula se conservan
+    assert imported["names"]["x"] == '"x"'
+    strings = imported_language(imported, 5)
+    assert {"x", "x+x", "x*x", "(x)", "(x+x)", "x+x*x"} <= strings
+    assert not {"", "+x", "x+", "()", "xx"} & strings
+    # Las conversiones usan letras ASCII libres: las de los nombres no se pisan
+    reference = language(grammar, start, 7)
+    assert language(to_cnf(grammar, start), start, 7) == reference
+    assert language(to_gnf(grammar, start), start, 7) == reference
+
+def test_shared_helpers_and_epsilon():
+    imported = import_ebnf('s ::= "a"* "b" | "c" "a"*\nt ::= "a"*')
+    grammar = imported["grammar"]
+    helpers = [head for head in grammar if head not in "ST"]
+    # La misma subexpresión en tres lugares da un solo ayudante, con ε escrito como '*'
+    assert len(helpers) == 1
+    assert "*" in grammar[helpers[0]]
+    assert grammar["T"] == helpers
+    assert import_ebnf('s ::= "a" | ""')["grammar"]["S"] == ["a", "*"]
+
+def test_undefined_names_are_terminals():
+    imported = import_ebnf("list ::= NUMBER | NUMBER COMMA list")
+    grammar = imported["grammar"]
+    assert list(grammar) == ["L"]
+    assert sorted(imported["names"][c] for c in imported["names"] if c != "L") == ['"COMMA"', '"NUMBER"']
+
+def test_errors_report_line():
+    with pytest.raises(ValueError, match="Línea 2"):
+        import_ebnf('s ::= "a"\nt ::= ("b"')
+    with pytest.raises(ValueError, match="Línea 1"):
+        tokenize('s ::= "a" @')
+    with pytest.raises(ValueError):
+        import_ebnf("# solo un comentario")
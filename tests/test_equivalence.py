@@ -0,0 +1,61 @@
+import pytest
+from conftest import SAMPLES, grammars, language, random_grammars
+from equivalence import LanguageTooLarge, check_equivalence, compare_language, language_by_length, reference_language
+from grammar import parse_grammar, to_cnf, to_gnf
+from passes import CHOMSKY, WELL_FORMED, run_pipeline
+
+MAX_LEN = 7
+
+def has_epsilon(grammar):
+    return any(prod == '*' for prods in grammar.values() for prod in prods)
+
+def test_language_by_length_known_languages():
+    assert language(parse_grammar("S -> aSb | ab"), "S", 6) == {"ab", "aabb", "aaabbb"}
+    palindromes = language(parse_grammar(SAMPLES[2]), "S", 4)
+    assert palindromes == {"", "a", "b", "aa", "bb", "aaa", "aba", "bab", "bbb",
+                           "aaaa", "abba", "baab", "bbbb"}
+    # S -> SS | aSb | ε: paréntesis balanceados
+    dyck = language(parse_grammar(SAMPLES[6]), "S", 4)
+    assert dyck == {"", "ab", "aabb", "abab"}
+
+def test_language_by_length_without_start_or_productive_rules():
+    assert language_by_length({"A": ["a"]}, "S", 3) == [set()] * 4
+    assert language({"S": ["aS"]}, "S", 5) == set()
+
+def test_language_too_large():
+    grammar = parse_grammar("S -> aS | bS | *")
+    with pytest.raises(LanguageTooLarge):
+        language_by_length(grammar, "S", 10, max_strings=100)
+    assert reference_language(grammar, "S", 10, max_strings=100) is None
+    assert check_equivalence(grammar, grammar, "S", 10, max_strings=100)["equivalent"] is None
+
+def test_counterexample_is_shortest_and_sided():
+    original = parse_grammar("S -> aSb | ab | c")
+    result = check_equivalence(original, parse_grammar("S -> aSb | ab"), "S", MAX_LEN)
+    assert result == {"equivalent": False, "max_len": MAX_LEN, "string": "c", "only_in": "original"}
+    result = check_equivalence(original, parse_grammar("S -> aSb | ab | c | ba"), "S", MAX_LEN)
+    assert result["string"] == "ba" and result["only_in"] == "convertida"
+
+def test_reference_is_reused():
+    original = grammars()[0]
+    reference = reference_language(original, "S", MAX_LEN)
+    assert compare_language(reference, to_cnf(original, "S"), "S", MAX_LEN)["equivalent"]
+
+CONVERSIONS = {
+    "bien_formada": lambda g: run_pipeline(g, "S", WELL_FORMED)["grammar"],
+    "chomsky": lambda g: run_pipeline(g, "S", CHOMSKY)["grammar"],
+    "to_cnf": lambda g: to_cnf(g, "S"),
+}
+
+@pytest.mark.parametrize("name", sorted(CONVERSIONS))
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(40, seed=1))
+def test_conversions_preserve_language(name, grammar):
+    result = check_equivalence(grammar, CONVERSIONS[name](grammar), "S", MAX_LEN)
+    assert result["equivalent"], result
+
+# La conversión a Greibach no admite reglas ε fuera del inicial: se cruza sin ellas
+@pytest.mark.parametrize("grammar", [g for g in grammars() if not has_epsilon(g)]
+                         + random_grammars(30, seed=2, epsilon=False))
+def test_gnf_preserves_language(grammar):
+    result = check_equivalence(grammar, to_gnf(grammar, "S"), "S", MAX_LEN)
+    assert result["equivalent"], result
@@ -0,0 +1,51 @@
+import pytest
+from conftest import grammars, random_grammars
+from estimator import estimate_conversion, format_estimate, plan_conversion
+from grammar import parse_grammar, remove_epsilon
+from passes import WELL_FORMED, run_pipeline
+
+def rule_count(grammar):
+    return sum(len(prods) for prods in grammar.values())
+
+# Sin ε ni unitarias la etapa bien formada no cambia nada: la estimación es exacta.
+# Con S -> ε el inicial cuenta como anulable en los cuerpos y la estimación se pasa.
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(30, seed=28))
+def test_well_formed_input_is_exact(grammar):
+    clean = run_pipeline(grammar, "S", WELL_FORMED)["grammar"]
+    if "*" in clean.get("S", "*"):
+        return
+    assert estimate_conversion(clean, "S")["bien_formada"] == rule_count(clean)
+
+def test_start_epsilon_is_counted():
+    assert estimate_conversion(parse_grammar("S -> * | a"), "S")["bien_formada"] == 2
+
+# remove_epsilon genera 2^k variantes por regla con k símbolos anulables
+@pytest.mark.parametrize("k", range(1, 8))
+def test_epsilon_variants(k):
+    heads = "ABCDEFG"[:k]
+    grammar = parse_grammar(f"S -> {heads}z\n" + "\n".join(f"{h} -> {h.lower()} | *" for h in heads))
+    estimate = estimate_conversion(grammar, "S")
+    assert estimate["nullable"] == k
+    assert estimate["epsilon"] == (1 << k) + k
+    assert rule_count(remove_epsilon(grammar, "S")) == estimate["epsilon"]
+
+def test_left_recursion_is_flagged():
+    estimate = estimate_conversion(parse_grammar("S -> Sa | Ab\nA -> Bc | a\nB -> Ad | b"), "S")
+    assert estimate["left_recursive"] == {"S"}
+    assert estimate["indirect_left_recursive"] == {"A", "B"}
+    # Detrás de un anulable también hay recursividad
+    hidden = estimate_conversion(parse_grammar("S -> ASb | a\nA -> a | *"), "S")
+    assert hidden["left_recursive"] == {"S"}
+
+def test_plan_conversion():
+    budget = {"bien_formada": 10, "chomsky": 20, "greibach": 30}
+    assert plan_conversion({"bien_formada": 5, "chomsky": 15, "greibach": 25}, budget) == (False, [])
+    assert plan_conversion({"bien_formada": 5, "chomsky": 25, "greibach": 35}, budget) == (False, ["chomsky", "greibach"])
+    # Sin bien formada no hay nada que convertir
+    assert plan_conversion({"bien_formada": 11, "chomsky": 15, "greibach": 35}, budget) == (True, ["bien_formada", "greibach"])
+    huge = estimate_conversion(parse_grammar(f"S -> {'A' * 40}\nA -> a | *"), "S")
+    assert plan_conversion(huge)[0]
+
+def test_format_estimate():
+    assert format_estimate(999_999) == "999,999"
+    assert format_estimate(10 ** 12) == "~10^12"
@@ -0,0 +1,28 @@
+import pytest
+from conftest import SAMPLES, grammars, random_grammars
+from grammar import expand_all, to_gnf
+
+# El reparto entre procesos no cambia el resultado, ni su orden
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(20, seed=33, heads="SABCDEFG", max_body=4))
+def test_parallel_matches_sequential(grammar):
+    expected = expand_all(grammar)
+    parallel = expand_all(grammar, workers=2)
+    assert parallel == expected
+    assert list(parallel) == list(expected)
+
+@pytest.mark.parametrize("text", [text for text in SAMPLES if "*" not in text])
+def test_gnf_with_workers(text):
+    grammar = grammars()[SAMPLES.index(text)]
+    assert to_gnf(grammar, "S", workers=3) == to_gnf(grammar, "S")
+
+def test_cancel_leaves_pool_usable():
+    class Stop(Exception):
+        pass
+
+    def progress(stage, produced):
+        raise Stop()
+
+    grammar = random_grammars(1, seed=3, heads="SABCDEFG", max_body=4)[0]
+    with pytest.raises(Stop):
+        expand_all(grammar, progress, workers=2)
+    assert expand_all(grammar, workers=2) == expand_all(grammar)
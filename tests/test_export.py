@@ -0,0 +1,36 @@
+import gzip
+import json
+import pytest
+import export
+from conftest import grammars, random_grammars
+from ebnf import import_ebnf
+from equivalence import check_equivalence
+from export import EXPORT_FORMATS, export_file_name, export_grammar, export_mime
+from grammar import parse_grammar, to_cnf
+
+# Cada formato vuelve a leerse y da la misma gramática (la BNF, el mismo lenguaje)
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(10, seed=15))
+def test_formats_round_trip(grammar):
+    assert parse_grammar(export_grammar(grammar, "txt").decode("utf-8")) == grammar
+    rules = [json.loads(line) for line in export_grammar(grammar, "jsonl").decode("utf-8").splitlines()]
+    assert [(r["head"], "".join(r["body"]) or '*') for r in rules] == [
+        (head, prod) for head, prods in grammar.items() for prod in prods]
+    imported = import_ebnf(export_grammar(grammar, "bnf").decode("utf-8"))
+    assert imported["start"] == "S"
+    assert check_equivalence(grammar, imported["grammar"], "S", 6)["equivalent"]
+
+@pytest.mark.parametrize("fmt", sorted(EXPORT_FORMATS))
+def test_compressed_output_in_chunks(fmt, monkeypatch):
+    grammar = to_cnf(grammars()[5], "S")
+    plain = export_grammar(grammar, fmt)
+    monkeypatch.setattr(export, "CHUNK_SIZE", 16)
+    assert export_grammar(grammar, fmt) == plain
+    compressed = export_grammar(grammar, fmt, compress=True)
+    assert gzip.decompress(compressed) == plain
+    # mtime=0: el mismo contenido da los mismos bytes
+    assert export_grammar(grammar, fmt, compress=True) == compressed
+
+def test_file_names_and_mime_types():
+    assert export_file_name("fnc", "jsonl") == "fnc.jsonl"
+    assert export_file_name("fnc", "bnf", compress=True) == "fnc.bnf.gz"
+    assert export_mime("txt") == "text/plain" and export_mime("txt", compress=True) == "application/gzip"
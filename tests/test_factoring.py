@@ -0,0 +1,37 @@
+import pytest
+from conftest import grammars, random_grammars
+from equivalence import check_equivalence
+from factoring import branching_stats, left_factor
+from grammar import parse_grammar, to_gnf
+
+def test_common_prefixes_are_factored():
+    factored = left_factor(parse_grammar("S -> abA | abB | ac | b\nA -> a\nB -> b"))
+    first, rest = factored["S"]
+    assert first[0] == "a" and rest == "b"
+    after_a = factored[first[1]]
+    assert sorted(after_a)[1] == "c" and after_a[0][0] == "b"
+    assert factored[after_a[0][1]] == ["A", "B"]
+
+def test_empty_rest_and_shared_suffixes():
+    factored = left_factor(parse_grammar("S -> aA | a | bA | b\nA -> c"))
+    # a y b dejan los mismos restos {A, ε}, que comparten un no terminal
+    (a, rest), (b, same) = factored["S"]
+    assert (a, b) == ("a", "b") and rest == same
+    assert factored[rest] == ["A", "*"]
+
+def test_branching_drops_to_one():
+    grammar = parse_grammar("S -> aSb | aSc | ab | ac")
+    assert branching_stats(grammar) == (4, 4.0)
+    rules, average = branching_stats(left_factor(grammar))
+    assert average == 1.0
+
+# Sobre la forma de Greibach, que es donde se usa: ninguna cabeza tiene dos alternativas
+# con el mismo primer símbolo y el lenguaje no cambia
+@pytest.mark.parametrize("grammar", grammars()[:2] + random_grammars(30, seed=14, epsilon=False))
+def test_factored_gnf_keeps_language(grammar):
+    gnf = to_gnf(grammar, "S")
+    factored = left_factor(gnf)
+    for prods in factored.values():
+        firsts = [prod[0] for prod in prods if prod != '*']
+        assert len(firsts) == len(set(firsts))
+    assert check_equivalence(gnf, factored, "S", 7)["equivalent"]
@@ -0,0 +1,44 @@
+import pytest
+from conftest import all_strings, count_derivations, grammars, random_grammars, tree_yield
+from forest import count_trees, format_tree, iter_trees, parse_forest
+from grammar import parse_grammar, to_cnf
+
+def test_forest_of_ambiguous_string():
+    grammar = parse_grammar("S -> SS | aSb | ab")
+    cnf = to_cnf(grammar, "S")
+    forest = parse_forest(cnf, "S", "ababab", grammar)
+    assert count_trees(forest) == 2
+    shown = sorted(format_tree(tree) for tree in iter_trees(forest))
+    assert shown == ["S(S(S(a b) S(a b)) S(a b))", "S(S(a b) S(S(a b) S(a b)))"]
+    assert parse_forest(cnf, "S", "abba", grammar) is None
+
+# La cantidad de árboles crece como los números de Catalan pero el bosque es polinomial
+def test_forest_stays_small_with_many_trees():
+    cnf = to_cnf(parse_grammar("S -> SS | ab"), "S")
+    forest = parse_forest(cnf, "S", "ab" * 12)
+    assert count_trees(forest) == 58786
+    nodes, alternatives = forest.size()
+    assert nodes < 400 and alternatives < 2000
+
+def test_empty_string():
+    grammar = parse_grammar("S -> aSb | *")
+    forest = parse_forest(to_cnf(grammar, "S"), "S", "", grammar)
+    assert count_trees(forest) == 1
+    assert [format_tree(tree) for tree in iter_trees(forest)] == ["S(ε)"]
+
+# Cada árbol es distinto, deriva la cadena y hay tantos como derivaciones tiene la FNC
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(20, seed=7))
+def test_trees_match_derivation_count(grammar):
+    cnf = to_cnf(grammar, "S")
+    if "S" not in cnf:
+        return
+    for text in all_strings("ab", 6):
+        forest = parse_forest(cnf, "S", text, grammar)
+        expected = count_derivations(cnf, "S", text)
+        if forest is None:
+            assert expected == 0
+            continue
+        assert count_trees(forest) == expected
+        trees = [format_tree(tree) for tree in iter_trees(forest)]
+        assert len(set(trees)) == expected
+        assert all(tree_yield(tree) == text for tree in iter_trees(forest))
@@ -0,0 +1,76 @@
+import pytest
+from conftest import SAMPLES, language
+from grammar import parse_grammar
+from jobs import ConversionJob
+from sandbox import WorkerPool
+from store import ResultStore
+
+def run(job):
+    job.start()._thread.join(60)
+    assert job.done
+    return job
+
+@pytest.mark.parametrize("text", SAMPLES[:6])
+def test_stages_keep_language(text):
+    job = run(ConversionJob(text, "S"))
+    assert job.error is None and not job.cancelled
+    reference = language(parse_grammar(text), "S", 6)
+    # to_gnf deja ε dentro de los cuerpos: Greibach solo se compara sin ε
+    stages = ("bien_formada", "chomsky") if "*" in text else ("bien_formada", "chomsky", "greibach")
+    for stage in stages:
+        assert language(job.results[stage], "S", 6) == reference
+        assert job.checks[stage]["equivalent"] is not False
+    assert set(job.phases) >= {"compile_regular", "to_cnf", "build_lalr_tables"}
+
+def test_skip_and_minimize():
+    job = run(ConversionJob("S -> AB | BA\nA -> a | b\nB -> a | b", "S", skip=["greibach"], minimize=True))
+    assert "greibach" not in job.results
+    # A y B tienen las mismas producciones: la FNC minimizada es más chica
+    before, after = job.sizes["chomsky"]
+    assert after < before
+
+def test_cancel_keeps_nothing_half_done():
+    job = ConversionJob(SAMPLES[0], "S")
+    job.cancel()
+    run(job)
+    assert job.cancelled and job.error is None
+    assert "bien_formada" not in job.results
+
+def test_cancel_while_running():
+    stages = []
+
+    def progress(stage, produced):
+        stages.append(stage)
+        if stage == "to_cnf":
+            job.cancel()
+
+    job = ConversionJob(SAMPLES[0], "S", progress=progress)
+    run(job)
+    assert job.cancelled
+    assert "chomsky" not in job.results
+    assert stages[-1] == "to_cnf"
+
+def test_store_is_reused(tmp_path):
+    results = ResultStore(str(tmp_path / "resultados.sqlite3"))
+    first = run(ConversionJob(SAMPLES[1], "S", store=results))
+    assert set(first.computed) == {"bien_formada", "chomsky", "greibach"}
+    second = run(ConversionJob(SAMPLES[1], "S", store=results))
+    assert second.computed == {}
+    assert second.results["chomsky"] == first.results["chomsky"]
+
+def test_isolated_run_matches_thread():
+    pool = WorkerPool(1)
+    try:
+        published = []
+        job = ConversionJob(SAMPLES[3], "S", pool=pool)
+        merge = job._merge
+        job._merge = lambda *item: (published.append(item[:2]), merge(*item))
+        run(job)
+        local = run(ConversionJob(SAMPLES[3], "S"))
+        assert job.error is None
+        assert job.results == local.results
+        assert job.ll1 == local.ll1
+        # Las etapas llegan mientras corre, antes del estado final
+        assert ("results", "bien_formada") in published
+    finally:
+        pool.close()
@@ -0,0 +1,73 @@
+import json
+import random
+import pytest
+from conftest import SAMPLES, all_strings, grammars, language, random_grammars
+from grammar import parse_grammar
+from lalr import _lookup, build_lalr_tables, compress_rows, lalr_parse, lalr_to_json
+from passes import WELL_FORMED, run_pipeline
+
+MAX_LEN = 6
+
+def well_formed(grammar):
+    return run_pipeline(grammar, "S", WELL_FORMED)["grammar"]
+
+def test_lalr_grammar_without_conflicts():
+    # Expresiones con recursividad izquierda
+    tables = build_lalr_tables(parse_grammar("S -> S+T | T\nT -> T-F | F\nF -> (S) | a"), "S")
+    assert tables["conflicts"] == []
+    assert tables["terminals"][-1] == "$"
+    assert lalr_parse(tables, "a+a-a") and lalr_parse(tables, "(a+a)-((a))")
+    assert not lalr_parse(tables, "") and not lalr_parse(tables, "a+") and not lalr_parse(tables, "(a")
+    assert not lalr_parse(tables, "a*a")
+
+def test_lalr_reports_conflicts_for_ambiguous_grammar():
+    tables = build_lalr_tables(parse_grammar("S -> SS | aSb | ab"), "S")
+    assert tables["conflicts"]
+    assert all(c["symbol"] in tables["terminals"] for c in tables["conflicts"])
+
+# Sin conflictos el analizador reconoce exactamente el lenguaje; con conflictos se
+# resuelven como yacc y solo puede aceptar cadenas del lenguaje
+# La aplicación arma las tablas sobre la bien formada; se prueban también las ingresadas,
+# con ε y unitarias, donde los conflictos pueden dejar ciclos de reducciones
+@pytest.mark.parametrize("clean", [True, False])
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(40, seed=4))
+def test_lalr_parse_matches_language(grammar, clean):
+    if clean:
+        grammar = well_formed(grammar)
+    if "S" not in grammar:
+        return
+    tables = build_lalr_tables(grammar, "S")
+    expected = language(grammar, "S", MAX_LEN)
+    for text in all_strings("abz", MAX_LEN):
+        accepted = lalr_parse(tables, text)
+        if not tables["conflicts"]:
+            assert accepted == (text in expected), text
+        elif accepted:
+            assert text in expected, text
+
+# S -> SS | ε y la unitaria S -> A -> S dejan, tras resolver conflictos, ciclos de
+# reducciones sin consumir entrada: el análisis tiene que terminar igual
+@pytest.mark.parametrize("text", ["S -> SS | aSb | *", "S -> A | a\nA -> S | b", "S -> SA | *\nA -> a | *"])
+def test_lalr_parse_stops_on_reduction_cycles(text):
+    grammar = parse_grammar(text)
+    tables = build_lalr_tables(grammar, "S")
+    assert tables["conflicts"]
+    expected = language(grammar, "S", 8)
+    for text in all_strings("ab", 8):
+        if lalr_parse(tables, text):
+            assert text in expected
+
+def test_compress_rows_keeps_every_entry():
+    rng = random.Random(5)
+    rows = [{c: rng.randint(1, 99) for c in rng.sample(range(30), rng.randint(0, 8))} for _ in range(60)]
+    table = compress_rows(rows)
+    for r, row in enumerate(rows):
+        for c in range(30):
+            assert _lookup(table, r, c) == row.get(c, 0)
+    assert len(table["value"]) < 60 * 30
+
+def test_lalr_to_json():
+    tables = build_lalr_tables(parse_grammar(SAMPLES[1]), "S")
+    data = json.loads(lalr_to_json(tables))
+    assert data["start"] == "S" and data["terminals"] == tables["terminals"]
+    assert len(data["rules"]) == len(tables["rules"])
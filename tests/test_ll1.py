@@ -0,0 +1,72 @@
+import pytest
+from conftest import SAMPLES, all_strings, grammars, language, random_grammars
+from grammar import parse_grammar, to_gnf
+from ll1 import build_ll1_table, ll1_from_bytes, ll1_parse, ll1_to_bytes
+
+MAX_LEN = 6
+
+# Gramáticas LL(1) además de las de ejemplo, para cubrir tablas sin conflictos
+LL1_SAMPLES = [
+    "S -> aSb | c",
+    "S -> aT\nT -> +aT | *",
+    "S -> aA | bB\nA -> aA | b\nB -> bBc | c",
+]
+
+def candidates(grammar):
+    terminals = sorted({s for prods in grammar.values() for prod in prods for s in prod
+                        if s != '*' and s not in grammar and not s.isupper()})
+    # Un símbolo ajeno a la gramática siempre se rechaza
+    return list(all_strings(terminals[:3] + ["z"], MAX_LEN - 2)) + list(all_strings(terminals[:2], MAX_LEN))
+
+def test_ll1_table_for_ll1_grammar():
+    ll1 = build_ll1_table(parse_grammar("S -> aSb | c"), "S")
+    assert ll1["conflicts"] == []
+    assert ll1["terminals"][-1] == "$"
+    assert ll1_parse(ll1, "aacbb") and ll1_parse(ll1, "c")
+    assert not ll1_parse(ll1, "aacb") and not ll1_parse(ll1, "") and not ll1_parse(ll1, "acbz")
+
+def test_ll1_reports_conflicts():
+    ll1 = build_ll1_table(parse_grammar("S -> aSb | ab"), "S")
+    assert ll1["conflicts"] == [("S", "a", ["aSb", "ab"])]
+
+# Sin conflictos el analizador reconoce exactamente el lenguaje; con conflictos la tabla
+# se queda con una de las reglas y solo puede aceptar cadenas del lenguaje
+def check_parse(ll1, grammar):
+    expected = language(grammar, "S", MAX_LEN)
+    for text in candidates(grammar):
+        accepted = ll1_parse(ll1, text)
+        if not ll1["conflicts"]:
+            assert accepted == (text in expected), text
+        elif accepted:
+            assert text in expected, text
+
+@pytest.mark.parametrize("text", LL1_SAMPLES)
+def test_ll1_parse_ll1_grammars(text):
+    grammar = parse_grammar(text)
+    ll1 = build_ll1_table(grammar, "S")
+    assert ll1["conflicts"] == []
+    check_parse(ll1, grammar)
+
+# Como en la aplicación, la tabla se arma sobre la forma de Greibach
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(30, seed=3, epsilon=False))
+def test_ll1_parse_matches_language(grammar):
+    gnf = to_gnf(grammar, "S")
+    if "S" in gnf:
+        check_parse(build_ll1_table(gnf, "S"), grammar)
+
+# Sobre las gramáticas ingresadas, con recursividad izquierda, el análisis tiene que
+# terminar aunque la tabla elija una regla que se expande a sí misma
+@pytest.mark.parametrize("grammar", [parse_grammar("S -> Sa | b"), parse_grammar("S -> Sa | *")]
+                         + grammars() + random_grammars(30, seed=3))
+def test_ll1_parse_stops_on_left_recursion(grammar):
+    check_parse(build_ll1_table(grammar, "S"), grammar)
+
+@pytest.mark.parametrize("text", SAMPLES[:4])
+def test_ll1_binary_roundtrip(text):
+    ll1 = build_ll1_table(to_gnf(parse_grammar(text), "S"), "S")
+    loaded = ll1_from_bytes(ll1_to_bytes(ll1))
+    for key in ("start", "nonterminals", "terminals", "rules"):
+        assert loaded[key] == ll1[key]
+    assert list(loaded["table"]) == list(ll1["table"])
+    with pytest.raises(ValueError):
+        ll1_from_bytes(b"XXXX" + ll1_to_bytes(ll1)[4:])
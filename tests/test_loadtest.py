@@ -0,0 +1,46 @@
+import multiprocessing
+import pytest
+from loadtest import GRAMMAR_MIX, MemoryMonitor, format_report, parse_mix, percentile, simulate_session
+
+def test_parse_mix():
+    assert parse_mix("pequena=70, mediana=25,patologica") == {"pequena": 70.0, "mediana": 25.0, "patologica": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("enorme=1")
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert [percentile(values, q) for q in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([3.0], 99) == 3.0
+
+def test_monitor_counts_children():
+    monitor = MemoryMonitor()
+    _, alone = monitor.sample()
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    child = context.Process(target=stop.wait)
+    child.start()
+    try:
+        _, with_child = monitor.sample()
+    finally:
+        stop.set()
+        child.join()
+    assert with_child > alone
+    assert monitor.peak_workers >= with_child
+
+def test_format_report():
+    records = [("pequena", "ok", {"carga": 0.1, "conversión": 0.5, "total": 1.0}),
+               ("pequena", "ok", {"carga": 0.2, "conversión": 0.7, "total": 1.5}),
+               ("patologica", "límite (memoria)", {"carga": 0.1})]
+    memory = {"base_main": 0, "base_workers": 0, "peak_main": 0, "peak_workers": 0, "per_session": 0}
+    report = format_report({"records": records, "elapsed": 2.0, "sessions": 3, "concurrency": 2, "memory": memory})
+    lines = report.splitlines()
+    assert lines[0].endswith("1.00 conversiones correctas por segundo")
+    assert "  patologica: límite (memoria) 1" in lines
+    assert any(line.startswith("conversión (pequena)") and line.split()[2] == "2" for line in lines)
+
+# La sesión completa necesita la app: Streamlit y NumPy de requirements.txt
+def test_small_session():
+    pytest.importorskip("streamlit.testing.v1")
+    kind, outcome, latencies = simulate_session("pequena", GRAMMAR_MIX["pequena"][1], 120, [])
+    assert (kind, outcome) == ("pequena", "ok")
+    assert latencies["total"] >= latencies["conversión"]
@@ -0,0 +1,35 @@
+import pytest
+from conftest import grammars, random_grammars
+from equivalence import check_equivalence
+from grammar import parse_grammar, to_cnf
+from minimize import equivalent_nonterminals, grammar_size, minimize_grammar
+
+def test_merges_identical_heads():
+    grammar = parse_grammar("S -> AB | BA\nA -> a | AC\nB -> a | BC\nC -> c")
+    minimized, merged = minimize_grammar(grammar, "S")
+    assert merged == {"B": "A"}
+    assert minimized == {"S": ["AA"], "A": ["a", "AC"], "C": ["c"]}
+    assert grammar_size(grammar) == (4, 7) and grammar_size(minimized) == (3, 4)
+
+# A y B solo son equivalentes si se supone que lo son: el refinamiento parte de un bloque
+def test_merges_mutually_recursive_heads():
+    grammar = parse_grammar("S -> aA | bB\nA -> aB | b\nB -> aA | b")
+    assert sorted(map(sorted, equivalent_nonterminals(grammar))) == [["A", "B"]]
+    minimized, merged = minimize_grammar(grammar, "S")
+    assert merged == {"B": "A"} and minimized["S"] == ["aA", "bA"]
+
+def test_start_is_the_representative():
+    minimized, merged = minimize_grammar(parse_grammar("S -> aS | b\nA -> aA | b\nT -> A"), "S")
+    assert merged == {"A": "S"} and "S" in minimized
+
+def test_distinct_heads_are_kept():
+    grammar = parse_grammar("S -> AB\nA -> a\nB -> b")
+    assert minimize_grammar(grammar, "S") == (grammar, {})
+
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(30, seed=12))
+def test_minimized_cnf_keeps_language(grammar):
+    cnf = to_cnf(grammar, "S")
+    minimized, merged = minimize_grammar(cnf, "S")
+    assert set(minimized) == set(cnf) - set(merged)
+    assert check_equivalence(cnf, minimized, "S", 7)["equivalent"]
+    assert equivalent_nonterminals(minimized) == []
@@ -0,0 +1,58 @@
+import random
+import pytest
+from conftest import grammars, random_grammars
+from equivalence import check_equivalence
+from grammar import parse_grammar
+from passes import (CHECKS, CHOMSKY, CNF, EPSILON_FREE, NO_LEFT_RECURSION, NO_USELESS, PASSES, UNIT_FREE,
+                    WELL_FORMED, detect_properties, format_log, remove_left_recursion, run_pipeline)
+
+def test_detect_properties():
+    assert detect_properties(parse_grammar("S -> AB\nA -> a\nB -> b"), "S") >= {CNF, EPSILON_FREE, UNIT_FREE, NO_USELESS}
+    assert EPSILON_FREE not in detect_properties(parse_grammar("S -> aA\nA -> a | *"), "S")
+    # El inicial anulable en un cuerpo exige la variante sin él
+    assert EPSILON_FREE not in detect_properties(parse_grammar("S -> aS | *"), "S")
+    assert EPSILON_FREE in detect_properties(parse_grammar("S -> aS | a | *"), "S")
+    assert UNIT_FREE not in detect_properties(parse_grammar("S -> A\nA -> a"), "S")
+    assert NO_USELESS not in detect_properties(parse_grammar("S -> a\nA -> a"), "S")
+    assert NO_LEFT_RECURSION not in detect_properties(parse_grammar("S -> Ab | a\nA -> Sa"), "S")
+    # Recursión oculta detrás de un anulable
+    assert NO_LEFT_RECURSION not in detect_properties(parse_grammar("S -> ASb | a\nA -> a | *"), "S")
+
+def test_satisfied_passes_are_skipped():
+    well_formed = run_pipeline(grammars()[4], "S", WELL_FORMED)
+    again = run_pipeline(well_formed["grammar"], "S", WELL_FORMED, well_formed["properties"])
+    assert [entry["skipped"] for entry in again["log"]] == [True, True, True]
+    assert again["grammar"] is well_formed["grammar"]
+    cnf = run_pipeline(well_formed["grammar"], "S", CHOMSKY, well_formed["properties"])
+    assert [entry["pass"] for entry in cnf["log"] if not entry["skipped"]] == ["to_cnf"]
+    assert format_log(cnf["log"])[0] == "remove_useless: omitida"
+
+def test_missing_requirements_are_logged():
+    run = run_pipeline(parse_grammar("S -> A | aS\nA -> a | *"), "S", ["to_cnf"])
+    assert run["log"][0]["missing"] == sorted({EPSILON_FREE, UNIT_FREE})
+    assert "sin garantizar" in format_log(run["log"])[0]
+    with pytest.raises(ValueError):
+        run_pipeline(parse_grammar("S -> a"), "S", ["no_existe"])
+
+# Las propiedades que el gestor da por válidas sin mirar la gramática tienen que valer
+SEQUENCE_PASSES = [name for name in PASSES if name != "to_gnf"]
+
+@pytest.mark.parametrize("seed", range(40))
+def test_tracked_properties_hold(seed):
+    rng = random.Random(seed)
+    grammar = random_grammars(1, seed=200 + seed)[0]
+    pipeline = [rng.choice(SEQUENCE_PASSES) for _ in range(rng.randint(1, 5))]
+    run = run_pipeline(grammar, "S", pipeline)
+    for name in run["properties"]:
+        assert CHECKS[name](run["grammar"], "S"), (pipeline, name)
+    # Una pasada que corrió sin sus requisitos queda registrada y no garantiza el lenguaje
+    if not any(entry["missing"] for entry in run["log"]):
+        assert check_equivalence(grammar, run["grammar"], "S", 6)["equivalent"]
+
+@pytest.mark.parametrize("grammar", grammars() + random_grammars(30, seed=18))
+def test_remove_left_recursion(grammar):
+    clean = run_pipeline(grammar, "S", WELL_FORMED)["grammar"]
+    result = remove_left_recursion(clean, "S")
+    assert check_equivalence(clean, result, "S", 7)["equivalent"]
+    if "*" not in clean.get("S", []):
+        assert CHECKS[NO_LEFT_RECURSION](result, "S")
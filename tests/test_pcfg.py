@@ -0,0 +1,126 @@
+import math
+import random
+import pytest
+import pcfg
+from conftest import all_strings, grammars_without_cycles, tree_yield
+from grammar import parse_grammar
+from pcfg import PCFG, build_pcfg, compile_tables, to_weighted_cnf
+
+MAX_LEN = 6
+
+def random_weights(grammar, seed):
+    rng = random.Random(seed)
+    return {(head, prod): rng.choice([0.5, 1.0, 2.0, 3.0]) for head, prods in grammar.items() for prod in prods}
+
+def rule_probs(grammar, weights):
+    probs = {}
+    for head, prods in grammar.items():
+        total = sum(weights.get((head, prod), 1.0) for prod in prods)
+        for prod in prods:
+            probs[(head, prod)] = weights.get((head, prod), 1.0) / total
+    return probs
+
+# Probabilidad de que cada no terminal termine, iterando desde cero hasta el menor punto fijo
+def termination(grammar, probs):
+    t = {head: 0.0 for head in grammar}
+    for _ in range(5000):
+        t = {head: sum(probs[(head, prod)] * math.prod(t.get(s, 1.0) if s in grammar else 1.0 for s in prod)
+                       for prod in prods)
+             for head, prods in grammar.items()}
+    return t
+
+# Suma (o máximo) sobre los árboles de text del producto de las probabilidades de sus reglas
+def weighted(grammar, probs, symbol, text, combine, memo):
+    if symbol not in grammar:
+        return 1.0 if text == symbol else 0.0
+    key = (symbol, text)
+    if key not in memo:
+        memo[key] = combine([probs[(symbol, prod)] * sequence(grammar, probs, prod, text, combine, memo)
+                             for prod in grammar[symbol]] + [0.0])
+    return memo[key]
+
+def sequence(grammar, probs, prod, text, combine, memo):
+    if len(prod) == 1:
+        return weighted(grammar, probs, prod, text, combine, memo)
+    values = [0.0]
+    for k in range(1, len(text) - len(prod) + 2):
+        left = weighted(grammar, probs, prod[0], text[:k], combine, memo)
+        if left:
+            values.append(left * sequence(grammar, probs, prod[1:], text[k:], combine, memo))
+    return combine(values)
+
+def tree_probability(tree, probs):
+    label, children = tree
+    prod = "".join(child if isinstance(child, str) else child[0] for child in children) or '*'
+    return probs[(label, prod)] * math.prod(tree_probability(child, probs) for child in children
+                                            if not isinstance(child, str))
+
+def test_known_probabilities():
+    weights = {}
+    grammar = parse_grammar(pcfg.BENCH_GRAMMAR, weights)
+    model = build_pcfg(grammar, weights, "S")
+    [inside] = model.inside(["aabb"])
+    assert inside == pytest.approx(math.log(0.12))
+    [(score, tree)] = model.viterbi(["aabb"])
+    assert score == pytest.approx(math.log(0.12))
+    assert tree == ("S", ["a", ("S", ["a", "b"]), "b"])
+    assert model.viterbi(["ba"]) == [(-math.inf, None)]
+    assert model.inside(["", "abz"]) == [-math.inf, -math.inf]
+
+# Con ε cada cadena conserva su probabilidad: S -> aS [0.5] | ε [0.5] da 0.5^(n+1)
+def test_epsilon_rules_keep_probabilities():
+    weights = {}
+    grammar = parse_grammar("S -> aS [0.5] | * [0.5]", weights)
+    model = build_pcfg(grammar, weights, "S")
+    scores = model.inside(["", "a", "aaa"])
+    assert scores == pytest.approx([math.log(0.5), math.log(0.25), math.log(0.0625)])
+    assert model.viterbi([""])[0][0] == pytest.approx(math.log(0.5))
+
+def test_start_without_finite_derivations():
+    with pytest.raises(ValueError):
+        to_weighted_cnf({"S": ["aS"]}, {}, "S")
+
+@pytest.mark.parametrize("seed", range(25))
+def test_matches_brute_force(seed):
+    grammar = grammars_without_cycles(1, seed=100 + seed)[0]
+    weights = random_weights(grammar, seed)
+    probs = rule_probs(grammar, weights)
+    t = termination(grammar, probs)["S"]
+    if t < 1e-9:
+        with pytest.raises(ValueError):
+            build_pcfg(grammar, weights, "S")
+        return
+    model = build_pcfg(grammar, weights, "S")
+    texts = [text for text in all_strings("ab", MAX_LEN) if text]
+    inside = model.inside(texts)
+    best = model.viterbi(texts)
+    total, maximum = {}, {}
+    for text, score, (best_score, tree) in zip(texts, inside, best):
+        p = weighted(grammar, probs, "S", text, sum, total) / t
+        if p == 0:
+            assert score == -math.inf and tree is None
+            continue
+        assert score == pytest.approx(math.log(p), abs=1e-6)
+        top = weighted(grammar, probs, "S", text, max, maximum) / t
+        assert best_score == pytest.approx(math.log(top), abs=1e-6)
+        assert tree_yield(tree) == text
+        assert tree_probability(tree, probs) / t == pytest.approx(top, rel=1e-6)
+
+# El diagrama se llena por tramos de cortes; con tramos de un solo corte el resultado es el mismo
+def test_chart_chunks_give_same_result(monkeypatch):
+    weights = {}
+    grammar = parse_grammar("S -> SS [0.3] | aSb [0.3] | ab [0.4] | ba [0.1]", weights)
+    model = build_pcfg(grammar, weights, "S")
+    texts = ["abab" * 3, "aabbab" * 2, "ababba", "ba" * 5]
+    inside, best = model.inside(texts), model.viterbi(texts)
+    monkeypatch.setattr(pcfg, "CHART_CHUNK", 1)
+    assert model.inside(texts) == pytest.approx(inside)
+    assert model.viterbi(texts) == best
+
+def test_unweighted_tables_count_trees():
+    grammar = parse_grammar("S -> SS | ab")
+    cnf, _, aliases = to_weighted_cnf(grammar, {}, "S")
+    model = PCFG(compile_tables(cnf, None, "S", grammar, aliases))
+    [score] = model.inside(["ab" * 6])
+    # C5 = 42 formas de agrupar seis "ab"
+    assert score == pytest.approx(math.log(42))
@@ -0,0 +1,73 @@
+import json
+import random
+import pytest
+from conftest import all_strings, language
+from grammar import parse_grammar
+from regular import compile_regular, dfa_accepts, dfa_to_json, linearity
+
+MAX_LEN = 7
+
+# Gramáticas lineales al azar: por la derecha (A -> wB | w) o por la izquierda (A -> Bw | w),
+# con cadenas w de hasta dos terminales, ε y reglas unitarias
+def linear_grammar(rng, kind):
+    grammar = {}
+    for head in "SAB":
+        prods = set()
+        for _ in range(rng.randint(1, 3)):
+            word = "".join(rng.choice("ab") for _ in range(rng.randint(0, 2)))
+            if rng.random() < 0.6:
+                prod = word + rng.choice("SAB") if kind == "right" else rng.choice("SAB") + word
+            else:
+                prod = word or '*'
+            prods.add(prod)
+        grammar[head] = sorted(prods)
+    return grammar
+
+def linear_grammars(count, kind, seed):
+    rng = random.Random(seed)
+    return [linear_grammar(rng, kind) for _ in range(count)]
+
+def test_linearity():
+    assert linearity(parse_grammar("S -> aS | bA | *\nA -> a")) == "right"
+    assert linearity(parse_grammar("S -> Sa | Ab | *\nA -> a")) == "left"
+    assert linearity(parse_grammar("S -> aS | Sb")) is None
+    assert linearity(parse_grammar("S -> aSb | *")) is None
+    assert compile_regular(parse_grammar("S -> aSb | *"), "S") is None
+
+def test_minimal_dfa_for_known_language():
+    # (ab)*: dos estados sin contar el de error
+    dfa = compile_regular(parse_grammar("S -> aA | *\nA -> bS"), "S")
+    assert dfa["states"] == 2
+    assert dfa_accepts(dfa, "") and dfa_accepts(dfa, "abab")
+    assert not dfa_accepts(dfa, "aba") and not dfa_accepts(dfa, "abc")
+
+# Estados distinguibles dos a dos: la tabla no se puede achicar más
+def assert_minimal(dfa):
+    width = len(dfa["alphabet"])
+    accepting = set(dfa["accepting"])
+
+    def run(state, text):
+        for s in text:
+            state = dfa["table"][state * width + dfa["alphabet"].index(s)]
+            if state < 0:
+                return False
+        return state in accepting
+    words = list(all_strings(dfa["alphabet"], dfa["states"]))
+    signatures = {tuple(run(q, w) for w in words) for q in range(dfa["states"])}
+    assert len(signatures) == dfa["states"]
+
+@pytest.mark.parametrize("grammar", linear_grammars(30, "right", seed=10) + linear_grammars(30, "left", seed=11))
+def test_dfa_matches_language(grammar):
+    dfa = compile_regular(grammar, "S")
+    assert dfa is not None
+    expected = language(grammar, "S", MAX_LEN)
+    for text in all_strings("abz", MAX_LEN):
+        assert dfa_accepts(dfa, text) == (text in expected), text
+    if dfa["alphabet"]:
+        assert_minimal(dfa)
+
+def test_dfa_to_json():
+    dfa = compile_regular(parse_grammar("S -> aS | b"), "S")
+    data = json.loads(dfa_to_json(dfa))
+    assert data["alphabet"] == ["a", "b"]
+    assert len(data["transitions"]) == dfa["states"]
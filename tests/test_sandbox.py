@@ -0,0 +1,100 @@
+import os
+import time
+import pytest
+from sandbox import WorkerLimitExceeded, WorkerPool, WorkerTimeout
+
+# Los trabajos se envían por nombre: tienen que estar a nivel de módulo
+
+def add(a, b, progress=None, publish=None):
+    return a + b
+
+def fail(progress=None, publish=None):
+    raise ValueError("gramática inválida")
+
+def allocate(mb, progress=None, publish=None):
+    return len(bytearray(mb * 1024 * 1024))
+
+def spin(progress=None, publish=None):
+    while True:
+        pass
+
+def sleep(seconds, progress=None, publish=None):
+    for i in range(int(seconds * 20)):
+        progress("durmiendo", i)
+        time.sleep(0.05)
+
+def die(progress=None, publish=None):
+    os._exit(3)
+
+def stages(progress=None, publish=None):
+    for i in range(3):
+        publish("results", i, i * i)
+        progress("etapa", i)
+    return "listo"
+
+def pid(progress=None, publish=None):
+    return os.getpid()
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(1, memory_limit=64 * 1024 * 1024, cpu_limit=1, max_jobs=3)
+    yield pool
+    pool.close()
+
+def test_results_and_errors(pool):
+    assert pool.run(add, 2, 3) == 5
+    with pytest.raises(ValueError, match="gramática inválida"):
+        pool.run(fail)
+    # Un error común no descarta el proceso
+    assert pool.stats()["recycled"] == 0
+    assert pool.run(add, "a", "b") == "ab"
+
+def test_memory_limit(pool):
+    assert pool.run(allocate, 8) == 8 * 1024 * 1024
+    with pytest.raises(WorkerLimitExceeded) as error:
+        pool.run(allocate, 256)
+    assert error.value.kind == "memoria"
+    assert "64 MB" in str(error.value)
+    # El proceso se reemplaza y el siguiente trabajo corre normalmente
+    assert pool.run(add, 1, 1) == 2
+    assert pool.stats()["memoria"] == 1
+
+def test_cpu_limit(pool):
+    with pytest.raises(WorkerLimitExceeded) as error:
+        pool.run(spin)
+    assert error.value.kind == "cpu"
+    assert pool.run(add, 1, 1) == 2
+
+def test_dead_worker_is_replaced(pool):
+    with pytest.raises(WorkerLimitExceeded) as error:
+        pool.run(die)
+    assert error.value.kind == "terminado"
+    assert pool.run(add, 1, 2) == 3
+
+def test_deadline(pool):
+    with pytest.raises(WorkerTimeout):
+        pool.run(sleep, 5, deadline=time.monotonic() + 0.3)
+    assert pool.run(add, 1, 2) == 3
+
+def test_progress_can_cancel(pool):
+    class Stop(Exception):
+        pass
+
+    def progress(stage, produced):
+        if stage == "durmiendo":
+            raise Stop()
+
+    with pytest.raises(Stop):
+        pool.run(sleep, 5, progress=progress)
+    assert pool.stats()["recycled"] == 1
+
+def test_published_stages_arrive_in_order(pool):
+    published = []
+    assert pool.run(stages, publish=lambda *item: published.append(item)) == "listo"
+    assert published == [("results", i, i * i) for i in range(3)]
+
+def test_recycled_after_max_jobs(pool):
+    pids = [pool.run(pid) for _ in range(4)]
+    assert len(set(pids[:3])) == 1
+    assert pids[3] != pids[0]
+    assert pool.stats()["recycled"] == 1
@@ -0,0 +1,84 @@
+import json
+import threading
+from urllib import error as urlerror, request as urlrequest
+import pytest
+from conftest import SAMPLES, language
+from grammar import parse_grammar
+from service import FORMS, ConversionService, Histogram, convert, request_conversion, serve
+
+@pytest.fixture(scope="module")
+def service():
+    service = ConversionService(workers=2, timeout=30)
+    yield service
+    service.close()
+
+def test_invalid_requests(service):
+    assert service.handle_convert(None)[0] == 400
+    assert service.handle_convert({"grammar": 5})[0] == 400
+    assert service.handle_convert({"grammar": "S -> a", "forms": ["otra"]})[0] == 400
+    status, body = service.handle_convert({"grammar": "S -> a", "start": "X"})
+    assert status == 400 and "'X'" in body["error"]
+
+def test_budget_refusal():
+    service = ConversionService(workers=1, budget={"bien_formada": 10**6, "chomsky": 10**6, "greibach": 5})
+    try:
+        status, body = service.handle_convert({"grammar": SAMPLES[0]})
+        assert status == 413 and body["over_budget"] == ["greibach"]
+        # Sin pedir la etapa que excede, la conversión sigue
+        status, body = service.handle_convert({"grammar": SAMPLES[0], "forms": ["chomsky"]})
+        assert status == 200 and list(body["results"]) == ["chomsky"]
+        assert service.metrics()["counters"]["rejected"] == 1
+    finally:
+        service.close()
+
+@pytest.mark.parametrize("text", SAMPLES[:6])
+def test_results_match_local_conversion(service, text):
+    status, body = service.handle_convert({"grammar": text})
+    assert status == 200
+    assert body["results"] == convert(text, "S", FORMS)
+    reference = language(parse_grammar(text), "S", 6)
+    for form in ("bien_formada", "chomsky"):
+        assert language(body["results"][form], "S", 6) == reference
+
+def test_identical_requests_share_conversion(service):
+    text = "S -> aSb | ab | SS"
+    before = service.metrics()["counters"]
+    replies = [None] * 6
+
+    def send(i):
+        replies[i] = service.handle_convert({"grammar": text})
+
+    threads = [threading.Thread(target=send, args=(i,)) for i in range(len(replies))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    after = service.metrics()["counters"]
+    assert all(reply == replies[0] and reply[0] == 200 for reply in replies)
+    assert after["computed"] - before["computed"] + after["coalesced"] - before["coalesced"] == len(replies)
+    assert service.metrics()["in_flight"] == 0
+
+def test_http_endpoints(service):
+    server = serve(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        status, body = request_conversion(url, "S -> aS | b", forms=["chomsky"])
+        assert status == 200 and body["results"] == convert("S -> aS | b", "S", ["chomsky"])
+        assert request_conversion(url, "sin flecha")[0] == 400
+        req = urlrequest.Request(url + "/convert", data=b"x" * (service.max_body + 1))
+        with pytest.raises(urlerror.HTTPError) as error:
+            urlrequest.urlopen(req, timeout=10)
+        assert error.value.code == 413
+        with urlrequest.urlopen(url + "/metrics", timeout=10) as response:
+            metrics = json.loads(response.read())
+        assert metrics["latency_seconds"]["/convert"]["count"] >= 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_histogram_is_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+    assert histogram.to_dict()["buckets"] == {"0.1": 1, "1.0": 3, "+Inf": 4}
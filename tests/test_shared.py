@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from conftest import all_strings
+from grammar import parse_grammar
+from pcfg import build_pcfg
+from shared import attach_tables, attached_pcfg, parallel_inside, share_tables
+
+def test_tables_round_trip():
+    arrays = {"a": np.arange(10, dtype=np.int32), "b": np.ones((3, 5)), "c": np.zeros(0, dtype=np.int64)}
+    with share_tables(arrays) as tables:
+        attached = attach_tables(tables.name)
+        for key, array in arrays.items():
+            view = attached.arrays[key]
+            assert view.dtype == array.dtype and np.array_equal(view, array)
+            # Cada arreglo queda alineado dentro del segmento
+            assert view.ctypes.data % 64 == 0
+            assert not view.flags.writeable
+        del view
+        attached.close()
+
+def test_owner_removes_segment():
+    tables = share_tables({"a": np.arange(3)})
+    name = tables.name
+    tables.close()
+    with pytest.raises(FileNotFoundError):
+        attach_tables(name)
+
+def test_attached_model_scores_like_original():
+    model = build_pcfg(parse_grammar("S -> aSb | ab | SS"), {}, "S")
+    texts = list(all_strings("ab", 6))
+    with share_tables(model.tables) as tables:
+        assert attached_pcfg(tables.name).inside(texts) == model.inside(texts)
+
+@pytest.mark.parametrize("context", ["fork", "spawn"])
+def test_parallel_inside(context):
+    weights = {}
+    model = build_pcfg(parse_grammar("S -> aSb [0.3] | ab [0.3] | SS [0.4]", weights), weights, "S")
+    texts = list(all_strings("ab", 8))
+    assert parallel_inside(model, texts, workers=2, chunk=50, context=context) == model.inside(texts)
@@ -0,0 +1,63 @@
+import itertools
+import pytest
+import store
+from conftest import SAMPLES
+from store import ResultStore, convert_with_timings, store_key, warm
+
+@pytest.fixture
+def results(tmp_path):
+    return ResultStore(str(tmp_path / "resultados.sqlite3"))
+
+def test_round_trip(results):
+    assert results.get(SAMPLES[1], "S") is None
+    entry, cached = results.get_or_compute(SAMPLES[1], "S")
+    assert not cached
+    assert set(entry["results"]) == set(store.STAGES)
+    again, cached = results.get_or_compute(SAMPLES[1], "S")
+    assert cached and again["results"] == entry["results"]
+    assert results.stats()["entries"] == 1
+
+def test_key_ignores_formatting_but_not_start_or_version(monkeypatch):
+    assert store_key("S -> aSb | ab", "S") == store_key("  S->aSb|ab\n\n", "S")
+    assert store_key("S -> aSb | ab", "S") != store_key("S -> aSb | ab", "A")
+    before = store_key("S -> aSb | ab", "S")
+    monkeypatch.setattr(store, "ALGORITHM_VERSION", store.ALGORITHM_VERSION + 1)
+    assert store_key("S -> aSb | ab", "S") != before
+
+def test_other_processes_see_results(tmp_path):
+    path = str(tmp_path / "compartido.sqlite3")
+    results, timings = convert_with_timings(SAMPLES[0], "S")
+    ResultStore(path).put(SAMPLES[0], "S", results, timings)
+    assert ResultStore(path).get(SAMPLES[0], "S")["results"] == results
+
+def test_least_used_are_evicted(tmp_path, monkeypatch):
+    # Reloj que avanza en cada uso, para que el orden de last_used no dependa de empates
+    clock = itertools.count()
+    monkeypatch.setattr(store.time, "time", lambda: next(clock))
+    # Tiempos fijos: los medidos cambian el tamaño de cada entrada de una corrida a otra
+    entries = [(text, convert_with_timings(text, "S")[0]) for text in SAMPLES[:4]]
+    probe = ResultStore(str(tmp_path / "medida.sqlite3"))
+    for text, converted in entries:
+        probe.put(text, "S", converted, {})
+    # Sobra un byte: al guardar la cuarta se desaloja una sola entrada
+    results = ResultStore(str(tmp_path / "chico.sqlite3"), max_bytes=probe.stats()["bytes"] - 1)
+    for text, converted in entries:
+        results.put(text, "S", converted, {})
+        # La primera se sigue usando: la desalojada es la menos usada de las demás
+        results.get(SAMPLES[0], "S")
+    assert results.stats()["entries"] == 3
+    assert results.get(SAMPLES[1], "S") is None
+    assert all(results.get(text, "S") is not None for text in (SAMPLES[0], SAMPLES[2], SAMPLES[3]))
+    results.clear()
+    assert results.stats()["entries"] == 0
+
+def test_warm_reads_start_comment(tmp_path, capsys):
+    directory = tmp_path / "gramaticas"
+    directory.mkdir()
+    (directory / "a.txt").write_text("S -> aS | b", encoding="utf-8")
+    (directory / "b.txt").write_text("# inicial: A\nA -> aA | b", encoding="utf-8")
+    results = ResultStore(str(tmp_path / "precarga.sqlite3"))
+    warm(results, str(directory))
+    assert results.get("A -> aA | b", "A") is not None
+    warm(results, str(directory))
+    assert capsys.readouterr().out.count("ya estaba almacenada") == 2